@@ -8,7 +8,7 @@ import os
 from mbox import version
 
 # maya
-import pymel.core as pm
+from mbox.core.scene import pm
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,203 @@
+# -*- coding:utf-8 -*-
+"""guide drawing and rig building benchmark
+
+synthetic blueprints of generator timed on the current scene backend
+(mbox.core.scene), maya in mayapy or the memory scene anywhere.
+results are saved as json and compared with a saved baseline, a stage is
+a regression if it is slower than the baseline times threshold.
+
+    MBOX_SCENE=memory python -m mbox.benchmark.build --save base.json
+    MBOX_SCENE=memory python -m mbox.benchmark.build --baseline base.json
+
+stages
+    draw       - blueprint.draw_from_blueprint
+    hierarchy  - blueprint.get_blueprint_from_hierarchy
+    save       - blueprint.save
+    load       - blueprint.get_blueprint_from_file, load and validate
+    validate   - validator.validate
+    duplicate  - blueprint.duplicate_blueprint of a left block with mirror
+    lego steps - prepare, compute, objects, attributes, operate, finalize
+"""
+
+# json
+import json
+
+# mbox
+from mbox import version
+from mbox.core import scene
+from mbox.lego import blueprint, lego, validator, profiler, scheduler, fileio
+from mbox.benchmark import generator
+
+#
+import os
+import sys
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import timeit
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+RESULT_VERSION = 1
+
+CASES = OrderedDict([("flat_100", OrderedDict([("count", 100), ("depth", 1), ("chain", 1), ("symmetry", False)])),
+                     ("limbs_500", OrderedDict([("count", 500), ("depth", 2), ("chain", 5), ("symmetry", True)])),
+                     ("deep_1000", OrderedDict([("count", 1000), ("depth", 4), ("chain", 10), ("symmetry", True)]))])
+
+LEGO_STEPS = ("prepare", "compute", "objects", "attributes", "operate", "finalize")
+
+STAGES = ("draw", "hierarchy", "save", "load", "validate", "duplicate") + LEGO_STEPS
+
+THRESHOLD = 1.25
+
+# stages faster than this are noise and never regress
+MIN_TIME = 0.005
+
+
+def _clock(func):
+    start = timeit.default_timer()
+    result = func()
+    return timeit.default_timer() - start, result
+
+
+def _get_mirror_block(bp):
+    blocks = [x for x in bp["blocks"] if x["direction"] == "left"] or bp["blocks"]
+    return blocks[-1]
+
+
+def run_case(case, directory):
+    """time every stage once
+
+    :param case: generator.get_blueprint arguments
+    :param directory: temp directory of the blueprint file
+    :return: OrderedDict {stage: seconds}
+    """
+    bp = generator.get_blueprint(**case)
+    times = OrderedDict()
+
+    scene.new_scene()
+    times["draw"] = _clock(lambda: blueprint.draw_from_blueprint(bp))[0]
+    root = scene.pm.PyNode("guide")
+    times["hierarchy"], drawn = _clock(lambda: blueprint.get_blueprint_from_hierarchy(root))
+    if len(drawn["blocks"]) != len(bp["blocks"]):
+        raise RuntimeError("drawn blueprint has {0} of {1} blocks".format(len(drawn["blocks"]), len(bp["blocks"])))
+
+    path = os.path.join(directory, "benchmark.json")
+    times["save"] = _clock(lambda: blueprint.save(bp, path))[0]
+    times["load"] = _clock(lambda: blueprint.get_blueprint_from_file(path))[0]
+    times["validate"] = _clock(lambda: validator.validate(bp))[0]
+    block = blueprint.get_specific_block_blueprint(drawn, scheduler.get_block_name(_get_mirror_block(bp)))
+    times["duplicate"] = _clock(lambda: blueprint.duplicate_blueprint(root, block, mirror=True))[0]
+
+    scene.new_scene()
+    build_profiler = profiler.Profiler()
+    lego.lego(bp, "all", profiler=build_profiler)
+    for step in LEGO_STEPS:
+        times[step] = build_profiler.steps[step]["time"] if step in build_profiler.steps else 0.0
+    return times
+
+
+def run(cases=None, repeat=3):
+    """best time of repeat runs of every stage
+
+    :param cases: case names of CASES, None is every case
+    :param repeat: runs of a case
+    :return: OrderedDict result
+    """
+    directory = tempfile.mkdtemp(prefix="mbox_benchmark_")
+    result = OrderedDict()
+    result["result"] = RESULT_VERSION
+    result["mbox"] = version.mbox
+    result["backend"] = scene.BACKEND
+    result["python"] = platform.python_version()
+    result["platform"] = platform.platform()
+    result["cases"] = OrderedDict()
+    try:
+        for name in cases or CASES.keys():
+            best = None
+            for _ in range(repeat):
+                times = run_case(CASES[name], directory)
+                best = times if best is None else OrderedDict((k, min(v, times[k])) for k, v in best.items())
+            best["total"] = sum(best.values())
+            result["cases"][name] = OrderedDict([("case", CASES[name]), ("times", best)])
+            logger.info("benchmark {0} {1:.3f}s".format(name, best["total"]))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+
+def compare(result, baseline, threshold=THRESHOLD):
+    """stages slower than the baseline
+
+    :param result: run result
+    :param baseline: run result
+    :param threshold: allowed ratio to the baseline
+    :return: [OrderedDict(case, stage, baseline, current, ratio), ...]
+    """
+    if result["backend"] != baseline["backend"]:
+        raise ValueError("baseline backend is {0}, result backend is {1}".format(baseline["backend"],
+                                                                                 result["backend"]))
+    regressions = list()
+    for name, data in result["cases"].items():
+        if name not in baseline["cases"] or baseline["cases"][name]["case"] != data["case"]:
+            logger.warning("benchmark case {0} is not in the baseline".format(name))
+            continue
+        base_times = baseline["cases"][name]["times"]
+        for stage, current in data["times"].items():
+            base = base_times.get(stage)
+            if base is None or current < MIN_TIME:
+                continue
+            ratio = current / max(base, MIN_TIME)
+            if ratio > threshold:
+                regressions.append(OrderedDict([("case", name),
+                                                ("stage", stage),
+                                                ("baseline", base),
+                                                ("current", current),
+                                                ("ratio", ratio)]))
+    return regressions
+
+
+def save(result, path):
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fileio.write_atomic(path, json.dumps(result, indent=2))
+
+
+def load(path):
+    with open(path, "r") as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="mbox.benchmark.build", description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES.keys()), help="default every case")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="result json path")
+    parser.add_argument("--baseline", help="baseline json path")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    result = run(args.cases, args.repeat)
+    sys.stdout.write("backend : {0}\n".format(result["backend"]))
+    for name, data in result["cases"].items():
+        sys.stdout.write("{0} {1}\n".format(name, json.dumps(data["case"])))
+        for stage, seconds in data["times"].items():
+            sys.stdout.write("    {0:<12} {1:>10.4f}s\n".format(stage, seconds))
+    if args.save:
+        save(result, args.save)
+
+    if not args.baseline:
+        return 0
+    regressions = compare(result, load(args.baseline), args.threshold)
+    for regression in regressions:
+        sys.stdout.write("regression {case} {stage} {baseline:.4f}s -> {current:.4f}s {ratio:.2f}x\n".format(
+            **regression))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
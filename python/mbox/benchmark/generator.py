@@ -0,0 +1,99 @@
+# -*- coding:utf-8 -*-
+"""synthetic blueprint generator
+
+control_0 blocks in limbs, a limb is a chain of blocks each parented to the
+previous one. limbs of the first level hang from the guide, limbs of the
+next level from the end of a limb of the level before. with symmetry a limb
+is drawn as a left and a right limb, the right one mirrored on x and
+parented to the mirrored parent.
+
+    bp = generator.get_blueprint(1000, depth=3, chain=5, symmetry=True)
+"""
+
+# mbox
+from mbox.lego import scheduler
+from mbox.lego.box import blueprint
+from mbox.benchmark import validation
+
+#
+from collections import OrderedDict
+
+MIRROR = {"left": "right", "right": "left", "center": "center"}
+
+SIGNS = {"left": 1.0, "right": -1.0, "center": 0.0}
+
+
+def get_block(direction, index, parent, position, priority):
+    """
+    :param direction: center, left, right
+    :param index: block index string
+    :param parent: parent guide node name
+    :param position: [x, y, z]
+    :param priority: tree depth of the block, 1 under the guide
+    :return: control_0 block blueprint
+    """
+    data = validation.get_block(0)
+    data["direction"] = direction
+    data["index"] = index
+    data["transforms"] = [[[1.0, 0.0, 0.0, 0.0],
+                           [0.0, 1.0, 0.0, 0.0],
+                           [0.0, 0.0, 1.0, 0.0],
+                           [float(position[0]), float(position[1]), float(position[2]), 1.0]]]
+    data["priority"] = priority
+    data["parent"] = parent
+    return data
+
+
+def _get_root_name(block):
+    return "{0}root".format(scheduler.get_block_prefix(block))
+
+
+def get_blueprint(count, depth=1, chain=1, symmetry=False):
+    """root blueprint with count blocks
+
+    :param count: block count
+    :param depth: limb levels
+    :param chain: blocks of a limb
+    :param symmetry: left and right limbs, a single remaining block is center
+    :return: root blueprint
+    """
+    bp = blueprint.initialize_()
+    blocks = list()
+    indices = dict()
+    # guide node names of limb ends by level, and their mirrored names
+    ends = [list() for _ in range(depth)]
+    mirrors = {"guide": "guide"}
+
+    limb = 0
+    while len(blocks) < count:
+        level = limb % depth
+        parents = ends[level - 1] if level else ["guide"]
+        parent = parents[(limb // depth) % len(parents)]
+        remaining = count - len(blocks)
+        if symmetry and remaining > 1:
+            directions = ["left", "right"]
+            length = min(chain, remaining // 2)
+        else:
+            directions = ["center"]
+            length = min(chain, remaining)
+
+        names = OrderedDict()
+        for direction in directions:
+            previous = parent if direction != "right" else mirrors.get(parent, parent)
+            for step in range(length):
+                index = indices.get(direction, 0)
+                indices[direction] = index + 1
+                position = [SIGNS[direction] * (level * chain + step + 1), float(limb), 0.0]
+                block = get_block(direction, str(index), previous, position, level * chain + step + 1)
+                blocks.append(block)
+                previous = _get_root_name(block)
+                names.setdefault(direction, list()).append(previous)
+        if "left" in names:
+            for left, right in zip(names["left"], names["right"]):
+                mirrors[left] = right
+                mirrors[right] = left
+        ends[level].extend(x[-1] for direction, x in names.items() if direction != "right")
+        limb += 1
+
+    bp["blocks"] = blocks
+    return bp
@@ -0,0 +1,91 @@
+# -*- coding:utf-8 -*-
+"""blueprint memory benchmark
+
+dict blueprint (json.loads) vs model.Root on blueprints of 1,000 and 10,000 blocks,
+traced memory of the loaded blueprint and one traversal of every block transform
+
+    mayapy -m mbox.benchmark.memory
+"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import model
+from mbox.benchmark import validation
+
+#
+import gc
+import sys
+import timeit
+import tracemalloc
+from collections import OrderedDict
+
+SIZES = [1000, 10000]
+
+
+def _traced(func):
+    """memory kept by the result of func
+
+    :param func:
+    :return: (result, bytes)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def _traverse(bp):
+    total = 0.0
+    for block in bp["blocks"]:
+        for matrix in block["transforms"]:
+            total += matrix[3][1]
+    return total
+
+
+def run(sizes=SIZES):
+    """measure memory and traversal
+
+    :param sizes: block counts
+    :return: [OrderedDict, ...]
+    """
+    results = list()
+    for size in sizes:
+        text = json.dumps(validation.get_blueprint(size))
+        data, data_size = _traced(lambda: json.loads(text, object_pairs_hook=OrderedDict))
+        root, root_size = _traced(lambda: model.Root.from_dict(json.loads(text, object_pairs_hook=OrderedDict)))
+        if root.to_dict() != data:
+            raise RuntimeError("model.Root is not lossless")
+
+        result = OrderedDict()
+        result["blocks"] = size
+        result["dict"] = data_size
+        result["model"] = root_size
+        result["ratio"] = float(data_size) / root_size
+        result["dict traverse"] = min(timeit.repeat(lambda: _traverse(data), number=1, repeat=3))
+        result["model traverse"] = min(timeit.repeat(lambda: _traverse(root), number=1, repeat=3))
+        results.append(result)
+    return results
+
+
+def main():
+    sys.stdout.write("{0:>8} {1:>12} {2:>12} {3:>7} {4:>15} {5:>15}\n".format(
+        "blocks", "dict", "model", "ratio", "dict traverse", "model traverse"))
+    for result in run():
+        sys.stdout.write("{0:>8} {1:>11.1f}K {2:>11.1f}K {3:>6.1f}x {4:>14.6f}s {5:>14.6f}s\n".format(
+            result["blocks"],
+            result["dict"] / 1024.0,
+            result["model"] / 1024.0,
+            result["ratio"],
+            result["dict traverse"],
+            result["model traverse"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding:utf-8 -*-
+"""naming benchmark
+
+convention str.format with keywords vs compiled conventions, first names and
+memoized names of blocks of 1,000 and 10,000 blocks, microseconds per name
+
+    mayapy -m mbox.benchmark.naming
+"""
+
+# mbox
+from mbox.lego import naming
+from mbox.benchmark import validation
+
+#
+import sys
+import timeit
+from collections import OrderedDict
+
+SIZES = [1000, 10000]
+
+# description, extension, joint of every block
+NAMES = [("npo", "", False), ("", None, False), ("", None, True), ("fk0", None, False), ("fk0", None, True)]
+
+
+def get_context():
+    """lego context of the default name rule, with its namer like lego.lego
+
+    :return:
+    """
+    bp = validation.get_blueprint(0)
+    context = OrderedDict()
+    context["direction"] = bp["direction"]
+    context["controllerExp"] = bp["nameRule"]["controllerExp"]
+    context["jointExp"] = bp["nameRule"]["jointExp"]
+    context["commonConvention"] = bp["nameRule"]["convention"]["common"]
+    context["jointConvention"] = bp["nameRule"]["convention"]["joint"]
+    context["jointDescriptionLetterCase"] = bp["nameRule"]["jointDescriptionLetterCase"]
+    context["controllerDescriptionLetterCase"] = bp["nameRule"]["controllerDescriptionLetterCase"]
+    context["namer"] = naming.get_namer(context)
+    return context
+
+
+def format_name(context, block, description, extension=None, joint=False):
+    """keyword str.format of the convention on every call"""
+    if joint:
+        convention = context["jointConvention"]
+        case = context["jointDescriptionLetterCase"]
+        extension = context["jointExp"] if extension is None else extension
+    else:
+        convention = context["commonConvention"]
+        case = context["controllerDescriptionLetterCase"]
+        extension = context["controllerExp"] if extension is None else extension
+    result = convention.format(name=block["name"],
+                               direction=context["direction"][naming.DIRECTIONS.index(block["direction"])],
+                               index=block["index"],
+                               description=naming.letter_case(description, case),
+                               extension=extension)
+    return "_".join([x for x in result.split("_") if x])
+
+
+def _name_all(func, context, blocks):
+    for block in blocks:
+        for description, extension, joint in NAMES:
+            func(context, block, description, extension, joint)
+
+
+def _first(context, blocks):
+    naming._namers.clear()
+    context["namer"] = naming.get_namer(context)
+    _name_all(naming.name, context, blocks)
+
+
+def _best(func, count):
+    return min(timeit.repeat(func, number=1, repeat=3)) / count * 1e6
+
+
+def run(sizes=SIZES):
+    """time naming
+
+    :param sizes: block counts
+    :return: [OrderedDict, ...] microseconds per name
+    """
+    context = get_context()
+    results = list()
+    for size in sizes:
+        blocks = [validation.get_block(x) for x in range(size)]
+        count = size * len(NAMES)
+        for block in blocks[:10]:
+            for description, extension, joint in NAMES:
+                assert format_name(context, block, description, extension, joint) == \
+                    naming.name(context, block, description, extension, joint)
+        result = OrderedDict()
+        result["blocks"] = size
+        result["names"] = count
+        result["format"] = _best(lambda: _name_all(format_name, context, blocks), count)
+        result["compiled"] = _best(lambda: _first(context, blocks), count)
+        result["memoized"] = _best(lambda: _name_all(naming.name, context, blocks), count)
+        results.append(result)
+    return results
+
+
+def main():
+    sys.stdout.write("{0:>8} {1:>8} {2:>12} {3:>12} {4:>12}\n".format(
+        "blocks", "names", "format", "compiled", "memoized"))
+    for result in run():
+        sys.stdout.write("{0:>8} {1:>8} {2:>10.3f}us {3:>10.3f}us {4:>10.3f}us\n".format(*result.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# -*- coding:utf-8 -*-
+"""blueprint validation benchmark
+
+interpreter(jsonschema) vs compiled check on blueprints of 10, 1,000 and 10,000 blocks
+
+    mayapy -m mbox.benchmark.validation
+"""
+
+# json
+from mbox.vendor import jsonschema
+
+# mbox
+from mbox import version
+from mbox.lego import compiler, validator
+from mbox.lego.box import blueprint
+
+#
+import sys
+import timeit
+from collections import OrderedDict
+
+SIZES = [10, 1000, 10000]
+
+
+def get_block(index):
+    """control_0 block blueprint without scene
+
+    :param index:
+    :return:
+    """
+    data = OrderedDict()
+    data["component"] = "control_0"
+    data["version"] = "0.0.0"
+    data["name"] = "control"
+    data["direction"] = ["center", "left", "right"][index % 3]
+    data["index"] = str(index)
+    data["joint"] = True
+    data["jointAxis"] = ["x", "y"]
+    data["transforms"] = [[[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, float(index), 0.0, 1.0]]]
+    data["priority"] = 1
+    data["parent"] = "guide"
+    data["meta"] = OrderedDict()
+    data["meta"]["asWorld"] = False
+    data["meta"]["mirrorBehaviour"] = False
+    data["meta"]["worldOrientAxis"] = True
+    data["meta"]["keyAbleAttrs"] = ["tx", "ty", "tz", "rx", "ry", "rz", "sx", "sy", "sz", "ro"]
+    return data
+
+
+def get_blueprint(count):
+    """root blueprint with count blocks
+
+    :param count:
+    :return:
+    """
+    bp = blueprint.initialize_()
+    bp["blocks"] = [get_block(x) for x in range(count)]
+    return bp
+
+
+def _best(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def run(sizes=SIZES):
+    """time validation
+
+    :param sizes: block counts
+    :return: [OrderedDict, ...] seconds per validation
+    """
+    schema = validator.get_schema(version.schema)
+    check = compiler.compile_schema(schema)
+    interpreter = jsonschema.validators.validator_for(schema)(schema)
+
+    results = list()
+    for size in sizes:
+        bp = get_blueprint(size)
+        number = max(1, 1000 // size)
+        result = OrderedDict()
+        result["blocks"] = size
+        result["jsonschema.validate"] = _best(lambda: jsonschema.validate(bp, schema), number)
+        result["interpreter"] = _best(lambda: interpreter.validate(bp), number)
+        result["compiled"] = _best(lambda: check(bp), number)
+        result["speedup"] = result["interpreter"] / result["compiled"]
+        results.append(result)
+    return results
+
+
+def main():
+    sys.stdout.write("{0:>8} {1:>22} {2:>14} {3:>14} {4:>9}\n".format(
+        "blocks", "jsonschema.validate", "interpreter", "compiled", "speedup"))
+    for result in run():
+        sys.stdout.write("{0:>8} {1:>21.6f}s {2:>13.6f}s {3:>13.6f}s {4:>8.1f}x\n".format(*result.values()))
+
+
+if __name__ == "__main__":
+    main()
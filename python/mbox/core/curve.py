@@ -1,7 +1,7 @@
 # -*- coding:utf-8 -*-
 
 # maya
-import pymel.core as pm
+from mbox.core.scene import pm
 
 
 def add_cns_curve(parent, name, centers, degree=1):
@@ -1,10 +1,7 @@
 # -*- coding:utf-8 -*-
 
 # maya
-import maya.api.OpenMaya as om
-import pymel.core as pm
-import pymel.util as pmu
-from pymel.core import datatypes
+from mbox.core.scene import om, pm, pmu, datatypes
 
 #
 import math
@@ -0,0 +1,1894 @@
+# -*- coding:utf-8 -*-
+"""in-memory scene module
+
+pure python scene with the part of pymel.core and maya.api.OpenMaya mbox
+uses, blueprints are drawn and rigs are built without maya.
+transforms, joints, curves, network nodes, typed, enum, multi, compound
+and message attributes, connections and world matrices.
+multMatrix, decomposeMatrix, composeMatrix and inverseMatrix evaluate,
+other dg nodes keep values only.
+
+    from mbox.core import scene
+    scene.new_scene()
+    node = scene.pm.createNode("transform", name="root")
+
+differences from maya
+    node names are unique in the scene, not per dag path
+    a transform matrix is scale * rotate * translate, pivots, shear and
+    joint orient are not evaluated
+    there is no undo, no ui and no file io, snapshot and restore copy the scene
+"""
+
+#
+import copy
+import math
+import numbers
+import itertools
+from collections import OrderedDict
+
+ROTATE_ORDERS = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+
+TOLERANCE = 1e-10
+
+
+class MayaAttributeError(AttributeError):
+    """attribute does not exist"""
+
+
+class MayaNodeError(ValueError):
+    """node does not exist"""
+
+
+#############################################
+# DATATYPES
+#############################################
+
+
+class Vector(object):
+    """3d vector, pymel.core.datatypes.Vector and OpenMaya.MVector"""
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if not isinstance(x, numbers.Number):
+            x, y, z = x[0], x[1], x[2]
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+    def __repr__(self):
+        return "Vector([{0}, {1}, {2}])".format(self.x, self.y, self.z)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __setitem__(self, index, value):
+        setattr(self, ("x", "y", "z")[index], float(value))
+
+    def __eq__(self, other):
+        try:
+            return self.x == other[0] and self.y == other[1] and self.z == other[2]
+        except (TypeError, IndexError):
+            return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return Vector(self.x + other[0], self.y + other[1], self.z + other[2])
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Vector(self.x - other[0], self.y - other[1], self.z - other[2])
+
+    def __rsub__(self, other):
+        return Vector(other[0] - self.x, other[1] - self.y, other[2] - self.z)
+
+    def __neg__(self):
+        return Vector(-self.x, -self.y, -self.z)
+
+    def __mul__(self, other):
+        """scalar product, dot product, or direction transformed by a matrix"""
+        if isinstance(other, Matrix):
+            return other._transform(self, False)
+        if isinstance(other, (Vector, list, tuple)):
+            return self.dot(other)
+        return Vector(self.x * other, self.y * other, self.z * other)
+
+    def __rmul__(self, other):
+        return Vector(self.x * other, self.y * other, self.z * other)
+
+    def __truediv__(self, other):
+        return Vector(self.x / other, self.y / other, self.z / other)
+
+    __div__ = __truediv__
+
+    def __xor__(self, other):
+        return self.cross(other)
+
+    def dot(self, other):
+        return self.x * other[0] + self.y * other[1] + self.z * other[2]
+
+    def cross(self, other):
+        return Vector(self.y * other[2] - self.z * other[1],
+                      self.z * other[0] - self.x * other[2],
+                      self.x * other[1] - self.y * other[0])
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normal(self):
+        length = self.length()
+        return Vector(self) if length < TOLERANCE else self / length
+
+    def normalize(self):
+        """normalized in place
+
+        :return: self
+        """
+        normal = self.normal()
+        self.x, self.y, self.z = normal.x, normal.y, normal.z
+        return self
+
+    def angle(self, other):
+        length = self.length() * Vector(other).length()
+        if length < TOLERANCE:
+            return 0.0
+        return math.acos(max(-1.0, min(1.0, self.dot(other) / length)))
+
+    def rotateBy(self, rotation):
+        """
+        :param rotation: EulerRotation, Quaternion or radians (x, y, z)
+        :return: Vector
+        """
+        if isinstance(rotation, (list, tuple)):
+            rotation = EulerRotation(*rotation)
+        return rotation.asMatrix()._transform(self, False)
+
+    def isEquivalent(self, other, tol=TOLERANCE):
+        return all(abs(a - b) <= tol for a, b in zip(self, other))
+
+    def tolist(self):
+        return [self.x, self.y, self.z]
+
+    def get(self):
+        return (self.x, self.y, self.z)
+
+
+def cross(a, b):
+    """pymel.util.cross"""
+    return Vector(a).cross(b)
+
+
+def _identity():
+    return [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+
+
+class Matrix(object):
+    """4x4 row major matrix, points are row vectors like maya
+
+    Matrix(), Matrix(16 values), Matrix(4 rows), Matrix(values or rows),
+    Matrix(Matrix), Matrix(TransformationMatrix)
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, *args):
+        if not args:
+            self.data = _identity()
+            return
+        if len(args) == 1:
+            value = args[0]
+            if isinstance(value, TransformationMatrix):
+                value = value.asMatrix()
+            if isinstance(value, Matrix):
+                self.data = [list(row) for row in value.data]
+                return
+            args = list(value)
+        if len(args) == 16:
+            values = [float(x) for x in args]
+            self.data = [values[0:4], values[4:8], values[8:12], values[12:16]]
+        elif len(args) == 4:
+            self.data = [[float(x) for x in row] for row in args]
+        else:
+            raise ValueError("matrix needs 16 values or 4 rows : {0}".format(args))
+
+    def __repr__(self):
+        return "Matrix({0})".format(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __setitem__(self, index, row):
+        self.data[index] = [float(x) for x in row]
+
+    def __eq__(self, other):
+        try:
+            return self.data == Matrix(other).data
+        except (TypeError, ValueError):
+            return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __mul__(self, other):
+        if isinstance(other, TransformationMatrix):
+            other = other.asMatrix()
+        if isinstance(other, Matrix):
+            a = self.data
+            b = other.data
+            return Matrix([[a[i][0] * b[0][j] + a[i][1] * b[1][j] + a[i][2] * b[2][j] + a[i][3] * b[3][j]
+                            for j in range(4)] for i in range(4)])
+        return Matrix([[x * other for x in row] for row in self.data])
+
+    def __rmul__(self, other):
+        if isinstance(other, (Vector, list, tuple)):
+            return self._transform(other, True)
+        return Matrix([[x * other for x in row] for row in self.data])
+
+    def _transform(self, v, point):
+        d = self.data
+        w = 1.0 if point else 0.0
+        return Vector(v[0] * d[0][0] + v[1] * d[1][0] + v[2] * d[2][0] + w * d[3][0],
+                      v[0] * d[0][1] + v[1] * d[1][1] + v[2] * d[2][1] + w * d[3][1],
+                      v[0] * d[0][2] + v[1] * d[1][2] + v[2] * d[2][2] + w * d[3][2])
+
+    def transpose(self):
+        return Matrix([list(x) for x in zip(*self.data)])
+
+    def det3(self):
+        (a, b, c), (d, e, f), (g, h, i) = [row[:3] for row in self.data[:3]]
+        return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+    def inverse(self):
+        """gauss jordan inverse
+
+        :return: Matrix
+        """
+        m = [list(row) + [1.0 if i == j else 0.0 for j in range(4)] for i, row in enumerate(self.data)]
+        for column in range(4):
+            pivot = max(range(column, 4), key=lambda r: abs(m[r][column]))
+            if abs(m[pivot][column]) < TOLERANCE:
+                raise ValueError("matrix is singular")
+            m[column], m[pivot] = m[pivot], m[column]
+            value = m[column][column]
+            m[column] = [x / value for x in m[column]]
+            for row in range(4):
+                if row != column and m[row][column]:
+                    factor = m[row][column]
+                    m[row] = [x - factor * y for x, y in zip(m[row], m[column])]
+        return Matrix([row[4:] for row in m])
+
+    def isEquivalent(self, other, tol=TOLERANCE):
+        other = Matrix(other)
+        return all(abs(a - b) <= tol for x, y in zip(self.data, other.data) for a, b in zip(x, y))
+
+    def tolist(self):
+        return [list(row) for row in self.data]
+
+    def get(self):
+        return tuple(tuple(row) for row in self.data)
+
+    @property
+    def translate(self):
+        return Vector(self.data[3][:3])
+
+
+def _axis_rows(axis, angle):
+    """3x3 row major rotation of one axis"""
+    c = math.cos(angle)
+    s = math.sin(angle)
+    if axis == 0:
+        return [[1.0, 0.0, 0.0], [0.0, c, s], [0.0, -s, c]]
+    if axis == 1:
+        return [[c, 0.0, -s], [0.0, 1.0, 0.0], [s, 0.0, c]]
+    return [[c, s, 0.0], [-s, c, 0.0], [0.0, 0.0, 1.0]]
+
+
+def _mul3(a, b):
+    return [[a[i][0] * b[0][j] + a[i][1] * b[1][j] + a[i][2] * b[2][j] for j in range(3)] for i in range(3)]
+
+
+def _axes(order):
+    return ["xyz".index(x) for x in ROTATE_ORDERS[order]]
+
+
+def _euler_rows(x, y, z, order=0):
+    """3x3 row major rotation, the first axis of order is applied first"""
+    angles = (x, y, z)
+    rows = None
+    for axis in _axes(order):
+        r = _axis_rows(axis, angles[axis])
+        rows = r if rows is None else _mul3(rows, r)
+    return rows
+
+
+def _rows_to_euler(rows, order=0):
+    """radians of a 3x3 row major rotation"""
+    i, j, k = _axes(order)
+    s = 1.0 if ROTATE_ORDERS[order] in ("xyz", "yzx", "zxy") else -1.0
+    # column major of rows
+    c = [[rows[0][0], rows[1][0], rows[2][0]],
+         [rows[0][1], rows[1][1], rows[2][1]],
+         [rows[0][2], rows[1][2], rows[2][2]]]
+    angles = [0.0, 0.0, 0.0]
+    sine = max(-1.0, min(1.0, -s * c[k][i]))
+    angles[j] = math.asin(sine)
+    if abs(sine) < 1.0 - 1e-9:
+        angles[i] = math.atan2(s * c[k][j], c[k][k])
+        angles[k] = math.atan2(s * c[j][i], c[i][i])
+    else:
+        angles[i] = math.atan2(-s * c[j][k], c[j][j])
+    return angles
+
+
+def _rows_to_quaternion(r):
+    trace = r[0][0] + r[1][1] + r[2][2]
+    if trace > 0.0:
+        t = math.sqrt(trace + 1.0) * 2.0
+        return Quaternion((r[1][2] - r[2][1]) / t, (r[2][0] - r[0][2]) / t, (r[0][1] - r[1][0]) / t, 0.25 * t)
+    if r[0][0] > r[1][1] and r[0][0] > r[2][2]:
+        t = math.sqrt(1.0 + r[0][0] - r[1][1] - r[2][2]) * 2.0
+        return Quaternion(0.25 * t, (r[0][1] + r[1][0]) / t, (r[2][0] + r[0][2]) / t, (r[1][2] - r[2][1]) / t)
+    if r[1][1] > r[2][2]:
+        t = math.sqrt(1.0 + r[1][1] - r[0][0] - r[2][2]) * 2.0
+        return Quaternion((r[0][1] + r[1][0]) / t, 0.25 * t, (r[1][2] + r[2][1]) / t, (r[2][0] - r[0][2]) / t)
+    t = math.sqrt(1.0 + r[2][2] - r[0][0] - r[1][1]) * 2.0
+    return Quaternion((r[2][0] + r[0][2]) / t, (r[1][2] + r[2][1]) / t, 0.25 * t, (r[0][1] - r[1][0]) / t)
+
+
+def _to_matrix(rows, translate=(0.0, 0.0, 0.0)):
+    return Matrix([list(rows[0]) + [0.0], list(rows[1]) + [0.0], list(rows[2]) + [0.0], list(translate) + [1.0]])
+
+
+class EulerRotation(object):
+    """radians, OpenMaya.MEulerRotation"""
+
+    kXYZ, kYZX, kZXY, kXZY, kYXZ, kZYX = range(6)
+
+    __slots__ = ("x", "y", "z", "order")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, order=0):
+        if not isinstance(x, numbers.Number):
+            x, y, z = x[0], x[1], x[2]
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self.order = order
+
+    def __repr__(self):
+        return "EulerRotation([{0}, {1}, {2}], {3})".format(self.x, self.y, self.z, ROTATE_ORDERS[self.order])
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def asMatrix(self):
+        return _to_matrix(_euler_rows(self.x, self.y, self.z, self.order))
+
+    def asQuaternion(self):
+        return _rows_to_quaternion(_euler_rows(self.x, self.y, self.z, self.order))
+
+    def tolist(self):
+        return [self.x, self.y, self.z]
+
+
+class Quaternion(object):
+    """OpenMaya.MQuaternion, a * b is a then b like maya"""
+
+    __slots__ = ("x", "y", "z", "w")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        if not isinstance(x, numbers.Number):
+            x, y, z, w = x[0], x[1], x[2], x[3]
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self.w = float(w)
+
+    def __repr__(self):
+        return "Quaternion([{0}, {1}, {2}, {3}])".format(self.x, self.y, self.z, self.w)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z, self.w))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z, self.w)[index]
+
+    def __add__(self, other):
+        return Quaternion(self.x + other[0], self.y + other[1], self.z + other[2], self.w + other[3])
+
+    def __mul__(self, other):
+        if not isinstance(other, Quaternion):
+            return Quaternion(self.x * other, self.y * other, self.z * other, self.w * other)
+        # hamilton product other * self
+        a, b = other, self
+        return Quaternion(a.w * b.x + a.x * b.w + a.y * b.z - a.z * b.y,
+                          a.w * b.y - a.x * b.z + a.y * b.w + a.z * b.x,
+                          a.w * b.z + a.x * b.y - a.y * b.x + a.z * b.w,
+                          a.w * b.w - a.x * b.x - a.y * b.y - a.z * b.z)
+
+    def scaleIt(self, scale):
+        self.x, self.y, self.z, self.w = self.x * scale, self.y * scale, self.z * scale, self.w * scale
+        return self
+
+    def negateIt(self):
+        return self.scaleIt(-1.0)
+
+    def conjugate(self):
+        return Quaternion(-self.x, -self.y, -self.z, self.w)
+
+    def normal(self):
+        length = math.sqrt(sum(x * x for x in self))
+        return Quaternion(*[x / length for x in self])
+
+    def asMatrix(self):
+        x, y, z, w = self.normal()
+        return _to_matrix([[1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y + z * w), 2.0 * (x * z - y * w)],
+                           [2.0 * (x * y - z * w), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z + x * w)],
+                           [2.0 * (x * z + y * w), 2.0 * (y * z - x * w), 1.0 - 2.0 * (x * x + y * y)]])
+
+    def asEulerRotation(self, order=0):
+        return EulerRotation(_rows_to_euler(self.asMatrix().data, order), order=order)
+
+    def tolist(self):
+        return [self.x, self.y, self.z, self.w]
+
+
+def _decompose(m, order=0):
+    """translate, radians, scale of a matrix
+
+    :param m: Matrix
+    :param order: rotate order
+    :return: (Vector, [x, y, z], [x, y, z])
+    """
+    rows = [Vector(row[:3]) for row in m.data[:3]]
+    scale = [x.length() for x in rows]
+    if m.det3() < 0.0:
+        scale[0] = -scale[0]
+    rotation = [list(row / (s if abs(s) > TOLERANCE else 1.0)) for row, s in zip(rows, scale)]
+    return Vector(m.data[3][:3]), _rows_to_euler(rotation, order), scale
+
+
+def _compose(translate, rotate, scale, order=0):
+    rows = _euler_rows(rotate[0], rotate[1], rotate[2], order)
+    return _to_matrix([[x * s for x in row] for row, s in zip(rows, scale)], translate)
+
+
+class TransformationMatrix(object):
+    """translate, rotate and scale of a matrix,
+    pymel.core.datatypes.TransformationMatrix and OpenMaya.MTransformationMatrix
+    """
+
+    __slots__ = ("_translate", "_rotate", "_scale", "_order")
+
+    def __init__(self, m=None, order=0):
+        m = Matrix() if m is None else Matrix(m)
+        self._order = order
+        self._translate, self._rotate, self._scale = _decompose(m, order)
+
+    def asMatrix(self):
+        return _compose(self._translate, self._rotate, self._scale, self._order)
+
+    def getTranslation(self, space="world"):
+        return Vector(self._translate)
+
+    def setTranslation(self, translate, space="world"):
+        self._translate = Vector(translate)
+        return self
+
+    def translation(self, space=None):
+        return Vector(self._translate)
+
+    def getScale(self, space="world"):
+        return list(self._scale)
+
+    def setScale(self, scale, space="world"):
+        self._scale = [float(x) for x in scale]
+        return self
+
+    def rotation(self, asQuaternion=False):
+        if asQuaternion:
+            return self.getRotationQuaternion()
+        return EulerRotation(self._rotate, order=self._order)
+
+    def getRotation(self):
+        return EulerRotation(self._rotate, order=self._order)
+
+    def setRotation(self, rotation):
+        if isinstance(rotation, Quaternion):
+            rotation = rotation.asEulerRotation(self._order)
+        self._rotate = list(rotation)[:3]
+        return self
+
+    def getRotationQuaternion(self):
+        return tuple(EulerRotation(self._rotate, order=self._order).asQuaternion())
+
+    def setRotationQuaternion(self, x, y, z, w):
+        self._rotate = _rows_to_euler(Quaternion(x, y, z, w).asMatrix().data, self._order)
+        return self
+
+    def __mul__(self, other):
+        return self.asMatrix() * other
+
+
+#############################################
+# ATTRIBUTES
+#############################################
+
+
+_DEFAULTS = {"bool": False,
+             "long": 0,
+             "short": 0,
+             "byte": 0,
+             "enum": 0,
+             "char": 0,
+             "double": 0.0,
+             "float": 0.0,
+             "doubleLinear": 0.0,
+             "doubleAngle": 0.0,
+             "time": 0.0,
+             "string": None,
+             "message": None,
+             "matrix": None,
+             "fltMatrix": None,
+             "double3": (0.0, 0.0, 0.0),
+             "float3": (0.0, 0.0, 0.0),
+             "long3": (0, 0, 0),
+             "double2": (0.0, 0.0),
+             "float2": (0.0, 0.0)}
+
+_INTEGERS = ("long", "short", "byte", "char")
+
+_FLOATS = ("double", "float", "doubleLinear", "doubleAngle", "time")
+
+
+class _Spec(object):
+    """attribute definition, shared by every node of a type"""
+
+    __slots__ = ("name", "short", "type", "default", "multi", "enums", "keyable", "children", "parent", "compute",
+                 "min", "max")
+
+    def __init__(self, name, attr_type, short=None, default=None, multi=False, enums=None, keyable=False,
+                 children=None, parent=None, compute=None, minimum=None, maximum=None):
+        self.name = name
+        self.short = short
+        self.type = attr_type
+        self.default = _DEFAULTS.get(attr_type) if default is None else default
+        self.multi = multi
+        self.enums = OrderedDict(enums) if enums else None
+        self.keyable = keyable
+        self.children = children
+        self.parent = parent
+        self.compute = compute
+        self.min = minimum
+        self.max = maximum
+
+    def _coerce_enum(self, value):
+        if isinstance(value, numbers.Number):
+            return int(value)
+        if value not in self.enums:
+            raise RuntimeError("{0} is not an enum of {1}".format(value, self.name))
+        return self.enums[value]
+
+    def coerce(self, value):
+        if self.type == "bool":
+            return bool(value)
+        if self.type == "enum":
+            return self._coerce_enum(value)
+        if self.type in ("matrix", "fltMatrix"):
+            return Matrix(value)
+        if self.type == "string":
+            return value
+        if self.type in ("double3", "float3", "long3", "double2", "float2"):
+            return tuple(value)
+        if self.type in _INTEGERS:
+            value = int(value)
+        elif self.type in _FLOATS:
+            value = float(value)
+        return self._clamp(value)
+
+    def _clamp(self, value):
+        if self.min is not None and value < self.min:
+            value = type(value)(self.min)
+        if self.max is not None and value > self.max:
+            value = type(value)(self.max)
+        return value
+
+    def get_default(self):
+        if self.type in ("matrix", "fltMatrix"):
+            return Matrix() if self.default is None else Matrix(self.default)
+        return self.default
+
+    def output(self, value):
+        """value returned by get, matrices are copied and 3 values are a Vector"""
+        if value is None:
+            return self.get_default()
+        if isinstance(value, Matrix):
+            return Matrix(value)
+        if isinstance(value, tuple) and len(value) == 3 and self.type != "long3":
+            return Vector(value)
+        return value
+
+
+class _Data(object):
+    """attribute state of one node, created on the first change"""
+
+    __slots__ = ("value", "values", "locked", "keyable", "channelBox", "inputs", "outputs")
+
+    def __init__(self, spec):
+        self.value = spec.get_default()
+        self.values = OrderedDict() if spec.multi else None
+        self.locked = False
+        self.keyable = spec.keyable
+        self.channelBox = False
+        self.inputs = dict()
+        self.outputs = OrderedDict()
+
+
+class EnumDict(object):
+    """getEnums result, name -> index"""
+
+    def __init__(self, enums):
+        self.enums = OrderedDict(enums or ())
+
+    def key(self, index):
+        for name, value in self.enums.items():
+            if value == index:
+                return name
+        raise KeyError(index)
+
+    def value(self, name):
+        return self.enums[name]
+
+    def keys(self):
+        return list(self.enums.keys())
+
+    def values(self):
+        return list(self.enums.values())
+
+    def __getitem__(self, name):
+        return self.enums[name]
+
+
+class Attribute(object):
+    """plug of a node attribute, multi attribute elements have an index"""
+
+    __slots__ = ("node", "spec", "index")
+
+    def __init__(self, node, spec, index=None):
+        self.node = node
+        self.spec = spec
+        self.index = index
+
+    def __repr__(self):
+        return "Attribute(u'{0}')".format(self.name())
+
+    def __str__(self):
+        return self.name()
+
+    def __eq__(self, other):
+        return isinstance(other, Attribute) and (self.node, self.spec.name, self.index) == \
+            (other.node, other.spec.name, other.index)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self.node), self.spec.name, self.index))
+
+    def __getitem__(self, index):
+        if not self.spec.multi:
+            raise TypeError("{0} is not a multi attribute".format(self.name()))
+        return Attribute(self.node, self.spec, int(index))
+
+    def __rshift__(self, other):
+        connectAttr(self, other, force=True)
+
+    def __floordiv__(self, other):
+        disconnectAttr(self, other)
+
+    def name(self):
+        if self.index is None:
+            return "{0}.{1}".format(self.node.name(), self.spec.name)
+        return "{0}.{1}[{2}]".format(self.node.name(), self.spec.name, self.index)
+
+    def attrName(self, longName=False):
+        return self.spec.name if longName or not self.spec.short else self.spec.short
+
+    def longName(self):
+        return self.spec.name
+
+    def plugNode(self):
+        return self.node
+
+    def type(self):
+        return self.spec.type
+
+    def isMulti(self):
+        return self.spec.multi
+
+    def isElement(self):
+        return self.index is not None
+
+    def array(self):
+        return Attribute(self.node, self.spec)
+
+    def getArrayIndices(self):
+        return self.node._indices(self.spec)
+
+    def numElements(self):
+        return len(self.node._indices(self.spec))
+
+    def exists(self):
+        return self.node.exists()
+
+    def get(self, **kwargs):
+        return self.node._get(self.spec, self.index)
+
+    def set(self, *args, **kwargs):
+        """value and flags, lock, keyable, channelBox"""
+        if args:
+            value = args[0] if len(args) == 1 else tuple(args)
+            if self.spec.multi and self.index is None:
+                for index, item in enumerate(value):
+                    self.node._set(self.spec, index, item)
+            else:
+                self.node._set(self.spec, self.index, value)
+        if kwargs:
+            data = self.node._data(self.spec)
+            if "lock" in kwargs or "l" in kwargs:
+                data.locked = bool(kwargs.get("lock", kwargs.get("l")))
+            if "keyable" in kwargs or "k" in kwargs:
+                data.keyable = bool(kwargs.get("keyable", kwargs.get("k")))
+            if "channelBox" in kwargs or "cb" in kwargs:
+                data.channelBox = bool(kwargs.get("channelBox", kwargs.get("cb")))
+
+    def lock(self):
+        self.set(lock=True)
+
+    def unlock(self):
+        self.set(lock=False)
+
+    def isLocked(self):
+        data = self.node._attrs.get(self.spec.name)
+        return bool(data and data.locked)
+
+    def isKeyable(self):
+        data = self.node._attrs.get(self.spec.name)
+        return data.keyable if data else self.spec.keyable
+
+    def setKeyable(self, keyable):
+        self.set(keyable=keyable)
+
+    def isInChannelBox(self):
+        data = self.node._attrs.get(self.spec.name)
+        return bool(data and data.channelBox)
+
+    def showInChannelBox(self, value):
+        self.set(channelBox=value)
+
+    def getEnums(self):
+        return EnumDict(self.spec.enums)
+
+    def connect(self, other, force=False):
+        connectAttr(self, other, force=force)
+
+    def disconnect(self, other=None):
+        disconnectAttr(self, other)
+
+    def _plugs(self, direction):
+        data = self.node._attrs.get(self.spec.name)
+        if data is None:
+            return list()
+        if direction == "inputs":
+            if self.index is None and self.spec.multi:
+                return [data.inputs[x] for x in sorted(data.inputs)]
+            return [data.inputs[self.index]] if self.index in data.inputs else list()
+        if self.index is None and self.spec.multi:
+            return [y for x in data.outputs.values() for y in x]
+        return list(data.outputs.get(self.index, list()))
+
+    def inputs(self, type=None, plugs=False):
+        return _filter(self._plugs("inputs"), type, plugs)
+
+    def outputs(self, type=None, plugs=False):
+        return _filter(self._plugs("outputs"), type, plugs)
+
+    def connections(self, type=None, plugs=False):
+        return self.inputs(type, plugs) + self.outputs(type, plugs)
+
+    def isConnected(self):
+        return bool(self._plugs("inputs") or self._plugs("outputs"))
+
+
+def _filter(plugs, node_type=None, plugs_result=False):
+    result = list()
+    for plug in plugs:
+        if node_type is not None and not plug.node.isType(node_type):
+            continue
+        item = plug if plugs_result else plug.node
+        if item not in result:
+            result.append(item)
+    return result
+
+
+def _as_plug(value):
+    if isinstance(value, Attribute):
+        return value
+    plug = PyNode(value)
+    if not isinstance(plug, Attribute):
+        raise MayaAttributeError("{0} is not an attribute".format(value))
+    return plug
+
+
+def connectAttr(source, destination, force=False, **kwargs):
+    """
+    :param source: Attribute or node.attr
+    :param destination: Attribute or node.attr
+    :param force: replace the input of destination
+    """
+    source = _as_plug(source)
+    destination = _as_plug(destination)
+    node = destination.node
+    data = node._data(destination.spec)
+    if data.locked:
+        raise RuntimeError("The destination attribute '{0}' is locked".format(destination.name()))
+    if destination.spec.compute is not None:
+        raise RuntimeError("The destination attribute '{0}' is read only".format(destination.name()))
+    current = data.inputs.get(destination.index)
+    if current is not None:
+        if current == source:
+            return
+        if not force:
+            raise RuntimeError("{0} is already connected to {1}".format(current.name(), destination.name()))
+        disconnectAttr(current, destination)
+    data.inputs[destination.index] = source
+    source.node._data(source.spec).outputs.setdefault(source.index, list()).append(destination)
+
+
+def disconnectAttr(source, destination=None, **kwargs):
+    """
+    :param source: Attribute or node.attr
+    :param destination: None is every output of source
+    """
+    source = _as_plug(source)
+    destinations = [_as_plug(destination)] if destination is not None else source.outputs(plugs=True)
+    for plug in destinations:
+        data = plug.node._attrs.get(plug.spec.name)
+        if data is None:
+            continue
+        for index, current in list(data.inputs.items()):
+            if current == source and (plug.index is None or plug.index == index):
+                del data.inputs[index]
+                outputs = source.node._data(source.spec).outputs
+                target = Attribute(plug.node, plug.spec, index)
+                for key in list(outputs):
+                    outputs[key] = [x for x in outputs[key] if x != target]
+                    if not outputs[key]:
+                        del outputs[key]
+
+
+#############################################
+# NODES
+#############################################
+
+
+def _specs(*specs):
+    data = OrderedDict()
+    for spec in specs:
+        data[spec.name] = spec
+    return data
+
+
+def _compound(name, short, children, attr_type="double", default=0.0, keyable=False, compute=None):
+    specs = [_Spec(name, "double3", short=short, children=[x[0] for x in children], compute=compute)]
+    for index, (child, child_short) in enumerate(children):
+        specs.append(_Spec(child, attr_type, short=child_short, default=default, keyable=keyable,
+                           parent=(name, index)))
+    return specs
+
+
+def _get_world(node, index=None):
+    return node.getMatrix(worldSpace=True)
+
+
+def _get_world_inverse(node, index=None):
+    return node.getMatrix(worldSpace=True).inverse()
+
+
+def _get_parent_world(node, index=None):
+    parent = node.getParent()
+    return parent.getMatrix(worldSpace=True) if parent is not None else Matrix()
+
+
+def _get_parent_world_inverse(node, index=None):
+    return _get_parent_world(node).inverse()
+
+
+def _get_local(node, index=None):
+    return node.getMatrix()
+
+
+def _get_local_inverse(node, index=None):
+    return node.getMatrix().inverse()
+
+
+def _get_matrix_sum(node, index=None):
+    m = Matrix()
+    spec = node._spec("matrixIn")
+    for i in node._indices(spec):
+        m = m * node._get(spec, i)
+    return m
+
+
+def _decompose_input(node):
+    return _decompose(Matrix(node.attr("inputMatrix").get()), node.attr("inputRotateOrder").get())
+
+
+def _get_output_translate(node, index=None):
+    return tuple(_decompose_input(node)[0])
+
+
+def _get_output_rotate(node, index=None):
+    return tuple(math.degrees(x) for x in _decompose_input(node)[1])
+
+
+def _get_output_scale(node, index=None):
+    return tuple(_decompose_input(node)[2])
+
+
+def _get_output_quat(node, index=None):
+    translate, rotate, scale = _decompose_input(node)
+    return tuple(EulerRotation(rotate, order=node.attr("inputRotateOrder").get()).asQuaternion())
+
+
+def _get_compose_output(node, index=None):
+    order = node.attr("inputRotateOrder").get()
+    rotate = [math.radians(x) for x in node.attr("inputRotate").get()]
+    return _compose(node.attr("inputTranslate").get(), rotate, node.attr("inputScale").get(), order)
+
+
+def _get_inverse_output(node, index=None):
+    return Matrix(node.attr("inputMatrix").get()).inverse()
+
+
+def _rotate_order_spec(name="rotateOrder", short="ro"):
+    return _Spec(name, "enum", short=short, enums=[(x, i) for i, x in enumerate(ROTATE_ORDERS)])
+
+
+_NODE_SPECS = _specs(_Spec("message", "message", short="msg"),
+                     _Spec("isHistoricallyInteresting", "byte", short="ihi", default=2),
+                     _Spec("caching", "bool", short="cch"),
+                     _Spec("frozen", "bool", short="fzn"),
+                     _Spec("nodeState", "enum", short="nds",
+                           enums=[("Normal", 0), ("HasNoEffect", 1), ("Blocking", 2)]))
+
+_DAG_SPECS = _specs(*(list(_NODE_SPECS.values()) + [
+    _Spec("visibility", "bool", short="v", default=True, keyable=True),
+    _Spec("hideOnPlayback", "bool", short="hop"),
+    _Spec("template", "bool", short="tmp"),
+    _Spec("lodVisibility", "bool", short="lodv", default=True),
+    _Spec("overrideEnabled", "bool", short="ove"),
+    _Spec("overrideDisplayType", "enum", short="ovdt", enums=[("Normal", 0), ("Template", 1), ("Reference", 2)]),
+    _Spec("overrideVisibility", "bool", short="ovv", default=True),
+    _Spec("overrideColor", "byte", short="ovc", minimum=0, maximum=31),
+    _Spec("overrideRGBColors", "bool", short="ovrgbf")]
+    + _compound("overrideColorRGB", "ovrgb",
+                [("overrideColorR", "ovcr"), ("overrideColorG", "ovcg"), ("overrideColorB", "ovcb")], "float")
+    + [_Spec("worldMatrix", "matrix", short="wm", compute=_get_world),
+       _Spec("worldInverseMatrix", "matrix", short="wim", compute=_get_world_inverse),
+       _Spec("parentMatrix", "matrix", short="pm", compute=_get_parent_world),
+       _Spec("parentInverseMatrix", "matrix", short="pim", compute=_get_parent_world_inverse)]))
+
+_TRANSFORM_SPECS = _specs(*(list(_DAG_SPECS.values())
+                            + _compound("translate", "t", [("translateX", "tx"),
+                                                           ("translateY", "ty"),
+                                                           ("translateZ", "tz")], "doubleLinear", keyable=True)
+                            + _compound("rotate", "r", [("rotateX", "rx"),
+                                                        ("rotateY", "ry"),
+                                                        ("rotateZ", "rz")], "doubleAngle", keyable=True)
+                            + _compound("scale", "s", [("scaleX", "sx"),
+                                                       ("scaleY", "sy"),
+                                                       ("scaleZ", "sz")], "double", 1.0, keyable=True)
+                            + [_rotate_order_spec(),
+                               _Spec("inheritsTransform", "bool", short="it", default=True),
+                               _Spec("displayHandle", "bool", short="dh"),
+                               _Spec("displayLocalAxis", "bool", short="dla"),
+                               _Spec("matrix", "matrix", short="m", compute=_get_local),
+                               _Spec("inverseMatrix", "matrix", short="im", compute=_get_local_inverse)]))
+
+_JOINT_SPECS = _specs(*(list(_TRANSFORM_SPECS.values())
+                        + _compound("jointOrient", "jo", [("jointOrientX", "jox"),
+                                                          ("jointOrientY", "joy"),
+                                                          ("jointOrientZ", "joz")], "doubleAngle")
+                        + [_Spec("radius", "double", short="radi", default=1.0),
+                           _Spec("segmentScaleCompensate", "bool", short="ssc", default=True),
+                           _Spec("drawStyle", "enum", short="ds", enums=[("Bone", 0),
+                                                                         ("Multi-child as Box", 1),
+                                                                         ("None", 2),
+                                                                         ("Joint", 3)])]))
+
+_CURVE_SPECS = _specs(*(list(_DAG_SPECS.values())
+                        + [_Spec("controlPoints", "double3", short="cp", multi=True),
+                           _Spec("lineWidth", "float", short="lw", default=-1.0),
+                           _Spec("dispCV", "bool", short="dcv")]))
+
+_NETWORK_SPECS = _specs(*(list(_NODE_SPECS.values())
+                          + [_Spec("affects", "message", short="affects", multi=True),
+                             _Spec("affectedBy", "message", short="affectedBy", multi=True)]))
+
+_MULT_MATRIX_SPECS = _specs(*(list(_NODE_SPECS.values())
+                              + [_Spec("matrixIn", "matrix", short="i", multi=True),
+                                 _Spec("matrixSum", "matrix", short="o", compute=_get_matrix_sum)]))
+
+_DECOMPOSE_SPECS = _specs(*(list(_NODE_SPECS.values())
+                            + [_Spec("inputMatrix", "matrix", short="imat"),
+                               _rotate_order_spec("inputRotateOrder", "ro"),
+                               _Spec("outputTranslate", "double3", short="ot", compute=_get_output_translate),
+                               _Spec("outputRotate", "double3", short="or", compute=_get_output_rotate),
+                               _Spec("outputScale", "double3", short="os", compute=_get_output_scale),
+                               _Spec("outputQuat", "double3", short="oq", compute=_get_output_quat)]))
+
+_COMPOSE_SPECS = _specs(*(list(_NODE_SPECS.values())
+                          + _compound("inputTranslate", "it", [("inputTranslateX", "itx"),
+                                                               ("inputTranslateY", "ity"),
+                                                               ("inputTranslateZ", "itz")])
+                          + _compound("inputRotate", "ir", [("inputRotateX", "irx"),
+                                                            ("inputRotateY", "iry"),
+                                                            ("inputRotateZ", "irz")])
+                          + _compound("inputScale", "is", [("inputScaleX", "isx"),
+                                                           ("inputScaleY", "isy"),
+                                                           ("inputScaleZ", "isz")], default=1.0)
+                          + [_rotate_order_spec("inputRotateOrder", "iro"),
+                             _Spec("outputMatrix", "matrix", short="omat", compute=_get_compose_output)]))
+
+_INVERSE_SPECS = _specs(*(list(_NODE_SPECS.values())
+                          + [_Spec("inputMatrix", "matrix", short="imat"),
+                             _Spec("outputMatrix", "matrix", short="omat", compute=_get_inverse_output)]))
+
+
+def _aliases(specs):
+    return dict((x.short, x.name) for x in specs.values() if x.short)
+
+
+class DependNode(object):
+    """dg node"""
+
+    _type_specs = _NODE_SPECS
+    _type_aliases = _aliases(_NODE_SPECS)
+    _inherited = ("dependNode",)
+
+    def __init__(self, node_type, name):
+        self._type = node_type
+        self._name = name
+        self._attrs = dict()
+        self._user = None
+        self._user_aliases = None
+        self._deleted = False
+
+    def __repr__(self):
+        return "nt.{0}(u'{1}')".format(type(self).__name__, self._name)
+
+    def __str__(self):
+        return self._name
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.attr(name)
+
+    def __add__(self, other):
+        # names are joined like pymel, node + "_crv"
+        return self._name + other
+
+    def __radd__(self, other):
+        return other + self._name
+
+    def name(self, long=False):
+        return self._name
+
+    def nodeName(self):
+        return self._name
+
+    def longName(self):
+        return self._name
+
+    def type(self):
+        return self._type
+
+    def nodeType(self):
+        return self._type
+
+    def isType(self, node_type):
+        return node_type == self._type or node_type in self._inherited
+
+    def exists(self):
+        return not self._deleted
+
+    def rename(self, name):
+        return _scene.rename(self, name)
+
+    def _spec(self, name):
+        if self._user and name in self._user:
+            return self._user[name]
+        spec = self._type_specs.get(name)
+        if spec is not None:
+            return spec
+        long_name = self._type_aliases.get(name)
+        if long_name is None and self._user_aliases:
+            long_name = self._user_aliases.get(name)
+            if long_name is not None:
+                return self._user[long_name]
+        return self._type_specs.get(long_name) if long_name else None
+
+    def _data(self, spec):
+        data = self._attrs.get(spec.name)
+        if data is None:
+            data = self._attrs[spec.name] = _Data(spec)
+        return data
+
+    def _indices(self, spec):
+        data = self._attrs.get(spec.name)
+        if data is None:
+            return list()
+        return sorted(set(data.values) | set(x for x in data.inputs if x is not None))
+
+    def _get(self, spec, index=None):
+        if spec.multi and index is None:
+            return [self._get(spec, x) for x in self._indices(spec)]
+        data = self._attrs.get(spec.name)
+        if data is not None and data.inputs:
+            source = data.inputs.get(index)
+            if source is not None:
+                return spec.output(spec.coerce(source.get())) if spec.type != "message" else None
+        if spec.parent is not None:
+            parent = self._attrs.get(spec.parent[0])
+            if parent is not None and None in parent.inputs:
+                return spec.coerce(parent.inputs[None].get()[spec.parent[1]])
+        if spec.children is not None:
+            values = tuple(self._get(self._spec(x)) for x in spec.children)
+            return Vector(values) if len(values) == 3 else values
+        if spec.compute is not None:
+            return spec.output(spec.coerce(spec.compute(self, index)))
+        if data is None:
+            return spec.output(spec.default)
+        return spec.output(data.values.get(index) if spec.multi else data.value)
+
+    def _set(self, spec, index, value, force=False):
+        if spec.compute is not None:
+            raise RuntimeError("{0}.{1} is read only".format(self._name, spec.name))
+        data = self._data(spec)
+        if not force:
+            if data.locked:
+                raise RuntimeError("The attribute '{0}.{1}' is locked".format(self._name, spec.name))
+            if index in data.inputs:
+                raise RuntimeError("The attribute '{0}.{1}' is connected".format(self._name, spec.name))
+        if spec.children is not None:
+            for child, item in zip(spec.children, value):
+                self._set(self._spec(child), None, item, force)
+            return
+        if spec.type == "message":
+            raise RuntimeError("{0}.{1} is a message attribute".format(self._name, spec.name))
+        value = spec.coerce(value)
+        if spec.multi:
+            if index is None:
+                raise RuntimeError("{0}.{1} needs an index".format(self._name, spec.name))
+            data.values[index] = value
+        else:
+            data.value = value
+
+    def hasAttr(self, name, checkShape=True):
+        return self._spec(name) is not None
+
+    def attr(self, name):
+        """
+        :param name: long or short name, name[index] of a multi element
+        :return: Attribute
+        """
+        index = None
+        if name.endswith("]") and "[" in name:
+            name, index = name[:-1].split("[")
+            index = int(index)
+        spec = self._spec(name)
+        if spec is None:
+            raise MayaAttributeError("{0}.{1}".format(self._name, name))
+        return Attribute(self, spec, index)
+
+    def listAttr(self, userDefined=False, keyable=False, locked=False):
+        specs = list(self._user.values()) if self._user else list()
+        if not userDefined:
+            specs = list(self._type_specs.values()) + specs
+        plugs = [Attribute(self, x) for x in specs]
+        if keyable:
+            plugs = [x for x in plugs if x.isKeyable()]
+        if locked:
+            plugs = [x for x in plugs if x.isLocked()]
+        return plugs
+
+    def addAttr(self, longName, **kwargs):
+        """addAttr flags mbox uses, attributeType(at), dataType(dt), shortName(sn), multi(m),
+        defaultValue(dv), enumName(en), keyable(k), minValue(min), maxValue(max)
+        """
+        if self._spec(longName) is not None:
+            raise RuntimeError("Found a duplicate attribute name '{0}' on {1}".format(longName, self._name))
+        attr_type = kwargs.get("attributeType", kwargs.get("at", kwargs.get("dataType", kwargs.get("dt"))))
+        if attr_type is None:
+            attr_type = "double"
+        enums = None
+        if attr_type == "enum":
+            enums = list()
+            for index, item in enumerate(kwargs.get("enumName", kwargs.get("en", "")).split(":")):
+                key, _, value = item.partition("=")
+                enums.append((key, int(value) if value else index))
+            enums = OrderedDict(enums)
+        spec = _Spec(longName,
+                     attr_type,
+                     short=kwargs.get("shortName", kwargs.get("sn")),
+                     multi=bool(kwargs.get("multi", kwargs.get("m", False))),
+                     enums=enums,
+                     keyable=bool(kwargs.get("keyable", kwargs.get("k", False))),
+                     minimum=kwargs.get("minValue", kwargs.get("min")),
+                     maximum=kwargs.get("maxValue", kwargs.get("max")))
+        default = kwargs.get("defaultValue", kwargs.get("dv"))
+        if default is not None and attr_type not in ("string", "message", "matrix"):
+            spec.default = spec.coerce(default)
+        if self._user is None:
+            self._user = OrderedDict()
+        self._user[longName] = spec
+        if spec.short:
+            if self._user_aliases is None:
+                self._user_aliases = dict()
+            self._user_aliases[spec.short] = longName
+
+    def deleteAttr(self, name):
+        spec = self._spec(name)
+        if spec is None or not self._user or spec.name not in self._user:
+            raise MayaAttributeError("{0}.{1}".format(self._name, name))
+        _disconnect_all(self, [spec])
+        del self._user[spec.name]
+        self._attrs.pop(spec.name, None)
+
+    def setAttr(self, name, *args, **kwargs):
+        self.attr(name).set(*args, **kwargs)
+
+    def getAttr(self, name, **kwargs):
+        return self.attr(name).get()
+
+    def _connections(self, direction):
+        plugs = list()
+        for name in list(self._attrs):
+            spec = self._spec(name)
+            if spec is not None:
+                plugs.extend(Attribute(self, spec)._plugs(direction))
+        return plugs
+
+    def inputs(self, type=None, plugs=False):
+        return _filter(self._connections("inputs"), type, plugs)
+
+    def outputs(self, type=None, plugs=False):
+        return _filter(self._connections("outputs"), type, plugs)
+
+    def connections(self, type=None, plugs=False):
+        return _filter(self._connections("inputs") + self._connections("outputs"), type, plugs)
+
+
+class DagNode(DependNode):
+    """dag node, the parent of a shape is a transform"""
+
+    _type_specs = _DAG_SPECS
+    _type_aliases = _aliases(_DAG_SPECS)
+    _inherited = ("dependNode", "dagNode")
+
+    def __init__(self, node_type, name):
+        super(DagNode, self).__init__(node_type, name)
+        self._parent = None
+        self._children = list()
+
+    def attr(self, name):
+        try:
+            return super(DagNode, self).attr(name)
+        except MayaAttributeError:
+            # attributes of the shape are found on the transform like pymel
+            for shape in self.getShapes():
+                if shape._spec(name.split("[")[0]) is not None:
+                    return shape.attr(name)
+            raise
+
+    def hasAttr(self, name, checkShape=True):
+        if self._spec(name) is not None:
+            return True
+        return checkShape and any(x._spec(name) is not None for x in self.getShapes())
+
+    def fullPath(self):
+        names = list()
+        node = self
+        while node is not None:
+            names.append(node._name)
+            node = node._parent
+        return "|" + "|".join(reversed(names))
+
+    def longName(self):
+        return self.fullPath()
+
+    def getParent(self, generations=1):
+        """
+        :param generations: -1 is the top node, self if self is the top node
+        :return: node or None
+        """
+        if generations < 0:
+            nodes = [self] + self.getAllParents()
+            return nodes[generations] if -generations <= len(nodes) else None
+        node = self
+        for _ in range(generations):
+            if node is None:
+                return None
+            node = node._parent
+        return node
+
+    def getAllParents(self):
+        parents = list()
+        node = self._parent
+        while node is not None:
+            parents.append(node)
+            node = node._parent
+        return parents
+
+    def getChildren(self, type=None):
+        return [x for x in self._children if type is None or x.isType(type)]
+
+    def listRelatives(self, children=False, shapes=False, allDescendents=False, ad=False, type=None, parent=False):
+        if parent:
+            return [self._parent] if self._parent is not None else list()
+        if allDescendents or ad:
+            nodes = list(_walk(self))[1:]
+        else:
+            nodes = list(self._children)
+        if shapes:
+            nodes = [x for x in nodes if isinstance(x, Shape)]
+        if type is not None:
+            nodes = [x for x in nodes if x.isType(type)]
+        return nodes
+
+    def getShapes(self):
+        return [x for x in self._children if isinstance(x, Shape)]
+
+    def getShape(self):
+        shapes = self.getShapes()
+        return shapes[0] if shapes else None
+
+    def addChild(self, child, **kwargs):
+        """pymel addChild, a shape with add=True and shape=True is moved under this node
+
+        :param child: node
+        :return: child
+        """
+        _scene.parent(child, self, **kwargs)
+        return child
+
+    def getMatrix(self, worldSpace=False):
+        if not worldSpace or self._parent is None:
+            return Matrix()
+        return self._parent.getMatrix(worldSpace=True)
+
+
+_CHANNEL_SPECS = [_TRANSFORM_SPECS[x] for x in _TRANSFORM_SPECS["translate"].children
+                  + _TRANSFORM_SPECS["rotate"].children
+                  + _TRANSFORM_SPECS["scale"].children]
+
+_CHANNELS = ("translate", "rotate", "scale") + tuple(x.name for x in _CHANNEL_SPECS)
+
+
+class Transform(DagNode):
+    """translate, rotate and scale channels are the node matrix"""
+
+    _type_specs = _TRANSFORM_SPECS
+    _type_aliases = _aliases(_TRANSFORM_SPECS)
+    _inherited = ("dependNode", "dagNode", "transform")
+
+    def _channels(self):
+        attrs = self._attrs
+        if any(x in attrs and attrs[x].inputs for x in _CHANNELS):
+            translate = self._get(_TRANSFORM_SPECS["translate"])
+            rotate = self._get(_TRANSFORM_SPECS["rotate"])
+            scale = self._get(_TRANSFORM_SPECS["scale"])
+        else:
+            # unconnected channels are read without attribute lookups
+            values = [attrs[x.name].value if x.name in attrs else x.default for x in _CHANNEL_SPECS]
+            translate, rotate, scale = values[0:3], values[3:6], values[6:9]
+        order = attrs["rotateOrder"].value if "rotateOrder" in attrs else 0
+        return translate, [math.radians(x) for x in rotate], scale, order
+
+    def getMatrix(self, worldSpace=False):
+        local = _compose(*self._channels())
+        if not worldSpace or self._parent is None:
+            return local
+        return local * self._parent.getMatrix(worldSpace=True)
+
+    def setMatrix(self, m, worldSpace=False):
+        m = Matrix(m)
+        if worldSpace and self._parent is not None:
+            m = m * self._parent.getMatrix(worldSpace=True).inverse()
+        translate, rotate, scale = _decompose(m, self._get(_TRANSFORM_SPECS["rotateOrder"]))
+        # like MFnTransform, locked channels are set
+        values = list(translate) + [math.degrees(x) for x in rotate] + list(scale)
+        for spec, value in zip(_CHANNEL_SPECS, values):
+            self._data(spec).value = value
+
+    def setTransformation(self, m):
+        self.setMatrix(m)
+
+    def getTransformation(self):
+        return TransformationMatrix(self.getMatrix(), order=self._get(_TRANSFORM_SPECS["rotateOrder"]))
+
+    def getTranslation(self, space="object"):
+        if space == "world":
+            return Vector(self.getMatrix(worldSpace=True).data[3][:3])
+        return self._get(_TRANSFORM_SPECS["translate"])
+
+    def setTranslation(self, vector, space="object"):
+        vector = Vector(vector)
+        if space == "world" and self._parent is not None:
+            vector = Matrix(self._parent.getMatrix(worldSpace=True).inverse())._transform(vector, True)
+        self._set(_TRANSFORM_SPECS["translate"], None, vector)
+
+    def getRotation(self, space="object"):
+        if space == "world":
+            return TransformationMatrix(self.getMatrix(worldSpace=True)).getRotation()
+        return self._get(_TRANSFORM_SPECS["rotate"])
+
+    def setRotation(self, rotation, space="object"):
+        self._set(_TRANSFORM_SPECS["rotate"], None, rotation)
+
+    def getScale(self):
+        return list(self._get(_TRANSFORM_SPECS["scale"]))
+
+    def setScale(self, scale):
+        self._set(_TRANSFORM_SPECS["scale"], None, scale)
+
+
+class Joint(Transform):
+    """joint, jointOrient is kept but not evaluated"""
+
+    _type_specs = _JOINT_SPECS
+    _type_aliases = _aliases(_JOINT_SPECS)
+    _inherited = ("dependNode", "dagNode", "transform", "joint")
+
+
+class Shape(DagNode):
+    """shape, world matrix of its transform"""
+
+    _inherited = ("dependNode", "dagNode", "shape")
+
+
+class NurbsCurve(Shape):
+    """cvs are controlPoints, connected controlPoints move the cvs"""
+
+    _type_specs = _CURVE_SPECS
+    _type_aliases = _aliases(_CURVE_SPECS)
+    _inherited = ("dependNode", "dagNode", "shape", "curveShape", "nurbsCurve")
+
+    def __init__(self, node_type, name):
+        super(NurbsCurve, self).__init__(node_type, name)
+        self._degree = 1
+        self._form = "open"
+        self._knots = list()
+
+    def degree(self):
+        return self._degree
+
+    def form(self):
+        return self._form
+
+    def getKnots(self):
+        return list(self._knots)
+
+    def numCVs(self):
+        return len(self._indices(_CURVE_SPECS["controlPoints"]))
+
+    def getCVs(self, space="preTransform"):
+        points = [Vector(x) for x in self._get(_CURVE_SPECS["controlPoints"])]
+        if space == "world":
+            m = self.getMatrix(worldSpace=True)
+            points = [m._transform(x, True) for x in points]
+        return points
+
+    def setCVs(self, points, space="preTransform"):
+        if space == "world":
+            m = self.getMatrix(worldSpace=True).inverse()
+            points = [m._transform(Vector(x), True) for x in points]
+        spec = _CURVE_SPECS["controlPoints"]
+        for index, point in enumerate(points):
+            self._set(spec, index, tuple(Vector(point)))
+
+
+class Network(DependNode):
+    _type_specs = _NETWORK_SPECS
+    _type_aliases = _aliases(_NETWORK_SPECS)
+
+
+class MultMatrix(DependNode):
+    _type_specs = _MULT_MATRIX_SPECS
+    _type_aliases = _aliases(_MULT_MATRIX_SPECS)
+
+
+class DecomposeMatrix(DependNode):
+    _type_specs = _DECOMPOSE_SPECS
+    _type_aliases = _aliases(_DECOMPOSE_SPECS)
+
+
+class ComposeMatrix(DependNode):
+    _type_specs = _COMPOSE_SPECS
+    _type_aliases = _aliases(_COMPOSE_SPECS)
+
+
+class InverseMatrix(DependNode):
+    _type_specs = _INVERSE_SPECS
+    _type_aliases = _aliases(_INVERSE_SPECS)
+
+
+NODE_TYPES = OrderedDict([("transform", Transform),
+                          ("joint", Joint),
+                          ("nurbsCurve", NurbsCurve),
+                          ("network", Network),
+                          ("multMatrix", MultMatrix),
+                          ("decomposeMatrix", DecomposeMatrix),
+                          ("composeMatrix", ComposeMatrix),
+                          ("inverseMatrix", InverseMatrix)])
+
+
+def _walk(node):
+    """node and its dag descendants, parents first"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node._children))
+
+
+def _disconnect_all(node, specs=None):
+    for spec in specs or [node._spec(x) for x in list(node._attrs)]:
+        if spec is None:
+            continue
+        plug = Attribute(node, spec)
+        for source in plug._plugs("inputs"):
+            disconnectAttr(source, plug)
+        for destination in plug._plugs("outputs"):
+            disconnectAttr(Attribute(node, spec, _output_index(node, spec, destination)), destination)
+
+
+def _output_index(node, spec, destination):
+    data = node._attrs[spec.name]
+    for index, plugs in data.outputs.items():
+        if destination in plugs:
+            return index
+    return None
+
+
+#############################################
+# SCENE
+#############################################
+
+
+class Scene(object):
+    """nodes by name, creation callbacks and selection"""
+
+    def __init__(self):
+        self.nodes = OrderedDict()
+        self.selection = list()
+        self.callbacks = OrderedDict()
+        self.counters = dict()
+
+    def unique_name(self, name):
+        if name not in self.nodes:
+            return name
+        base = name.rstrip("0123456789")
+        number = self.counters.get(base, 1)
+        while "{0}{1}".format(base, number) in self.nodes:
+            number += 1
+        self.counters[base] = number + 1
+        return "{0}{1}".format(base, number)
+
+    def create(self, node_type, name=None, parent=None):
+        cls = NODE_TYPES.get(node_type)
+        if cls is None:
+            raise RuntimeError("Unknown object type: {0}".format(node_type))
+        if issubclass(cls, Shape) and parent is None:
+            parent = self.create("transform")
+        name = self.unique_name(name or "{0}1".format(node_type))
+        node = cls(node_type, name)
+        self.nodes[name] = node
+        if parent is not None:
+            parent = PyNode(parent)
+            node._parent = parent
+            parent._children.append(node)
+        for callback in list(self.callbacks.values()):
+            callback(node)
+        return node
+
+    def rename(self, node, name):
+        if name == node._name:
+            return node
+        del self.nodes[node._name]
+        node._name = self.unique_name(name)
+        self.nodes[node._name] = node
+        return node
+
+    def delete(self, node):
+        if node._deleted:
+            return
+        nodes = list(_walk(node)) if isinstance(node, DagNode) else [node]
+        if isinstance(node, DagNode) and node._parent is not None:
+            node._parent._children.remove(node)
+            node._parent = None
+        for item in nodes:
+            _disconnect_all(item)
+            item._deleted = True
+            self.nodes.pop(item._name, None)
+        self.selection = [x for x in self.selection if not x._deleted]
+
+    def parent(self, child, parent=None, world=False, relative=False, add=False, shape=False, **kwargs):
+        child = PyNode(child)
+        parent = None if world else PyNode(parent) if parent is not None else None
+        if isinstance(child, Shape) and parent is None:
+            raise RuntimeError("a shape needs a transform parent : {0}".format(child))
+        node = parent
+        while node is not None:
+            if node is child:
+                raise RuntimeError("{0} can not be parented under itself".format(child))
+            node = node._parent
+        world_matrix = None
+        if isinstance(child, Transform) and not relative:
+            world_matrix = child.getMatrix(worldSpace=True)
+        if child._parent is not None:
+            child._parent._children.remove(child)
+        child._parent = parent
+        if parent is not None:
+            parent._children.append(child)
+        if world_matrix is not None:
+            child.setMatrix(world_matrix, worldSpace=True)
+        return child
+
+
+_scene = Scene()
+
+
+def get_scene():
+    """
+    :return: current Scene
+    """
+    return _scene
+
+
+def newFile(force=False, **kwargs):
+    """new empty scene, node added callbacks are kept"""
+    global _scene
+    callbacks = _scene.callbacks
+    _scene = Scene()
+    _scene.callbacks = callbacks
+
+
+def snapshot():
+    """
+    :return: copy of the current scene without callbacks
+    """
+    callbacks = _scene.callbacks
+    _scene.callbacks = OrderedDict()
+    try:
+        return copy.deepcopy(_scene)
+    finally:
+        _scene.callbacks = callbacks
+
+
+def restore(data):
+    """current scene from a copy of a snapshot, node added callbacks are kept
+
+    :param data: snapshot result
+    """
+    global _scene
+    callbacks = _scene.callbacks
+    _scene = copy.deepcopy(data)
+    _scene.callbacks = callbacks
+
+
+def _flatten(args):
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            for x in _flatten(arg):
+                yield x
+        else:
+            yield arg
+
+
+def _nodes(args):
+    for arg in _flatten(args):
+        yield PyNode(arg)
+
+
+def PyNode(obj):
+    """
+    :param obj: node, Attribute, "node" or "node.attr"
+    :return: node or Attribute
+    """
+    if isinstance(obj, (DependNode, Attribute)):
+        if obj.exists():
+            return obj
+        raise MayaNodeError("node is deleted : {0}".format(obj))
+    name = str(obj)
+    node_name, dot, attr = name.partition(".")
+    node = _scene.nodes.get(node_name.split("|")[-1])
+    if node is None:
+        raise MayaNodeError("No object matches name: {0}".format(name))
+    return node.attr(attr) if dot else node
+
+
+def createNode(nodeType, name=None, n=None, parent=None, p=None, **kwargs):
+    return _scene.create(nodeType, name or n, parent or p)
+
+
+def objExists(name):
+    try:
+        PyNode(name)
+    except (MayaNodeError, MayaAttributeError):
+        return False
+    return True
+
+
+def delete(*args, **kwargs):
+    for node in list(_nodes(args)):
+        _scene.delete(node)
+
+
+def parent(*args, **kwargs):
+    """parent(child, ..., parent) or parent(child, ..., world=True)"""
+    nodes = list(_nodes(args))
+    if kwargs.get("world") or kwargs.get("w"):
+        kwargs["world"] = True
+        return [_scene.parent(x, None, **kwargs) for x in nodes]
+    return [_scene.parent(x, nodes[-1], **kwargs) for x in nodes[:-1]]
+
+
+def rename(node, name):
+    return PyNode(node).rename(name)
+
+
+def ls(*args, **kwargs):
+    """ls with dagObjects(dag), type, selection(sl) and transforms flags"""
+    if kwargs.get("selection", kwargs.get("sl")):
+        nodes = list(_scene.selection)
+    elif args:
+        # missing names are skipped like maya
+        nodes = list(_nodes([x for x in _flatten(args) if objExists(x)]))
+    else:
+        nodes = list(_scene.nodes.values())
+    if kwargs.get("dagObjects", kwargs.get("dag")):
+        nodes = [y for x in nodes if isinstance(x, DagNode) for y in _walk(x)]
+    node_type = kwargs.get("type", kwargs.get("typ"))
+    if kwargs.get("transforms", kwargs.get("tr")):
+        node_type = "transform"
+    if node_type is not None:
+        types = node_type if isinstance(node_type, (list, tuple)) else [node_type]
+        nodes = [x for x in nodes if any(x.isType(t) for t in types)]
+    return nodes
+
+
+def select(*args, **kwargs):
+    nodes = list(_nodes(args))
+    if kwargs.get("clear", kwargs.get("cl")):
+        _scene.selection = list()
+    elif kwargs.get("add"):
+        _scene.selection.extend(x for x in nodes if x not in _scene.selection)
+    elif kwargs.get("deselect", kwargs.get("d")):
+        _scene.selection = [x for x in _scene.selection if x not in nodes]
+    else:
+        _scene.selection = nodes
+
+
+def selected(type=None, **kwargs):
+    return [x for x in _scene.selection if type is None or x.isType(type)]
+
+
+def curve(n=None, name=None, d=3, degree=None, p=None, point=None, per=False, periodic=False, k=None, knot=None,
+          **kwargs):
+    """nurbs curve transform
+
+    :return: Transform
+    """
+    points = p or point or list()
+    node = _scene.create("transform", name=n or name or "curve1")
+    shape = _scene.create("nurbsCurve", name="{0}Shape".format(node._name), parent=node)
+    shape._degree = degree or d
+    shape._form = "periodic" if per or periodic else "open"
+    shape._knots = [float(x) for x in (k or knot or list())]
+    shape.setCVs(points)
+    return node
+
+
+def setAttr(name, *args, **kwargs):
+    _as_plug(name).set(*args, **kwargs)
+
+
+def getAttr(name, **kwargs):
+    return _as_plug(name).get()
+
+
+#############################################
+# NAMESPACES
+#############################################
+
+
+class datatypes(object):
+    """pymel.core.datatypes"""
+    Vector = Vector
+    Point = Vector
+    Matrix = Matrix
+    TransformationMatrix = TransformationMatrix
+    Quaternion = Quaternion
+    EulerRotation = EulerRotation
+
+
+class nodetypes(object):
+    """pymel.core.nodetypes"""
+    DependNode = DependNode
+    DagNode = DagNode
+    Transform = Transform
+    Joint = Joint
+    Shape = Shape
+    NurbsCurve = NurbsCurve
+    Network = Network
+
+
+class util(object):
+    """pymel.util"""
+    math = math
+    cross = staticmethod(cross)
+
+
+_callback_ids = itertools.count(1)
+
+
+class _MDGMessage(object):
+
+    @staticmethod
+    def addNodeAddedCallback(func, nodeType="dependNode", clientData=None):
+        callback_id = next(_callback_ids)
+        _scene.callbacks[callback_id] = lambda node: node.isType(nodeType) and func(node, clientData)
+        return callback_id
+
+
+class _MMessage(object):
+
+    @staticmethod
+    def removeCallback(callback_id):
+        _scene.callbacks.pop(callback_id, None)
+
+
+class om(object):
+    """maya.api.OpenMaya"""
+    MVector = Vector
+    MPoint = Vector
+    MMatrix = Matrix
+    MTransformationMatrix = TransformationMatrix
+    MQuaternion = Quaternion
+    MEulerRotation = EulerRotation
+    MDGMessage = _MDGMessage
+    MMessage = _MMessage
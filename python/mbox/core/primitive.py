@@ -1,7 +1,7 @@
 # -*- coding:utf-8 -*-
 
 # maya
-import pymel.core as pm
+from mbox.core.scene import pm
 
 # mbox
 from mbox.core import transform
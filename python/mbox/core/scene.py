@@ -0,0 +1,96 @@
+# -*- coding:utf-8 -*-
+"""scene backend module
+
+mbox modules import the scene api from here instead of pymel and OpenMaya.
+maya is pymel.core and maya.api.OpenMaya, memory is mbox.core.memory, a
+pure python scene for building, profiling and testing without maya.
+the backend is MBOX_SCENE (maya, memory), maya if pymel can be imported.
+
+    MBOX_SCENE=memory python -c "from mbox.lego import lib; ..."
+
+    from mbox.core.scene import pm, om, datatypes
+"""
+
+#
+import os
+
+BACKENDS = ("maya", "memory")
+
+
+def _get_backend():
+    name = os.environ.get("MBOX_SCENE")
+    if name:
+        if name not in BACKENDS:
+            raise ValueError("unknown scene backend : {0}, {1}".format(name, BACKENDS))
+        return name
+    try:
+        import pymel.core  # noqa: F401
+    except ImportError:
+        return "memory"
+    return "maya"
+
+
+BACKEND = _get_backend()
+
+if BACKEND == "maya":
+    import pymel.core as pm
+    import pymel.util as pmu
+    from pymel.core import datatypes
+    from maya.api import OpenMaya as om
+else:
+    from mbox.core import memory as pm
+    pmu = pm.util
+    datatypes = pm.datatypes
+    om = pm.om
+
+
+def is_headless():
+    """
+    :return: True if the scene is the memory scene
+    """
+    return BACKEND == "memory"
+
+
+def new_scene():
+    """empty scene, unsaved changes are discarded"""
+    pm.newFile(force=True)
+
+
+def snapshot(path=None):
+    """scene state to restore later
+
+    :param path: maya scene file of the snapshot, maya backend only
+    :return: snapshot, path on maya and a scene copy on memory
+    """
+    if BACKEND == "memory":
+        return pm.snapshot()
+    if not path:
+        raise ValueError("maya scene snapshot needs a path")
+    pm.exportAll(path, force=True, type="mayaAscii")
+    return path
+
+
+def is_modified():
+    """
+    :return: True if the maya scene has unsaved changes, the memory scene is never saved
+    """
+    if BACKEND == "memory":
+        return False
+    from maya import cmds
+    return bool(cmds.file(query=True, modified=True))
+
+
+def restore(data, force=False):
+    """
+    :param data: snapshot result, the scene name is kept on maya
+    :param force: discard unsaved changes of the maya scene
+    :raises: RuntimeError, the maya scene has unsaved changes and force is False
+    """
+    if BACKEND == "memory":
+        pm.restore(data)
+        return
+    if not force and is_modified():
+        raise RuntimeError("scene has unsaved changes, restore with force discards them")
+    name = pm.sceneName()
+    pm.openFile(data, force=True)
+    pm.renameFile(name or "untitled")
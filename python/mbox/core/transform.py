@@ -4,7 +4,7 @@
 import math
 
 # maya
-import pymel.core as pm
+from mbox.core.scene import pm
 
 # mbox
 from mbox.core import vector
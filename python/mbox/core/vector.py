@@ -4,8 +4,7 @@
 import math
 
 # maya
-from maya.api.OpenMaya import MTransformationMatrix, MMatrix, MVector, MQuaternion
-import pymel.core as pm
+from mbox.core.scene import om, pm
 
 
 def get_distance(input1, input2):
@@ -16,8 +15,8 @@ def get_distance(input1, input2):
     :return:
     """
     # Handles MVector case
-    if (isinstance(input1, MVector)
-            and isinstance(input2, MVector)):
+    if (isinstance(input1, om.MVector)
+            and isinstance(input2, om.MVector)):
         _vector = input2 - input1
     # Handles PyNodes case
     elif (isinstance(input1, pm.nodetypes.Transform)
@@ -53,9 +52,9 @@ def get_3point_normal(input1, input2, input3):
     # Handles list case
     elif (isinstance(input1, list) and isinstance(input2, list)
           and isinstance(input3, list)):
-        input1 = MVector(input1[0], input1[1], input1[2])
-        input2 = MVector(input2[0], input2[1], input2[2])
-        input3 = MVector(input3[0], input3[1], input3[2])
+        input1 = om.MVector(input1[0], input1[1], input1[2])
+        input2 = om.MVector(input2[0], input2[1], input2[2])
+        input3 = om.MVector(input3[0], input3[1], input3[2])
 
     # Calculates normal vector
     vector_a = input2 - input1
@@ -102,15 +101,15 @@ def linear_interpolation(input1, input2, blend=0.5):
         input2 = input2.getTranslation()
     # Handles list case
     elif isinstance(input1, list) and isinstance(input2, list):
-        input1 = MVector(input1[0], input1[1], input1[2])
-        input2 = MVector(input2[0], input2[1], input2[2])
+        input1 = om.MVector(input1[0], input1[1], input1[2])
+        input2 = om.MVector(input2[0], input2[1], input2[2])
 
     # Calculates interpolated vector
     vector = input2 - input1
     vector *= blend
     vector += input1
 
-    return MVector(vector[0], vector[1], vector[2])
+    return om.MVector(vector[0], vector[1], vector[2])
 
 
 def get_transposed_vector(vector, origin, result, inverse=False):
@@ -155,13 +154,13 @@ def rotate_vector_by_quaternion(vector, axis, radius):
     sa = math.sin(radius / 2.0)
     ca = math.cos(radius / 2.0)
 
-    q1 = MQuaternion(vector.x, vector.y, vector.z, 0)
-    q2 = MQuaternion(axis.x * sa, axis.y * sa, axis.z * sa, ca)
-    q2n = MQuaternion(-axis.x * sa, -axis.y * sa, -axis.z * sa, ca)
+    q1 = om.MQuaternion(vector.x, vector.y, vector.z, 0)
+    q2 = om.MQuaternion(axis.x * sa, axis.y * sa, axis.z * sa, ca)
+    q2n = om.MQuaternion(-axis.x * sa, -axis.y * sa, -axis.z * sa, ca)
     q = q2 * q1
     q *= q2n
 
-    out = MVector(q.x, q.y, q.z)
+    out = om.MVector(q.x, q.y, q.z)
 
     return out
 
@@ -177,12 +176,12 @@ class Blade(object):
              for j in range(len(t.data))
              for i in range(len(t.data[0]))]
 
-        m = MMatrix(d)
-        m = MTransformationMatrix(m)
+        m = om.MMatrix(d)
+        m = om.MTransformationMatrix(m)
 
-        x = MVector(1, 0, 0).rotateBy(m.rotation())
-        y = MVector(0, 1, 0).rotateBy(m.rotation())
-        z = MVector(0, 0, 1).rotateBy(m.rotation())
+        x = om.MVector(1, 0, 0).rotateBy(m.rotation())
+        y = om.MVector(0, 1, 0).rotateBy(m.rotation())
+        z = om.MVector(0, 0, 1).rotateBy(m.rotation())
 
         self.x = pm.datatypes.Vector(x.x, x.y, x.z)
         self.y = pm.datatypes.Vector(y.x, y.y, y.z)
@@ -0,0 +1,290 @@
+# -*- coding:utf-8 -*-
+"""batch build module
+
+builds many blueprint files, every rig in its own worker process with a new
+scene. workers are python processes of the current interpreter (the mayapy
+of the running maya) on the same scene backend, at most workers run at once.
+a rig that raises, crashes or times out is a failed rig, the others keep
+building.
+
+every rig writes to output/{rig}
+    result.json  - success, error, times and node count
+    build.log    - build log, stdout and stderr of the worker
+    profile.json - profiler report
+    {rig}.ma     - built scene, maya backend only
+output/report.json is the aggregated report of every rig.
+
+    report = batch.build(["a.json", "b.json"], "/tmp/rigs", workers=4)
+
+    mayapy -m mbox.lego.batch a.json b.json --output /tmp/rigs --workers 4
+"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import fileio
+
+#
+import os
+import sys
+import time
+import logging
+import argparse
+import subprocess
+import traceback
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+logger = logging.getLogger(__name__)
+
+RESULT_FILE = "result.json"
+LOG_FILE = "build.log"
+PROFILE_FILE = "profile.json"
+REPORT_FILE = "report.json"
+
+# poll interval of a worker process with a timeout
+POLL = 0.1
+
+
+def _write_json(path, data):
+    fileio.write_atomic(path, json.dumps(data, indent=2))
+
+
+def _read_json(path):
+    with open(path, "r") as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def get_rig_names(paths):
+    """output directory names, blueprint file names made unique with a number
+
+    :param paths: blueprint files
+    :return: [name, ...]
+    """
+    names = list()
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        unique = name
+        number = 1
+        while unique in names:
+            unique = "{0}_{1}".format(name, number)
+            number += 1
+        names.append(unique)
+    return names
+
+
+def build_file(path, output, step="all"):
+    """build one blueprint file into a new scene, runs in the worker process
+
+    :param path: blueprint file
+    :param output: rig output directory
+    :param step: lego step
+    :return: OrderedDict result, saved to output/result.json
+    """
+    from mbox.core import scene
+    from mbox.lego import blueprint, lego, profiler as build_profiler
+
+    result = OrderedDict()
+    result["blueprint"] = os.path.abspath(path)
+    result["backend"] = scene.BACKEND
+    result["success"] = False
+    result["error"] = None
+    result["times"] = OrderedDict()
+    result["nodes"] = None
+    result["scene"] = None
+
+    start = time.time()
+    try:
+        scene.new_scene()
+        bp = blueprint.get_blueprint_from_file(path)
+        result["times"]["load"] = time.time() - start
+
+        profiler = build_profiler.Profiler()
+        lego.lego(bp, step, profiler=profiler)
+        for name, record in profiler.steps.items():
+            result["times"][name] = record["time"]
+        report = profiler.get_report()
+        if report["nodesCounted"]:
+            result["nodes"] = sum(record["nodes"] for record in report["steps"].values())
+        profiler.save(os.path.join(output, PROFILE_FILE))
+
+        if not scene.is_headless():
+            saved = time.time()
+            result["scene"] = os.path.join(output, "{0}.ma".format(os.path.basename(output)))
+            scene.pm.saveAs(result["scene"], force=True, type="mayaAscii")
+            result["times"]["save"] = time.time() - saved
+        result["success"] = True
+    except Exception as e:
+        logger.error(traceback.format_exc())
+        result["error"] = "{0}: {1}".format(type(e).__name__, e)
+    result["times"]["total"] = time.time() - start
+    _write_json(os.path.join(output, RESULT_FILE), result)
+    return result
+
+
+def _get_env():
+    from mbox.core import scene
+
+    env = os.environ.copy()
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env["PYTHONPATH"] = os.pathsep.join([root] + [x for x in [env.get("PYTHONPATH")] if x])
+    env["MBOX_SCENE"] = scene.BACKEND
+    return env
+
+
+def _wait(process, timeout):
+    if timeout is None:
+        return process.wait()
+    end = time.time() + timeout
+    while process.poll() is None:
+        if time.time() > end:
+            process.kill()
+            process.wait()
+            return None
+        time.sleep(POLL)
+    return process.returncode
+
+
+def _run_worker(args):
+    """build one rig in a worker process
+
+    :param args: (blueprint file, rig output directory, step, timeout, executable)
+    :return: OrderedDict result
+    """
+    path, output, step, timeout, executable = args
+    if not os.path.isdir(output):
+        os.makedirs(output)
+    result_path = os.path.join(output, RESULT_FILE)
+    if os.path.exists(result_path):
+        os.remove(result_path)
+
+    start = time.time()
+    command = [executable, "-m", "mbox.lego.batch", "--worker", path, "--output", output, "--step", step]
+    with open(os.path.join(output, LOG_FILE), "wb") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, env=_get_env())
+        code = _wait(process, timeout)
+
+    if os.path.exists(result_path):
+        result = _read_json(result_path)
+    else:
+        # the worker died before writing a result
+        result = OrderedDict()
+        result["blueprint"] = os.path.abspath(path)
+        result["success"] = False
+        if code is None:
+            result["error"] = "timeout after {0}s".format(timeout)
+        else:
+            result["error"] = "worker exit code {0}".format(code)
+        result["times"] = OrderedDict()
+    result["exitCode"] = code
+    result["output"] = output
+    result["log"] = os.path.join(output, LOG_FILE)
+    result["wallTime"] = time.time() - start
+    logger.info("{0} {1} {2:.2f}s".format("built" if result["success"] else "failed",
+                                          path,
+                                          result["wallTime"]))
+    return result
+
+
+def get_executable():
+    """python of the workers, the current interpreter or the mayapy of the
+    running maya, sys.executable of interactive maya is the maya binary
+
+    :return: path
+    """
+    from mbox.core import scene
+    executable = sys.executable
+    name = os.path.splitext(os.path.basename(executable))[0].lower()
+    if scene.BACKEND != "maya" or name.startswith(("mayapy", "python")):
+        return executable
+    directory = os.path.dirname(executable)
+    mayapy = "mayapy.exe" if os.name == "nt" else "mayapy"
+    # bin/maya(.exe) on linux and windows, Maya.app/Contents/MacOS/Maya on macos
+    for path in (os.path.join(directory, mayapy), os.path.join(directory, os.pardir, "bin", mayapy)):
+        if os.path.isfile(path):
+            return os.path.normpath(path)
+    raise RuntimeError("mayapy is not found next to {0}, pass executable".format(executable))
+
+
+def build(paths, output, workers=1, step="all", timeout=None, executable=None):
+    """build blueprint files in worker processes
+
+    :param paths: blueprint files
+    :param output: output directory, output/{rig} of every rig and output/report.json
+    :param workers: worker process count
+    :param step: lego step
+    :param timeout: seconds of one rig, None is no limit
+    :param executable: python of the workers, default get_executable()
+    :return: OrderedDict report
+    """
+    output = os.path.abspath(output)
+    if not os.path.isdir(output):
+        os.makedirs(output)
+    executable = executable or get_executable()
+    args = [(os.path.abspath(path), os.path.join(output, name), step, timeout, executable)
+            for path, name in zip(paths, get_rig_names(paths))]
+
+    start = time.time()
+    pool = ThreadPool(max(1, min(workers, len(args)))) if args else None
+    try:
+        results = pool.map(_run_worker, args, chunksize=1) if pool else list()
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    report = OrderedDict()
+    report["count"] = len(results)
+    report["succeeded"] = len([x for x in results if x["success"]])
+    report["failed"] = [x["blueprint"] for x in results if not x["success"]]
+    report["workers"] = workers
+    report["step"] = step
+    report["wallTime"] = time.time() - start
+    report["buildTime"] = sum(x["wallTime"] for x in results)
+    report["rigs"] = OrderedDict((os.path.basename(x["output"]), x) for x in results)
+    _write_json(os.path.join(output, REPORT_FILE), report)
+    return report
+
+
+def get_summary(report):
+    """readable lines of a report
+
+    :param report: build report
+    :return: [line, ...]
+    """
+    line = "{0:<32} {1:<8} {2:>10.2f}s {3}"
+    lines = list()
+    for name, result in report["rigs"].items():
+        lines.append(line.format(name,
+                                 "ok" if result["success"] else "failed",
+                                 result["wallTime"],
+                                 result["error"] or ""))
+    lines.append("{0} of {1} rigs built, {2:.2f}s with {3} workers".format(
+        report["succeeded"], report["count"], report["wallTime"], report["workers"]))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="mbox.lego.batch", description=__doc__.splitlines()[0])
+    parser.add_argument("blueprints", nargs="+")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--step", default="all")
+    parser.add_argument("--timeout", type=float)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    if args.worker:
+        result = build_file(args.blueprints[0], args.output, args.step)
+        return 0 if result["success"] else 1
+
+    report = build(args.blueprints, args.output, args.workers, args.step, args.timeout)
+    for line in get_summary(report):
+        sys.stdout.write(line + "\n")
+    return 0 if not report["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
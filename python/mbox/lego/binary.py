@@ -0,0 +1,287 @@
+# -*- coding:utf-8 -*-
+"""binary blueprint module
+
+compact blueprint container
+
+    MAGIC | header size (uint64) | header (compact json) | transforms (float64 array)
+
+the header is the blueprint json without block transforms, all transforms are
+stored in one contiguous little endian float64 array. the array is memory
+mapped on load (copy on write, the file is never written through) and every
+block gets a TransformView over its matrices.
+transforms which are not a list of 4x4 float matrices stay in the header,
+so a binary blueprint always saves back to the same json.
+"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import fileio
+
+#
+import os
+import sys
+import mmap
+import array
+import struct
+import logging
+import weakref
+from collections import OrderedDict
+
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:
+    from collections import Mapping, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MBOXBP\x00\x01"
+
+HEADER_SIZE = struct.Struct("<Q")
+
+MATRIX_SIZE = 16
+
+# memoryview.cast is python 3 only, big endian machines read a swapped copy
+_MAPPED = hasattr(memoryview, "cast") and sys.byteorder == "little"
+
+# mapped buffers, released before their file is overwritten
+_buffers = weakref.WeakSet()
+
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class _Buffer(object):
+    """float64 data of a binary blueprint, shared by its TransformViews"""
+
+    def __init__(self, path, offset):
+        self.path = _key(path)
+        self.mmap = None
+        # write count, content hashes of the views compare it
+        self.writes = 0
+        with open(path, "rb") as f:
+            if _MAPPED:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+                self.data = memoryview(self.mmap)[offset:].cast("d")
+            else:
+                f.seek(offset)
+                self.data = array.array("d")
+                if sys.version_info[0] == 2:
+                    self.data.fromstring(f.read())
+                else:
+                    self.data.frombytes(f.read())
+                if sys.byteorder != "little":
+                    self.data.byteswap()
+
+    def detach(self):
+        """copy data in memory and close the mapping"""
+        if self.mmap is None:
+            return
+        data = memoryview(bytearray(self.data.tobytes())).cast("d")
+        self.data.release()
+        self.data = data
+        self.mmap.close()
+        self.mmap = None
+        logger.debug("binary blueprint detached : {0}".format(self.path))
+
+
+class TransformView(object):
+    """block transforms, list like view of 4x4 matrices in a binary blueprint
+
+    reading returns plain lists, assigning a matrix writes the mapped memory only.
+    length is fixed, copies are plain lists.
+    """
+    __slots__ = ("_buffer", "_offset", "_count")
+
+    def __init__(self, buffer, offset, count):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def _index(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("transform index out of range")
+        return self._offset + index * MATRIX_SIZE
+
+    def _matrix(self, start):
+        values = self._buffer.data[start:start + MATRIX_SIZE].tolist()
+        return [values[0:4], values[4:8], values[8:12], values[12:16]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[x] for x in range(*index.indices(self._count))]
+        return self._matrix(self._index(index))
+
+    def __setitem__(self, index, matrix):
+        start = self._index(index)
+        values = array.array("d", [float(value) for row in matrix for value in row])
+        if len(values) != MATRIX_SIZE:
+            raise ValueError("transform is not a 4x4 matrix")
+        self._buffer.data[start:start + MATRIX_SIZE] = values
+        self._buffer.writes += 1
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._matrix(self._offset + index * MATRIX_SIZE)
+
+    def __eq__(self, other):
+        if isinstance(other, TransformView):
+            other = other.tolist()
+        return isinstance(other, list) and self.tolist() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    @property
+    def writes(self):
+        """write count of the buffer"""
+        return self._buffer.writes
+
+    def __copy__(self):
+        return self.tolist()
+
+    def __deepcopy__(self, memo):
+        return self.tolist()
+
+    def __repr__(self):
+        return "TransformView({0!r})".format(self.tolist())
+
+    def tolist(self):
+        """transforms as plain lists
+
+        :return: [[[float, ...], ...], ...]
+        """
+        return list(self)
+
+
+def get_values(transforms):
+    """flat float values of transforms, None if they can not be stored losslessly
+
+    :param transforms: block transforms
+    :return: [float, ...] or None
+    """
+    if isinstance(transforms, TransformView):
+        return [value for matrix in transforms for row in matrix for value in row]
+    if not isinstance(transforms, list):
+        return None
+    values = list()
+    for matrix in transforms:
+        if not isinstance(matrix, list) or len(matrix) != 4:
+            return None
+        for row in matrix:
+            if not isinstance(row, list) or len(row) != 4 or any(type(x) is not float for x in row):
+                return None
+            values.extend(row)
+    return values
+
+
+def dumps(bp):
+    """binary blueprint
+
+    :param bp: root blueprint
+    :return: bytes
+    """
+    header = OrderedDict()
+    header["transforms"] = table = list()
+    header["blueprint"] = root = OrderedDict(bp)
+    values = array.array("d")
+
+    if bp.get("blocks"):
+        root["blocks"] = list()
+        for index, block in enumerate(bp["blocks"]):
+            transforms = get_values(block.get("transforms"))
+            if transforms is not None:
+                block = OrderedDict(block)
+                table.append([index, len(values), len(transforms) // MATRIX_SIZE])
+                block["transforms"] = list()
+                values.extend(transforms)
+            root["blocks"].append(block)
+
+    text = json.dumps(header, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+    # keeps the float64 array 8 byte aligned
+    text += b" " * (-(len(MAGIC) + HEADER_SIZE.size + len(text)) % 8)
+    if sys.byteorder != "little":
+        values.byteswap()
+    data = values.tostring() if sys.version_info[0] == 2 else values.tobytes()
+    return MAGIC + HEADER_SIZE.pack(len(text)) + text + data
+
+
+def dump(bp, path):
+    """save binary blueprint
+
+    :param bp: root blueprint
+    :param path: file path
+    :return:
+    """
+    data = dumps(bp)
+    detach(path)
+    fileio.write_atomic(path, data)
+
+
+def is_binary(path):
+    """file starts with the binary blueprint magic
+
+    :param path: file path
+    :return: bool
+    """
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load(path):
+    """load binary blueprint, transforms are views of the mapped file
+
+    :param path: file path
+    :return: root blueprint
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not a binary blueprint : {0}".format(path))
+        size = HEADER_SIZE.unpack(f.read(HEADER_SIZE.size))[0]
+        header = json.loads(f.read(size).decode("utf-8"), object_pairs_hook=OrderedDict)
+
+    bp = header["blueprint"]
+    if header["transforms"]:
+        buffer = _Buffer(path, len(MAGIC) + HEADER_SIZE.size + size)
+        if buffer.mmap is not None:
+            _buffers.add(buffer)
+        for index, offset, count in header["transforms"]:
+            bp["blocks"][index]["transforms"] = TransformView(buffer, offset, count)
+    return bp
+
+
+def detach(path):
+    """release the mapping of a loaded binary blueprint,
+    its views keep their data in memory. called before the file is overwritten
+
+    :param path: file path
+    :return:
+    """
+    path = _key(path)
+    for buffer in [x for x in _buffers if x.path == path]:
+        buffer.detach()
+        _buffers.discard(buffer)
+
+
+def default(o):
+    """json.dump default of every blueprint container, TransformView and lazy
+    blocks are saved as lists, model and copy on write containers as dicts and lists
+
+    ex) json.dump(bp, f, default=binary.default)
+    """
+    if hasattr(o, "tolist"):
+        return o.tolist()
+    if isinstance(o, Mapping):
+        return OrderedDict(o.items())
+    if isinstance(o, Sequence):
+        return list(o)
+    raise TypeError("{0!r} is not JSON serializable".format(o))
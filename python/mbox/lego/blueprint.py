@@ -2,18 +2,17 @@
 """blueprint module"""
 
 # maya
-import pymel.core as pm
+from mbox.core.scene import pm
 
 # json
-from mbox.vendor import jsonschema
 import json
 
 # mbox
 from mbox.lego.box import blueprint
+from mbox.lego import scheduler, validator, binary, lazy, journal, fileio, cow, model
 from mbox.core import transform
 
 #
-import os
 import sys
 import copy
 import logging
@@ -23,12 +22,13 @@ from collections import OrderedDict
 logger = logging.getLogger(__name__)
 
 
-def get_blueprint_graph(graph, data=None, priority=0):
+def get_blueprint_graph(graph, data=None, priority=0, as_model=False):
     """
 
     :param graph:
     :param data:
     :param priority:
+    :param as_model: return model.Root instead of the dict
     :return:
     """
     if graph:
@@ -44,7 +44,7 @@ def get_blueprint_graph(graph, data=None, priority=0):
             get_blueprint_graph(graph[root[0]], info["blocks"], priority)
         else:
             info["blocks"] = None
-        return info
+        return model.Root.from_dict(info) if as_model else info
     # block info get
     else:
         priority += 1
@@ -144,7 +144,8 @@ def get_block_info(node):
     data["joint"] = node.attr("joint").get()
     data["jointAxis"] = [node.attr("primaryAxis").get(), node.attr("secondaryAxis").get()]
     data["transforms"] = [x.tolist() for x in node.attr("transforms").get()]
-    data["parent"] = node.attr("parent").get()
+    # block networks have no parent attribute, get_blueprint_graph sets the dag parent
+    data["parent"] = None
 
     mod = importlib.import_module("mbox.lego.box.{block}.blueprint".format(block=data["component"]))
     data["meta"] = mod.get_block_info(node)
@@ -166,10 +167,7 @@ def get_blueprint_from_hierarchy(node):
     if not dag:
         return None
     data = get_blueprint_graph(dag)
-    schema_version = "{schema}.json".format(schema=data["schemaVersion"])
-    with open(os.path.join(os.path.dirname(__file__), "schema", schema_version), "r") as f:
-        schema = json.load(f)
-    jsonschema.validate(data, schema)
+    validator.validate(data)
 
     return data
 
@@ -178,22 +176,36 @@ def get_blueprint_from_file(path):
     """ get mbox blueprint graph from file
 
     explanation
-    1. load blueprint file
-    2. load schema file
-    3. validate graph
+    1. load blueprint file, json or binary picked by the file magic
+    2. replay the journal of the file
+    3. validate graph with the cached schema validator
     4. return graph
 
     :return:
     """
-    with open(path, "r") as f:
-        data = json.load(f, object_pairs_hook=OrderedDict)
-    schema_version = "{schema}.json".format(schema=data["schemaVersion"])
-    with open(os.path.join(os.path.dirname(__file__), "schema", schema_version), "r") as f:
-        schema = json.load(f, object_pairs_hook=OrderedDict)
-    jsonschema.validate(data, schema)
+    if binary.is_binary(path):
+        data = binary.load(path)
+    else:
+        with open(path, "r") as f:
+            data = json.load(f, object_pairs_hook=OrderedDict)
+    journal.Journal(path).replay(data)
+    validator.validate(data)
     return data
 
 
+def get_lazy_blueprint_from_file(path):
+    """ get mbox blueprint graph from a large json file, blocks are loaded on access
+
+    explanation
+    1. index block spans in one pass, parse and validate root only
+    2. replay the journal of the file
+    3. a block is parsed and validated when it is first accessed
+
+    :return:
+    """
+    return journal.Journal(path).replay(lazy.load(path))
+
+
 def get_specific_block_blueprint(graph, name):
     """get specific block blueprint
 
@@ -201,6 +213,8 @@ def get_specific_block_blueprint(graph, name):
     :param name: name_direction_index ex)arm_left_0
     :return:
     """
+    if isinstance(graph["blocks"], lazy.LazyBlocks):
+        return graph["blocks"].get_block(name)
     context = None
     for child in graph["blocks"]:
         context_name = "{name}_{direction}_{index}".format(name=child["name"],
@@ -230,7 +244,7 @@ def get_block_index(bp, name, direction):
     if block_name not in names:
         return "0"
 
-    for index, number in enumerate(sorted(names[block_name])):
+    for index, number in enumerate(sorted(names[block_name], key=int)):
         if str(index) != str(number):
             return str(index)
 
@@ -238,6 +252,13 @@ def get_block_index(bp, name, direction):
 
 
 def get_specific_dag_node(root, name):
+    # root is the first dag node, blocks under the root skip the hierarchy walk
+    if name in root.nodeName():
+        return root
+    # guide names are unique in a scene, an exact name skips the hierarchy walk
+    for node in pm.ls(name):
+        if root in node.getAllParents():
+            return node
     dags = pm.ls(root, dagObjects=True)
     parent = [dag for dag in dags if name in dag.nodeName()]
     return parent[0] if parent else root
@@ -289,21 +310,18 @@ def draw_from_blueprint(bp):
     """ draw node hierarchy from bp
 
     explanation
-    1. bp is root - root guide
-       bp is block - block guide
-    2. recursive
+    1. schedule blocks - missing parents and cycles raise before drawing
+    2. bp is root - root guide
+    3. block guides group by group, parents first
 
-    :param bp:
+    :param bp: root blueprint, dict or model.Root
     :return:
     """
+    schedule = scheduler.get_schedule(bp)
     root = blueprint.blueprint(bp)
-    p = max([int(x["priority"]) for x in bp["blocks"]])
-    p_list = [list() for x in range(p)]
-    for block in bp["blocks"]:
-        p_list[block["priority"]-1].append(block)
 
-    for priority in p_list:
-        for block in priority:
+    for group in schedule:
+        for block in group:
             mod = importlib.import_module("mbox.lego.box.{block}.blueprint".format(block=block["component"]))
             mod.blueprint(get_specific_dag_node(root, block["parent"]), block)
 
@@ -316,17 +334,10 @@ def apply_to_hierarchy(root, bp):
     :return:
     """
     orig = get_blueprint_from_hierarchy(root)
-    orig_blocks = ["{name}_{direction}_{index}".format(name=x["name"],
-                                                       direction=x["direction"],
-                                                       index=x["index"]) for x in orig["blocks"]] if orig["blocks"] else list()
-    new_blocks = ["{name}_{direction}_{index}".format(name=x["name"],
-                                                      direction=x["direction"],
-                                                      index=x["index"]) for x in bp["blocks"]] if bp["blocks"] else list()
-    generated_blocks = list(set(new_blocks) - set(orig_blocks))
-    disappeared_blocks = list(set(orig_blocks) - set(new_blocks))
-
-    for g_block in generated_blocks:
-        block_bp = get_specific_block_blueprint(bp, g_block)
+    names = set(scheduler.get_block_name(x) for x in orig.get("blocks") or list())
+    added = [x for x in bp.get("blocks") or list() if scheduler.get_block_name(x) not in names]
+
+    for block_bp in added:
         mod = importlib.import_module("mbox.lego.box.{block}.blueprint".format(block=block_bp["component"]))
         mod.blueprint(get_specific_dag_node(root, block_bp["parent"]), block_bp)
 
@@ -370,6 +381,7 @@ def delete_blueprint(bp, root=None, node=False):
 def duplicate_blueprint(root, bp, mirror=False, apply=True):
     """duplicate blueprint
     if mirror is True, it changes direction(left -> right, right -> left)
+    bp is never written, the duplicate is a deep copy and shares nothing with it
 
 
     :param root: root dag node
@@ -379,27 +391,49 @@ def duplicate_blueprint(root, bp, mirror=False, apply=True):
     :return:
     """
     orig_bp = get_blueprint_from_hierarchy(root)
-    dup_bp = copy.deepcopy(bp)
+    dup_bp = cow.wrap(bp)
 
     if mirror:
         if dup_bp["direction"] != "center":
             dup_bp["direction"] = "left" if dup_bp["direction"] == "right" else "right"
-        for index, tf in enumerate(dup_bp["transforms"]):
+        for index, tf in enumerate(bp["transforms"]):
             dup_bp["transforms"][index] = transform.get_symmetrical_transform(pm.datatypes.Matrix(tf))
     dup_bp["index"] = get_block_index(orig_bp, dup_bp["name"], dup_bp["direction"])
-    orig_bp["blocks"].append(dup_bp)
+    orig_bp["blocks"].append(copy.deepcopy(dup_bp.to_dict()))
 
     if apply:
         apply_to_hierarchy(root, orig_bp)
 
 
-def save(bp, path):
-    """
-    TODO: 세이브 하는것 생각해봐야함
+def save(bp, path, compact=False):
+    """ save mbox blueprint graph to file, json or binary
 
-    :param bp:
+    explanation
+    1. written to a temp file and renamed, an interrupted save keeps the previous file
+    2. journal of the file is removed, every change is in the saved file
+
+    :param bp: root blueprint, dict or model.Root
     :param path:
+    :param compact: binary blueprint, transforms in one float64 array
     :return:
     """
-    with open(path, "w") as f:
-        json.dump(bp, f, ensure_ascii=False, sort_keys=False, indent=2)
+    if model.is_model(bp):
+        bp = bp.to_dict()
+    if compact:
+        binary.dump(bp, path)
+    else:
+        binary.detach(path)
+        fileio.write_atomic(path, json.dumps(bp, ensure_ascii=False, sort_keys=False, indent=2, default=binary.default))
+    journal.Journal(path).clear()
+
+
+def compact_journal(path, compact=False):
+    """write the journal of a blueprint file into the file
+
+    :param path: blueprint file
+    :param compact: binary blueprint
+    :return: root blueprint
+    """
+    bp = get_blueprint_from_file(path)
+    save(bp, path, compact=compact)
+    return bp
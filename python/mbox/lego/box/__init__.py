@@ -4,11 +4,32 @@
 from collections import OrderedDict
 
 # maya
-import pymel.core as pm
+from mbox.core.scene import pm
 
 # mbox
 from mbox import version
 from mbox.core import attribute, primitive, icon
+from mbox.lego import naming
+
+
+def get_names(context):
+    """rig structure node names, reserved in the build name registry
+
+    :param context: lego context
+    :return: OrderedDict {key: name}
+    """
+    names = OrderedDict()
+    names["rig"] = context["name"]
+    names["model"] = "model"
+    names["blocks"] = "blocks"
+    names["joints"] = "joints"
+    names["WIP"] = "WIP"
+    names["world_root"] = "world_root"
+    names["world_npo"] = "world_npo"
+    names["world_con"] = naming.join("world", context["controllerExp"])
+    names["world_ref"] = "world_ref"
+    names["world_output"] = "world_output"
+    return names
 
 
 def objects(bp, context, contextName):
@@ -20,18 +41,19 @@ def objects(bp, context, contextName):
     :return:
     """
     data = context[contextName]
+    names = get_names(context)
+
+    root = primitive.add_transform(None, names["rig"])
+    model = primitive.add_transform(root, names["model"])
+    blocks = primitive.add_transform(root, names["blocks"])
+    joints = primitive.add_transform(root, names["joints"])
+    wip = primitive.add_transform(root, names["WIP"])
 
-    root = primitive.add_transform(None, bp["name"])
-    model = primitive.add_transform(root, "model")
-    blocks = primitive.add_transform(root, "blocks")
-    joints = primitive.add_transform(root, "joints")
-    wip = primitive.add_transform(root, "WIP")
-
-    world_root = primitive.add_transform(blocks, "world_root")
-    world_npo = primitive.add_transform(world_root, "world_npo")
-    world_con = icon.create(world_npo, "world_{0}".format(bp["controllerExp"]), color=17, icon="compas")
-    world_ref = primitive.add_transform(world_con, "world_ref")
-    world_output = primitive.add_transform(world_root, "world_output")
+    world_root = primitive.add_transform(blocks, names["world_root"])
+    world_npo = primitive.add_transform(world_root, names["world_npo"])
+    world_con = icon.create(world_npo, names["world_con"], color=17, icon="compas")
+    world_ref = primitive.add_transform(world_con, names["world_ref"])
+    world_output = primitive.add_transform(world_root, names["world_output"])
 
     data["rig"] = root
     data["model"] = model
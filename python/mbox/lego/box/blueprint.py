@@ -5,7 +5,7 @@ from collections import OrderedDict
 import time
 
 # maya
-import pymel.core as pm
+from mbox.core.scene import pm
 
 # mbox
 from mbox import version
@@ -98,8 +98,17 @@ def initialize(bp):
     return network
 
 
+def get_guide_names(bp):
+    """guide node names of the root, reserved in the build name registry
+
+    :param bp: root blueprint
+    :return: OrderedDict {key: name}
+    """
+    return OrderedDict([("guide", "guide")])
+
+
 def blueprint(bp):
-    guide = primitive.add_transform(None, "guide")
+    guide = primitive.add_transform(None, get_guide_names(bp)["guide"])
     attribute.add(guide, "isBlueprint", "bool", keyable=False)
     attribute.lock(guide, ["tx", "ty", "tz", "rx", "ry", "rz", "sx", "sy", "sz", "v"])
     attribute.hide(guide, ["tx", "ty", "tz", "rx", "ry", "rz", "sx", "sy", "sz", "v"])
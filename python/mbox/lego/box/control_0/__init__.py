@@ -1 +1,114 @@
 # -*- coding:utf-8 -*-
+
+#
+from collections import OrderedDict
+
+# maya
+from mbox.core.scene import pm
+
+# mbox
+from mbox.lego import naming
+from mbox.core import attribute, primitive, icon
+
+ATTRS = ["tx", "ty", "tz", "rx", "ry", "rz", "sx", "sy", "sz", "ro"]
+COLORS = {"center": 17, "left": 6, "right": 13}
+
+
+def compute(bp, context, contextName):
+    """pure block data, no scene edit
+
+    :param bp: block blueprint
+    :param context:
+    :param contextName: block name
+    :return: block data
+    """
+    m = [list(row) for row in bp["transforms"][0]]
+    if bp["meta"]["worldOrientAxis"]:
+        m = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], m[3]]
+
+    data = OrderedDict()
+    data["parent"] = context["parents"][contextName]
+    data["names"] = OrderedDict()
+    data["names"]["npo"] = naming.name(context, bp, "npo", extension="")
+    data["names"]["control"] = naming.name(context, bp, "")
+    data["names"]["joint"] = naming.name(context, bp, "", joint=True)
+    data["matrices"] = OrderedDict()
+    data["matrices"]["control"] = m
+    data["control"] = OrderedDict()
+    data["control"]["icon"] = "cube"
+    data["control"]["color"] = COLORS[bp["direction"]]
+    data["control"]["keyable"] = [x for x in ATTRS if x in bp["meta"]["keyAbleAttrs"]]
+    data["control"]["locked"] = [x for x in ATTRS if x not in bp["meta"]["keyAbleAttrs"]]
+    return data
+
+
+def objects(bp, context, contextName):
+    """
+
+    :param bp:
+    :param context:
+    :param contextName:
+    :return:
+    """
+    data = context[contextName]
+    parent = context[data["parent"]]["nodes"][-1] if data["parent"] else None
+    m = pm.datatypes.Matrix(data["matrices"]["control"])
+
+    npo = primitive.add_transform(parent, data["names"]["npo"], m=m)
+    con = icon.create(npo, data["names"]["control"], m=m, color=data["control"]["color"], icon=data["control"]["icon"])
+
+    data["nodes"] = [npo, con]
+
+
+def emit_objects(bp, context, contextName, builder):
+    """objects as ir ops, nodes are names
+
+    :param bp:
+    :param context:
+    :param contextName:
+    :param builder: ir.Builder
+    :return:
+    """
+    data = context[contextName]
+    parent = context[data["parent"]]["nodes"][-1] if data["parent"] else None
+    m = data["matrices"]["control"]
+
+    npo = builder.create_node(data["names"]["npo"], parent=parent, matrix=m)
+    con = builder.create_node(data["names"]["control"],
+                              parent=npo,
+                              matrix=m,
+                              icon=data["control"]["icon"],
+                              color=data["control"]["color"])
+
+    data["nodes"] = [npo, con]
+
+
+def attributes(bp, context, contextName):
+    """
+
+    :param bp:
+    :param context:
+    :param contextName:
+    :return:
+    """
+    data = context[contextName]
+    npo, con = data["nodes"]
+    if data["control"]["locked"]:
+        attribute.lock(con, data["control"]["locked"])
+        attribute.hide(con, data["control"]["locked"])
+
+
+def emit_attributes(bp, context, contextName, builder):
+    """attributes as ir ops
+
+    :param bp:
+    :param context:
+    :param contextName:
+    :param builder: ir.Builder
+    :return:
+    """
+    data = context[contextName]
+    npo, con = data["nodes"]
+    if data["control"]["locked"]:
+        builder.lock(con, data["control"]["locked"])
+        builder.hide(con, data["control"]["locked"])
@@ -4,11 +4,12 @@
 from collections import OrderedDict
 
 # maya
-import pymel.core as pm
+from mbox.core.scene import pm
 
 # mbox
 from mbox.lego.blueprint import get_block_index
 from mbox.core import attribute, icon
+from mbox.lego import naming
 
 
 def initialize_(bp, parent):
@@ -57,6 +58,15 @@ def initialize(affects, bp):
     return network
 
 
+def get_guide_names(bp):
+    """guide node names of the block, reserved in the build name registry
+
+    :param bp: block blueprint
+    :return: OrderedDict {key: name}
+    """
+    return OrderedDict([("root", naming.guide(bp, "root"))])
+
+
 def blueprint(parent, bp):
     """
 
@@ -65,7 +75,7 @@ def blueprint(parent, bp):
     :return:
     """
     # name
-    root_n = "{name}_{direction}{index}_root".format(name=bp["name"], direction=bp["direction"], index=bp["index"])
+    root_n = get_guide_names(bp)["root"]
 
     # create
     root = icon.guide_root_icon(parent, root_n, m=pm.datatypes.Matrix(bp["transforms"][0]))
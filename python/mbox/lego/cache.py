@@ -0,0 +1,213 @@
+# -*- coding:utf-8 -*-
+"""build cache module
+
+pure per block step outputs (compute: names, matrices, control specs) are
+kept by a key of the block content hash, the source of its component, the
+naming context and the keys of the blocks it depends on. an unchanged
+block reuses its outputs, a changed block misses with every block
+depending on it. the schedule is kept by the blueprint hash.
+scene steps (objects, attributes, operate) always run.
+model.Root keeps block hashes between builds, dict blueprints are hashed
+on every build.
+
+    build_cache = cache.BuildCache(path)
+    lego.lego(bp, "all", cache=build_cache)
+    build_cache.get_report()
+    build_cache.save()
+
+steps add keys to the computed data (ex) "nodes"), nested values are
+shared with the cache and are not changed.
+"""
+
+# json
+import json
+
+# mbox
+from mbox import version
+from mbox.lego import digest, fileio
+
+#
+import os
+import hashlib
+import logging
+import importlib
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+CACHE_DIR = os.environ.get("MBOX_BUILD_CACHE_DIR", fileio.get_user_dir("build"))
+
+# component: (file stats, source hash)
+_sources = dict()
+
+# context values every block output may depend on
+CONTEXT_KEYS = ("process",
+                "name",
+                "direction",
+                "controllerExp",
+                "jointExp",
+                "commonConvention",
+                "jointConvention",
+                "jointDescriptionLetterCase",
+                "controllerDescriptionLetterCase")
+
+
+def get_cache_path(name):
+    """default build cache file of a rig
+
+    :param name: root blueprint name
+    :return: CACHE_DIR/name.json
+    """
+    return os.path.join(CACHE_DIR, "{0}.json".format(name))
+
+
+def get_context_key(context):
+    """
+    :param context: lego context
+    :return: hex string
+    """
+    data = [context[key] for key in CONTEXT_KEYS]
+    text = json.dumps([CACHE_VERSION, version.mbox, data], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def get_component_key(component):
+    """hash of the component package source, changes with any edited file of it
+
+    :param component: block component ex)control_0
+    :return: hex string
+    """
+    module = importlib.import_module("mbox.lego.box.{0}".format(component))
+    directory = os.path.dirname(os.path.abspath(module.__file__))
+    files = sorted(os.path.join(directory, x) for x in os.listdir(directory) if x.endswith(".py"))
+    stats = tuple((x, os.path.getmtime(x), os.path.getsize(x)) for x in files)
+    cached = _sources.get(component)
+    if cached is not None and cached[0] == stats:
+        return cached[1]
+    h = hashlib.sha1()
+    for path in files:
+        h.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            h.update(f.read())
+    _sources[component] = (stats, h.hexdigest())
+    return _sources[component][1]
+
+
+def get_blueprint_key(bp):
+    """cache key of the schedule, changes with any block or root data
+
+    :param bp: root blueprint
+    :return: hex string
+    """
+    return hashlib.sha1("{0}|{1}".format(CACHE_VERSION, digest.get_hash(bp)).encode("utf-8")).hexdigest()
+
+
+def get_block_key(block, context_key, dependency_keys=None):
+    """cache key of a block, changes with the block, its component source,
+    the context and its dependency blocks
+
+    :param block: block blueprint
+    :param context_key: get_context_key result
+    :param dependency_keys: [dependency block key, ...]
+    :return: hex string
+    """
+    h = hashlib.sha1()
+    for value in [context_key, block["component"], get_component_key(block["component"]), digest.get_cached_hash(block)]:
+        h.update(value.encode("utf-8"))
+        h.update(b"|")
+    for key in dependency_keys or list():
+        h.update(key.encode("utf-8"))
+    return h.hexdigest()
+
+
+class BuildCache(object):
+    """per block step outputs of lego builds
+
+    :param path: json file, loaded if it exists, None keeps the cache in memory
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = OrderedDict()
+        self.stats = OrderedDict()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def _count(self, step, hit):
+        stat = self.stats.setdefault(step, [0, 0])
+        stat[0 if hit else 1] += 1
+
+    def get(self, step, key):
+        """cached output, counted as a hit or a miss
+
+        :param step: step name
+        :param key: get_block_key result
+        :return: OrderedDict copy or None
+        """
+        data = self.entries.get(step, dict()).get(key)
+        self._count(step, data is not None)
+        return None if data is None else OrderedDict(data)
+
+    def set(self, step, key, data):
+        """
+        :param step: step name
+        :param key: get_block_key result
+        :param data: block output, json data
+        """
+        self.entries.setdefault(step, OrderedDict())[key] = OrderedDict(data)
+
+    def miss(self, step, count=1):
+        """count outputs which are not cached, ex) scene steps"""
+        for _ in range(count):
+            self._count(step, False)
+
+    def get_report(self):
+        """hits and misses of every step since the last reset
+
+        :return: OrderedDict {step: OrderedDict(hits, misses)}
+        """
+        return OrderedDict((step, OrderedDict([("hits", hits), ("misses", misses)]))
+                           for step, (hits, misses) in self.stats.items())
+
+    def reset_stats(self):
+        self.stats = OrderedDict()
+
+    def prune(self, step, keys):
+        """drop outputs of blocks not in keys, ex) removed or changed blocks
+
+        :param step: step name
+        :param keys: keys to keep
+        """
+        keys = set(keys)
+        entries = self.entries.get(step, dict())
+        for key in [x for x in entries if x not in keys]:
+            del entries[key]
+
+    def load(self, path):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f, object_pairs_hook=OrderedDict)
+        except (IOError, OSError, ValueError) as e:
+            logger.warning("build cache is not readable {0}".format(e))
+            return
+        if data.get("cache") != CACHE_VERSION:
+            return
+        self.entries = data["entries"]
+
+    def save(self, path=None):
+        """
+        :param path: default self.path
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("build cache has no path")
+        data = OrderedDict([("cache", CACHE_VERSION), ("entries", self.entries)])
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+            fileio.write_atomic(path, json.dumps(data, separators=(",", ":")))
+        except (IOError, OSError) as e:
+            logger.warning("build cache is not writable {0}".format(e))
@@ -0,0 +1,310 @@
+# -*- coding:utf-8 -*-
+"""build checkpoint module
+
+after every lego step a checkpoint records the block data of the context,
+the names of the nodes created in the step and, with snapshot, the scene
+(a scene file on maya, a copy of the memory scene). a build resumed from a
+step restores the checkpoint of the step before it and runs from there.
+without a snapshot the nodes created by that step and the later ones are
+deleted instead, attribute edits of those steps are not undone.
+resuming from prepare rebuilds the rig, every node of the previous build
+is deleted first.
+a checkpoint belongs to the blueprint it was built from, a changed
+blueprint can not resume. checkpoints are saved per user, by rig name and
+blueprint key, and a snapshot is opened only from its own private directory.
+opening a maya snapshot discards the current scene, a scene with unsaved
+changes is restored only with force.
+
+    checkpoints = checkpoint.Checkpoints(snapshot=True)
+    lego.lego(bp, "all", checkpoints=checkpoints)
+    # fix operate, then
+    lego.lego(bp, "all", checkpoints=checkpoints, resume_from="operate")
+
+    lib.build(bp, checkpoint_steps=True)
+    lib.build(bp, resume_from="operate", discard_changes=True)
+
+scene nodes and attributes in the block data are kept by name and looked
+up again on restore, matrices and vectors as lists.
+"""
+
+# json
+import json
+
+# mbox
+from mbox.core import scene
+from mbox.lego import fileio, cache as build_cache
+
+#
+import os
+import time
+import logging
+import tempfile
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+CHECKPOINT_DIR = os.environ.get("MBOX_CHECKPOINT_DIR", fileio.get_user_dir("checkpoint"))
+
+STEPS = ("prepare", "compute", "objects", "attributes", "operate", "finalize")
+
+# session checkpoints of lib.build by rig name and blueprint key
+_checkpoints = dict()
+
+
+class CheckpointError(Exception):
+    pass
+
+
+def get_checkpoint_dir(name, key):
+    """default checkpoint directory of a rig
+
+    :param name: root blueprint name
+    :param key: cache.get_blueprint_key result
+    :return: CHECKPOINT_DIR/name/key
+    """
+    return os.path.join(CHECKPOINT_DIR, name, key)
+
+
+def get_checkpoints(bp, snapshot=True, force=False):
+    """checkpoints of a rig kept for the session, saved to get_checkpoint_dir
+
+    :param bp: root blueprint
+    :param snapshot: snapshot the scene after every step
+    :param force: restoring a snapshot discards unsaved changes of the maya scene
+    :return: Checkpoints
+    """
+    key = (bp["name"], build_cache.get_blueprint_key(bp))
+    if key not in _checkpoints:
+        _checkpoints[key] = Checkpoints(get_checkpoint_dir(*key), snapshot=snapshot)
+    _checkpoints[key].force = force
+    return _checkpoints[key]
+
+
+def get_nodes():
+    """
+    :return: set of every scene node
+    """
+    return set(scene.pm.ls())
+
+
+def _get_name(node):
+    return node.longName() if isinstance(node, scene.pm.nodetypes.DagNode) else node.name()
+
+
+def dump(value):
+    """block data with nodes, attributes, matrices and vectors as json data
+
+    :param value: context value
+    :return: json data, new containers
+    """
+    if isinstance(value, dict):
+        return OrderedDict((k, dump(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [dump(x) for x in value]
+    if isinstance(value, scene.pm.nodetypes.DependNode):
+        return OrderedDict([("__node__", _get_name(value))])
+    if isinstance(value, scene.pm.Attribute):
+        return OrderedDict([("__attr__", value.name())])
+    if isinstance(value, scene.datatypes.Matrix):
+        return OrderedDict([("__matrix__", [[float(x) for x in row] for row in value])])
+    if isinstance(value, scene.datatypes.Vector):
+        return OrderedDict([("__vector__", [float(x) for x in value])])
+    return value
+
+
+def load(value):
+    """dump result with nodes and attributes looked up in the current scene
+
+    :param value: dump result
+    :return: context value
+    """
+    if isinstance(value, dict):
+        if len(value) == 1:
+            key = next(iter(value))
+            if key in ("__node__", "__attr__"):
+                return scene.pm.PyNode(value[key])
+            if key == "__matrix__":
+                return scene.datatypes.Matrix(value[key])
+            if key == "__vector__":
+                return scene.datatypes.Vector(value[key])
+        return OrderedDict((k, load(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [load(x) for x in value]
+    return value
+
+
+def get_block_data(context):
+    """
+    :param context: lego context
+    :return: OrderedDict {block name: data} in schedule order
+    """
+    return OrderedDict((name, context[name]) for group in context["schedule"] for name in group if name in context)
+
+
+class Checkpoints(object):
+    """checkpoints of lego builds of one blueprint
+
+    :param path: directory, checkpoints are saved as {step}.json and snapshots as
+                 {step}.ma, None keeps them in memory
+    :param snapshot: snapshot the scene after every step, maya snapshots without
+                     a path are saved to a temp directory
+    :param force: restoring a snapshot discards unsaved changes of the maya scene,
+                  without it a modified maya scene is not restored
+    """
+
+    def __init__(self, path=None, snapshot=False, force=False):
+        self.path = path
+        self.snapshot = snapshot
+        self.force = force
+        self.records = OrderedDict()
+        self.key = None
+        self.temp = None
+
+    def _get_file(self, step, ext, path=None):
+        return os.path.join(path or self.path, "{0}.{1}".format(step, ext))
+
+    def _snapshot(self, step):
+        if scene.is_headless():
+            return scene.snapshot()
+        if not self.path and not self.temp:
+            self.temp = tempfile.mkdtemp(prefix="mbox_checkpoint_")
+        directory = fileio.make_private_dir(self.path or self.temp)
+        return scene.snapshot(self._get_file(step, "ma", directory))
+
+    def start(self, bp):
+        """
+        :param bp: root blueprint of the build
+        """
+        self.key = build_cache.get_blueprint_key(bp)
+
+    def begin(self, step):
+        """
+        :param step: lego step
+        :return: scene nodes before the step
+        """
+        return get_nodes()
+
+    def end(self, context, step, nodes):
+        """record the checkpoint of a finished step
+
+        :param context: lego context
+        :param step: lego step
+        :param nodes: begin result
+        """
+        start = time.time()
+        # checkpoints of later steps belong to the previous build
+        for name in STEPS[STEPS.index(step):]:
+            self.records.pop(name, None)
+            if self.path and os.path.exists(self._get_file(name, "json")):
+                os.remove(self._get_file(name, "json"))
+
+        record = OrderedDict()
+        record["checkpoint"] = CHECKPOINT_VERSION
+        record["step"] = step
+        record["blueprint"] = self.key
+        record["backend"] = scene.BACKEND
+        record["nodes"] = sorted(_get_name(x) for x in get_nodes() - nodes)
+        record["context"] = dump(get_block_data(context))
+        record["scriptTimes"] = dump(context["scriptTimes"])
+        record["snapshot"] = self._snapshot(step) if self.snapshot else None
+        self.records[step] = record
+
+        if self.path:
+            self._save(record)
+        logger.info("checkpoint {0} {1} nodes {2:.3f}s".format(step, len(record["nodes"]), time.time() - start))
+
+    def _save(self, record):
+        data = OrderedDict(record)
+        if scene.is_headless():
+            # memory snapshots stay in the session
+            data["snapshot"] = None
+        try:
+            fileio.make_private_dir(self.path)
+            fileio.write_atomic(self._get_file(record["step"], "json"), json.dumps(data, indent=2))
+        except (IOError, OSError) as e:
+            logger.warning("checkpoint is not writable {0}".format(e))
+
+    def get(self, step):
+        """
+        :param step: lego step
+        :return: record, loaded from path if it is not in memory, or None
+        """
+        if step in self.records:
+            return self.records[step]
+        if not self.path or not os.path.exists(self._get_file(step, "json")):
+            return None
+        with open(self._get_file(step, "json"), "r") as f:
+            record = json.load(f, object_pairs_hook=OrderedDict)
+        if record.get("checkpoint") != CHECKPOINT_VERSION or record["backend"] != scene.BACKEND:
+            return None
+        self.records[step] = record
+        return record
+
+    def rollback(self, step):
+        """delete the nodes created by step and the later steps
+
+        :param step: lego step
+        """
+        created = list()
+        for name in STEPS[STEPS.index(step):]:
+            later = self.get(name)
+            if later is not None:
+                created.extend(x for x in later["nodes"] if scene.pm.objExists(x))
+        if created:
+            scene.pm.delete(created)
+        logger.info("checkpoint rollback deleted {0} nodes".format(len(created)))
+
+    def _check_snapshot(self, path):
+        """a maya snapshot is a scene file, it is opened only from the private checkpoint directory"""
+        directory = self.path or self.temp
+        if not directory or os.path.dirname(os.path.abspath(path)) != os.path.abspath(directory):
+            raise CheckpointError("snapshot is not in the checkpoint directory : {0}".format(path))
+        try:
+            fileio.check_private(directory)
+            fileio.check_private(path)
+        except OSError as e:
+            raise CheckpointError("snapshot can not be trusted, {0}".format(e))
+
+    def restore(self, context, step):
+        """scene and context of the checkpoint before step, after start.
+        prepare has no checkpoint before it, the nodes of every step are deleted
+
+        :param context: lego context of a new build
+        :param step: lego step to resume from
+        """
+        if step == STEPS[0]:
+            self.rollback(step)
+            logger.info("resume {0}, the previous build is deleted".format(step))
+            return
+
+        previous = STEPS[STEPS.index(step) - 1]
+        record = self.get(previous)
+        if record is None:
+            raise CheckpointError("no checkpoint of {0} to resume {1}".format(previous, step))
+        if record["blueprint"] != self.key:
+            raise CheckpointError("blueprint changed after the checkpoint of {0}".format(previous))
+
+        if record["snapshot"] is not None:
+            if not scene.is_headless():
+                self._check_snapshot(record["snapshot"])
+            if not self.force and scene.is_modified():
+                raise CheckpointError("scene has unsaved changes, save it or resume with force")
+            scene.restore(record["snapshot"], force=self.force)
+        else:
+            self.rollback(step)
+
+        context.update(load(record["context"]))
+        context["scriptTimes"].update(record["scriptTimes"])
+        logger.info("resume {0} from the checkpoint of {1}".format(step, previous))
+
+    def clear(self):
+        """drop every checkpoint and the saved files"""
+        self.records = OrderedDict()
+        if not self.path:
+            return
+        for step in STEPS:
+            for ext in ("json", "ma"):
+                if os.path.exists(self._get_file(step, ext)):
+                    os.remove(self._get_file(step, ext))
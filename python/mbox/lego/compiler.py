@@ -0,0 +1,347 @@
+# -*- coding:utf-8 -*-
+"""draft-4 schema compiler module
+
+turns a json schema into straight-line python check functions.
+compiled checks only answer valid or not, error reporting stays with the
+jsonschema interpreter. generated sources are kept for the session per schema
+hash, nothing is written to disk or executed from it.
+"""
+
+# json
+import json
+
+# mbox
+from mbox.vendor import six
+
+#
+import re
+import sys
+import hashlib
+import logging
+import numbers
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+COMPILER_VERSION = 1
+
+# schema hash: generated source
+_sources = dict()
+
+if sys.version_info[0] == 2:
+    STRING_TYPES = (str, unicode)  # noqa: F821
+    INTEGER_TYPES = (int, long)  # noqa: F821
+else:
+    STRING_TYPES = (str,)
+    INTEGER_TYPES = (int,)
+
+DEFAULT_TYPES = {"array": (list,),
+                 "boolean": (bool,),
+                 "integer": INTEGER_TYPES,
+                 "null": (type(None),),
+                 "number": (numbers.Number,),
+                 "object": (six.moves.collections_abc.Mapping,),
+                 "string": STRING_TYPES}
+
+# keywords without validation meaning
+IGNORED = frozenset(["$schema", "id", "title", "description", "default", "definitions", "format"])
+
+
+class CompileError(Exception):
+    """schema uses something the compiler does not support"""
+
+
+def get_schema_hash(schema):
+    """stable schema hash, includes compiler version
+
+    :param schema: json schema
+    :return: hex digest
+    """
+    text = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1("{0}:{1}".format(COMPILER_VERSION, text).encode("utf-8")).hexdigest()
+
+
+class _Compiler(object):
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.functions = OrderedDict()
+        self.constants = list()
+        self.pending = list()
+        self.lines = list()
+
+    def resolve(self, ref):
+        if not ref.startswith("#"):
+            raise CompileError("remote $ref is not supported : {0}".format(ref))
+        document = self.schema
+        fragment = ref[1:].lstrip("/")
+        for part in fragment.split("/") if fragment else []:
+            part = part.replace("~1", "/").replace("~0", "~")
+            if isinstance(document, list):
+                part = int(part)
+            try:
+                document = document[part]
+            except (LookupError, TypeError):
+                raise CompileError("unresolvable $ref : {0}".format(ref))
+        return document
+
+    def function(self, schema, key=None):
+        """function name checking schema, compiled once per schema node"""
+        key = key or id(schema)
+        if key not in self.functions:
+            self.functions[key] = "_v{0}".format(len(self.functions))
+            self.pending.append((self.functions[key], schema))
+        return self.functions[key]
+
+    def check(self, schema, x):
+        """inline check expression of schema on x, type only schemas skip the function call"""
+        keywords = [k for k in schema if k not in IGNORED] if isinstance(schema, dict) else None
+        if keywords == list():
+            return "True"
+        if keywords == ["type"]:
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            return "({0})".format(" or ".join(self.type_check(t, x) for t in types))
+        return "{0}({1})".format(self.function(schema), x)
+
+    def constant(self, value):
+        self.constants.append(value)
+        return "_c[{0}]".format(len(self.constants) - 1)
+
+    def type_check(self, name, x):
+        if name not in DEFAULT_TYPES:
+            raise CompileError("unknown type : {0}".format(name))
+        check = "isinstance({x}, _t_{name})".format(x=x, name=name)
+        if name in ("integer", "number"):
+            check = "({check} and not isinstance({x}, bool))".format(check=check, x=x)
+        return check
+
+    def emit(self, name, schema):
+        body = list()
+        if not isinstance(schema, dict):
+            raise CompileError("schema is not an object")
+
+        if "$ref" in schema:
+            ref = schema["$ref"]
+            body.append("return {0}(x)".format(self.function(self.resolve(ref), key=ref)))
+            self.lines.append("def {0}(x):".format(name))
+            self.lines.extend("    " + x for x in body)
+            self.lines.append("")
+            return
+
+        for keyword, value in schema.items():
+            if keyword in IGNORED:
+                continue
+            handler = getattr(self, "k_" + re.sub(r"\W", "_", keyword), None)
+            if handler is None:
+                raise CompileError("keyword is not supported : {0}".format(keyword))
+            body.extend(handler(value, schema))
+
+        body.append("return True")
+        self.lines.append("def {0}(x):".format(name))
+        self.lines.extend("    " + x for x in body)
+        self.lines.append("")
+
+    # keywords
+    def k_type(self, value, schema):
+        types = value if isinstance(value, list) else [value]
+        check = " or ".join(self.type_check(x, "x") for x in types)
+        return ["if not ({0}):".format(check), "    return False"]
+
+    def k_enum(self, value, schema):
+        return ["if x not in {0}:".format(self.constant(value)), "    return False"]
+
+    def k_required(self, value, schema):
+        if not value:
+            return list()
+        lines = ["if isinstance(x, _t_object):"]
+        for key in value:
+            lines.append("    if {0!r} not in x:".format(key))
+            lines.append("        return False")
+        return lines
+
+    def k_properties(self, value, schema):
+        lines = ["if isinstance(x, _t_object):"]
+        for key, subschema in value.items():
+            check = self.check(subschema, "x[{0!r}]".format(key))
+            if check == "True":
+                continue
+            lines.append("    if {0!r} in x and not {1}:".format(key, check))
+            lines.append("        return False")
+        # every property accepts anything
+        return lines if len(lines) > 1 else list()
+
+    def k_additionalProperties(self, value, schema):
+        known = self.constant(list(schema.get("properties", dict()).keys()))
+        patterns = self.constant(list(schema.get("patternProperties", dict()).keys()))
+        lines = ["if isinstance(x, _t_object):",
+                 "    for k in x:",
+                 "        if k in {0} or any(_re.search(p, k) for p in {1}):".format(known, patterns),
+                 "            continue"]
+        if value is False:
+            lines.append("        return False")
+        elif isinstance(value, dict):
+            lines.append("        if not {0}(x[k]):".format(self.function(value)))
+            lines.append("            return False")
+        else:
+            return list()
+        return lines
+
+    def k_patternProperties(self, value, schema):
+        if not value:
+            return list()
+        lines = ["if isinstance(x, _t_object):"]
+        for pattern, subschema in value.items():
+            lines.append("    for k in x:")
+            lines.append("        if _re.search({0!r}, k) and not {1}(x[k]):".format(pattern, self.function(subschema)))
+            lines.append("            return False")
+        return lines
+
+    def k_items(self, value, schema):
+        if isinstance(value, dict):
+            check = self.check(value, "i")
+            if check == "True":
+                return list()
+            return ["if isinstance(x, _t_array):",
+                    "    for i in x:",
+                    "        if not {0}:".format(check),
+                    "            return False"]
+        if not value:
+            return list()
+        lines = ["if isinstance(x, _t_array):"]
+        for index, subschema in enumerate(value):
+            lines.append("    if len(x) > {0} and not {1}(x[{0}]):".format(index, self.function(subschema)))
+            lines.append("        return False")
+        return lines
+
+    def k_additionalItems(self, value, schema):
+        items = schema.get("items", dict())
+        if isinstance(items, dict) or value is True:
+            return list()
+        if value is False:
+            return ["if isinstance(x, _t_array) and len(x) > {0}:".format(len(items)), "    return False"]
+        return ["if isinstance(x, _t_array):",
+                "    for i in x[{0}:]:".format(len(items)),
+                "        if not {0}(i):".format(self.function(value)),
+                "            return False"]
+
+    def _compare(self, guard, check):
+        return ["if {0} and {1}:".format(guard, check), "    return False"]
+
+    def k_minItems(self, value, schema):
+        return self._compare("isinstance(x, _t_array)", "len(x) < {0!r}".format(value))
+
+    def k_maxItems(self, value, schema):
+        return self._compare("isinstance(x, _t_array)", "len(x) > {0!r}".format(value))
+
+    def k_minLength(self, value, schema):
+        return self._compare("isinstance(x, _t_string)", "len(x) < {0!r}".format(value))
+
+    def k_maxLength(self, value, schema):
+        return self._compare("isinstance(x, _t_string)", "len(x) > {0!r}".format(value))
+
+    def k_minProperties(self, value, schema):
+        return self._compare("isinstance(x, _t_object)", "len(x) < {0!r}".format(value))
+
+    def k_maxProperties(self, value, schema):
+        return self._compare("isinstance(x, _t_object)", "len(x) > {0!r}".format(value))
+
+    def k_minimum(self, value, schema):
+        op = "<=" if schema.get("exclusiveMinimum") else "<"
+        return self._compare(self.type_check("number", "x"), "x {0} {1!r}".format(op, value))
+
+    def k_maximum(self, value, schema):
+        op = ">=" if schema.get("exclusiveMaximum") else ">"
+        return self._compare(self.type_check("number", "x"), "x {0} {1!r}".format(op, value))
+
+    def k_exclusiveMinimum(self, value, schema):
+        return list()
+
+    def k_exclusiveMaximum(self, value, schema):
+        return list()
+
+    def k_pattern(self, value, schema):
+        return self._compare("isinstance(x, _t_string)", "not _re.search({0!r}, x)".format(value))
+
+    def k_uniqueItems(self, value, schema):
+        if not value:
+            return list()
+        return self._compare("isinstance(x, _t_array)", "not _unique(x)")
+
+    def k_allOf(self, value, schema):
+        lines = list()
+        for subschema in value:
+            lines.extend(["if not {0}(x):".format(self.function(subschema)), "    return False"])
+        return lines
+
+    def k_anyOf(self, value, schema):
+        check = " or ".join("{0}(x)".format(self.function(x)) for x in value)
+        return ["if not ({0}):".format(check), "    return False"]
+
+    def k_oneOf(self, value, schema):
+        check = ", ".join("{0}(x)".format(self.function(x)) for x in value)
+        return ["if [{0}].count(True) != 1:".format(check), "    return False"]
+
+    def k_not(self, value, schema):
+        return ["if {0}(x):".format(self.function(value)), "    return False"]
+
+    def compile(self):
+        self.function(self.schema)
+        while self.pending:
+            name, schema = self.pending.pop(0)
+            self.emit(name, schema)
+
+        header = ["# generated by mbox.lego.compiler, do not edit",
+                  "# compiler version {0}".format(COMPILER_VERSION),
+                  "_c = _json.loads({0!r})".format(json.dumps(self.constants)),
+                  ""]
+        footer = ["validate = _v0", ""]
+        return "\n".join(header + self.lines + footer)
+
+
+def generate(schema):
+    """python source checking schema
+
+    :param schema: draft-4 json schema
+    :return: source string, defines validate(instance) -> bool
+    :raises: CompileError
+    """
+    return _Compiler(schema).compile()
+
+
+def _unique(container):
+    seen = list()
+    for item in container:
+        if item in seen:
+            return False
+        seen.append(item)
+    return True
+
+
+def load(source, path="<mbox compiled schema>", types=None):
+    """compiled check function from generated source
+
+    :param source: generated source
+    :param path: file name shown in tracebacks
+    :param types: {schema type: (python type, ...)} extends default types
+    :return: validate(instance) -> bool
+    """
+    namespace = {"_json": json, "_re": re, "_unique": _unique}
+    for name, pytypes in DEFAULT_TYPES.items():
+        namespace["_t_" + name] = tuple(pytypes) + tuple((types or dict()).get(name, ()))
+    exec(compile(source, path, "exec"), namespace)
+    return namespace["validate"]
+
+
+def compile_schema(schema, types=None):
+    """compiled check function, generated source is kept for the session by schema hash
+
+    :param schema: draft-4 json schema
+    :param types: {schema type: (python type, ...)} extends default types
+    :return: validate(instance) -> bool
+    :raises: CompileError
+    """
+    key = get_schema_hash(schema)
+    source = _sources.get(key)
+    if source is None:
+        source = _sources[key] = generate(schema)
+    return load(source, "<mbox compiled schema {0}>".format(key[:8]), types)
@@ -0,0 +1,201 @@
+# -*- coding:utf-8 -*-
+"""copy on write blueprint module
+
+a wrapped blueprint shares every mapping, list and transform with its source
+and its snapshots, model.Root and model.Block are wrapped like dicts. the first write to a container copies only the
+containers on the path from the root to it, everything else stays shared,
+so a snapshot or a preview costs memory proportional to the edit.
+
+    bp = cow.wrap(data)
+    undo = bp.snapshot()
+    bp["blocks"][3]["transforms"][0][3][1] = 2.0
+    data = bp.to_dict()
+
+nodes are paths from the root, fetch them again after inserting or
+removing list items before them.
+"""
+
+# mbox
+from mbox.lego import binary
+
+#
+import logging
+from collections import OrderedDict
+
+try:
+    from collections.abc import Mapping, MutableMapping, MutableSequence
+except ImportError:
+    from collections import Mapping, MutableMapping, MutableSequence
+
+logger = logging.getLogger(__name__)
+
+
+def _copy(data):
+    """shallow copy of a container"""
+    if isinstance(data, OrderedDict):
+        return OrderedDict(data)
+    if isinstance(data, dict):
+        return dict(data)
+    if isinstance(data, Mapping):
+        return OrderedDict(data.items())
+    if isinstance(data, binary.TransformView):
+        return data.tolist()
+    return list(data)
+
+
+class _Tree(object):
+    """data of one blueprint version and the containers it owns
+
+    :param data: root container
+    """
+    __slots__ = ("data", "owned")
+
+    def __init__(self, data):
+        self.data = data
+        # id: container, containers copied by this version, written in place
+        self.owned = dict()
+
+    def get(self, path):
+        data = self.data
+        for key in path:
+            data = data[key]
+        return data
+
+    def own(self, path):
+        """container at path, copied along the path unless it is owned already"""
+        data = self.data
+        if id(data) not in self.owned:
+            data = self.data = _copy(data)
+            self.owned[id(data)] = data
+        for key in path:
+            child = data[key]
+            if id(child) not in self.owned:
+                child = _copy(child)
+                self.owned[id(child)] = child
+                data[key] = child
+            data = child
+        return data
+
+    def freeze(self):
+        """every container is shared from now on"""
+        self.owned.clear()
+
+
+def _wrap(tree, path, value):
+    if isinstance(value, Mapping):
+        return CowDict(tree, path)
+    if isinstance(value, (MutableSequence, binary.TransformView)):
+        return CowList(tree, path)
+    return value
+
+
+def _unwrap(value):
+    """raw data of a node, it is shared by both places afterwards"""
+    if isinstance(value, _Node):
+        value._tree.freeze()
+        return value._tree.get(value._path)
+    return value
+
+
+class _Node(object):
+    __slots__ = ("_tree", "_path")
+
+    def __init__(self, tree, path):
+        self._tree = tree
+        self._path = path
+
+    def _get(self):
+        return self._tree.get(self._path)
+
+    def _own(self):
+        return self._tree.own(self._path)
+
+    def __len__(self):
+        return len(self._get())
+
+    def __eq__(self, other):
+        if isinstance(other, _Node):
+            other = other._get()
+        return self._get() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{0}({1!r})".format(type(self).__name__, self._get())
+
+    def snapshot(self):
+        """independent version sharing every container
+
+        :return: node of the new version
+        """
+        self._tree.freeze()
+        return _wrap(_Tree(self._tree.data), self._path, self._get())
+
+    def to_dict(self):
+        """data of this version, untouched containers are shared with the source and snapshots,
+        further edits of this node copy again. deepcopy it before it is put next to the source
+
+        :return: OrderedDict or list, copied containers are plain, shared ones keep their type
+        """
+        self._tree.freeze()
+        return self._get()
+
+    @property
+    def owned(self):
+        """container count copied by this version"""
+        return len(self._tree.owned)
+
+
+class CowDict(_Node, MutableMapping):
+    """copy on write dict node"""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return _wrap(self._tree, self._path + (key,), self._get()[key])
+
+    def __setitem__(self, key, value):
+        self._own()[key] = _unwrap(value)
+
+    def __delitem__(self, key):
+        del self._own()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+
+class CowList(_Node, MutableSequence):
+    """copy on write list node"""
+    __slots__ = ()
+
+    def _index(self, index):
+        return range(len(self._get()))[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[x] for x in range(*index.indices(len(self._get())))]
+        index = self._index(index)
+        return _wrap(self._tree, self._path + (index,), self._get()[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._own()[index] = [_unwrap(x) for x in value]
+            return
+        self._own()[index] = _unwrap(value)
+
+    def __delitem__(self, index):
+        del self._own()[index]
+
+    def insert(self, index, value):
+        self._own().insert(index, _unwrap(value))
+
+
+def wrap(bp):
+    """copy on write blueprint, bp is shared and never written
+
+    :param bp: root or block blueprint
+    :return: CowDict
+    """
+    return _wrap(_Tree(bp), tuple(), bp)
@@ -0,0 +1,257 @@
+# -*- coding:utf-8 -*-
+"""blueprint diff module
+
+blocks are matched by name_direction_index, transforms are compared with a
+float tolerance. a patch holds only what changed and is plain json data.
+
+    patch = diff.diff(old_bp, new_bp)
+    diff.apply(old_bp, patch)
+    text = diff.dumps(patch)
+
+patch
+    root     - changed root values {key: value}
+    unset    - removed root keys
+    removed  - removed block names
+    added    - new blocks
+    modified - {block name: {"set": {key: value}, "unset": [key], "transforms": [[index, matrix], ...]}}
+    order    - block names, only when the order is not kept by removing and appending
+"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import scheduler, binary
+
+#
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+PATCH_VERSION = 1
+
+TOLERANCE = 1e-6
+
+
+class PatchError(Exception):
+    """patch can not be made or applied"""
+
+
+def _get_blocks(bp):
+    """
+    :param bp: root blueprint
+    :return: OrderedDict {block name: block}
+    """
+    blocks = OrderedDict()
+    for block in bp.get("blocks") or list():
+        name = scheduler.get_block_name(block)
+        if name in blocks:
+            raise PatchError("duplicated block : {0}".format(name))
+        blocks[name] = block
+    return blocks
+
+
+def _is_matrix_equal(a, b, tolerance):
+    try:
+        rows = list(zip(a, b))
+        if len(rows) != len(a) or len(rows) != len(b):
+            return False
+        for row_a, row_b in rows:
+            if len(row_a) != len(row_b):
+                return False
+            for value_a, value_b in zip(row_a, row_b):
+                if abs(value_a - value_b) > tolerance:
+                    return False
+    except TypeError:
+        return a == b
+    return True
+
+
+def _get_transforms_diff(old, new, tolerance):
+    """changed matrices, None if the transform count is changed
+
+    :return: [[index, matrix], ...] or None
+    """
+    if len(old) != len(new):
+        return None
+    changes = list()
+    for index, (a, b) in enumerate(zip(old, new)):
+        if not _is_matrix_equal(a, b, tolerance):
+            changes.append([index, b])
+    return changes
+
+
+def get_block_diff(old, new, tolerance=TOLERANCE):
+    """changes of one block
+
+    :param old: block blueprint
+    :param new: block blueprint
+    :param tolerance: transform value tolerance
+    :return: OrderedDict, empty if blocks are the same
+    """
+    changes = OrderedDict()
+    values = OrderedDict()
+    for key, value in new.items():
+        if key not in old:
+            values[key] = value
+        elif key == "transforms":
+            transforms = _get_transforms_diff(old[key], value, tolerance)
+            if transforms is None:
+                values[key] = value
+            elif transforms:
+                changes["transforms"] = transforms
+        elif old[key] != value:
+            values[key] = value
+    if values:
+        changes["set"] = values
+    unset = [key for key in old if key not in new]
+    if unset:
+        changes["unset"] = unset
+    return changes
+
+
+def diff(old, new, tolerance=TOLERANCE):
+    """patch turning old into new, values of new are shared, not copied
+
+    :param old: root blueprint
+    :param new: root blueprint
+    :param tolerance: transform value tolerance
+    :return: patch
+    """
+    old_blocks = _get_blocks(old)
+    new_blocks = _get_blocks(new)
+
+    patch = OrderedDict()
+    patch["patch"] = PATCH_VERSION
+    patch["root"] = OrderedDict((k, v) for k, v in new.items() if k != "blocks" and (k not in old or old[k] != v))
+    patch["unset"] = [k for k in old if k != "blocks" and k not in new]
+    patch["removed"] = [name for name in old_blocks if name not in new_blocks]
+    patch["added"] = [block for name, block in new_blocks.items() if name not in old_blocks]
+    patch["modified"] = OrderedDict()
+    for name, block in new_blocks.items():
+        if name in old_blocks:
+            changes = get_block_diff(old_blocks[name], block, tolerance)
+            if changes:
+                patch["modified"][name] = changes
+
+    removed = set(patch["removed"])
+    kept = [name for name in old_blocks if name not in removed]
+    kept.extend(name for name in new_blocks if name not in old_blocks)
+    if kept != list(new_blocks.keys()):
+        patch["order"] = list(new_blocks.keys())
+
+    logger.debug("diff removed {0}, added {1}, modified {2}".format(len(patch["removed"]),
+                                                                    len(patch["added"]),
+                                                                    len(patch["modified"])))
+    return patch
+
+
+def is_empty(patch):
+    """
+    :param patch: patch
+    :return: bool, True if blueprints are the same
+    """
+    return not any(patch.get(key) for key in ("root", "unset", "removed", "added", "modified", "order"))
+
+
+def _modify_block(block, changes):
+    for key in changes.get("unset", list()):
+        del block[key]
+    for key, value in changes.get("set", dict()).items():
+        block[key] = value
+    for index, matrix in changes.get("transforms", list()):
+        block["transforms"][index] = matrix
+
+
+def _apply_blocks(blocks, patch):
+    """apply removed, modified and added blocks to {block name: block}"""
+    for name in list(patch["removed"]) + list(patch["modified"].keys()):
+        if name not in blocks:
+            raise PatchError("block is not in the blueprint : {0}".format(name))
+
+    for name in patch["removed"]:
+        del blocks[name]
+    for name, changes in patch["modified"].items():
+        _modify_block(blocks[name], changes)
+    for block in patch["added"]:
+        name = scheduler.get_block_name(block)
+        if name in blocks:
+            raise PatchError("block already exists : {0}".format(name))
+        blocks[name] = block
+
+
+def _get_ordered(blocks, patch):
+    """
+    :return: [block, ...] in the patch order
+    """
+    if "order" not in patch:
+        return list(blocks.values())
+    if sorted(patch["order"]) != sorted(blocks.keys()):
+        raise PatchError("patch block order does not match the blueprint blocks")
+    return [blocks[name] for name in patch["order"]]
+
+
+def apply(bp, patch):
+    """apply patch in place
+
+    :param bp: root blueprint, same blocks as the diff source
+    :param patch: patch
+    :return: bp
+    """
+    if patch.get("patch") != PATCH_VERSION:
+        raise PatchError("unknown patch version : {0}".format(patch.get("patch")))
+
+    blocks = _get_blocks(bp)
+    _apply_blocks(blocks, patch)
+
+    for key in patch["unset"]:
+        del bp[key]
+    for key, value in patch["root"].items():
+        bp[key] = value
+
+    ordered = _get_ordered(blocks, patch)
+    if ordered or bp.get("blocks") is not None:
+        bp["blocks"] = ordered or None
+    return bp
+
+
+def dumps(patch):
+    """
+    :param patch: patch
+    :return: compact json string
+    """
+    return json.dumps(patch, ensure_ascii=False, separators=(",", ":"), default=binary.default)
+
+
+def loads(text):
+    """
+    :param text: json string
+    :return: patch
+    """
+    return json.loads(text, object_pairs_hook=OrderedDict)
+
+
+def get_summary(patch):
+    """readable lines for review
+
+    :param patch: patch
+    :return: [line, ...]
+    """
+    lines = list()
+    for key, value in patch["root"].items():
+        lines.append("~ root.{0} = {1!r}".format(key, value))
+    for key in patch["unset"]:
+        lines.append("- root.{0}".format(key))
+    for name in patch["removed"]:
+        lines.append("- {0}".format(name))
+    for block in patch["added"]:
+        lines.append("+ {0}".format(scheduler.get_block_name(block)))
+    for name, changes in patch["modified"].items():
+        keys = list(changes.get("set", dict()).keys()) + ["-" + x for x in changes.get("unset", list())]
+        if changes.get("transforms"):
+            keys.append("transforms[{0}]".format(", ".join(str(x[0]) for x in changes["transforms"])))
+        lines.append("~ {0} : {1}".format(name, ", ".join(keys)))
+    if "order" in patch:
+        lines.append("~ block order")
+    return lines
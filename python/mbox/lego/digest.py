@@ -0,0 +1,115 @@
+# -*- coding:utf-8 -*-
+"""blueprint content hash module
+
+stable hashes of the root data and of each block, sha1 of canonical json
+(sorted keys, compact, ascii) with transforms quantized to DECIMALS.
+the root hash combines the root data hash with the block hashes in order.
+model.Block caches its hash until it is changed, so hashing a blueprint
+costs O(changed blocks).
+
+    hashes = digest.get_block_hashes(bp)
+    added, removed, modified = digest.get_changed(hashes, bp)
+"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import scheduler, binary
+
+#
+import hashlib
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+HASH_VERSION = 1
+
+DECIMALS = 6
+
+_SCALE = 10 ** DECIMALS
+
+
+def quantize(transforms):
+    """transform values as integers of 10^-DECIMALS, -0.0 and float noise hash the same
+
+    :param transforms: block transforms
+    :return: [[[int, ...], ...], ...], transforms as they are if they are not numbers
+    """
+    try:
+        return [[[int(round(value * _SCALE)) for value in row] for row in matrix] for matrix in transforms]
+    except TypeError:
+        return transforms
+
+
+def _hash(kind, data):
+    text = json.dumps(data, sort_keys=True, separators=(",", ":"), default=binary.default)
+    return hashlib.sha1("{0}|{1}|{2}".format(HASH_VERSION, kind, text).encode("utf-8")).hexdigest()
+
+
+def get_block_hash(block):
+    """content hash of a block, computed every call
+
+    :param block: block blueprint
+    :return: hex string
+    """
+    data = dict((key, value) for key, value in block.items() if key != "transforms")
+    if "transforms" in block:
+        data["transforms"] = quantize(block["transforms"])
+    return _hash("block", data)
+
+
+def get_root_hash(bp):
+    """content hash of the root data without blocks
+
+    :param bp: root blueprint
+    :return: hex string
+    """
+    return _hash("root", dict((key, value) for key, value in bp.items() if key != "blocks"))
+
+
+def get_cached_hash(block):
+    """block hash, cached by model.Block
+
+    :param block: block blueprint
+    :return: hex string
+    """
+    if hasattr(type(block), "content_hash"):
+        return block.content_hash
+    return get_block_hash(block)
+
+
+def get_hash(bp):
+    """content hash of a root blueprint, root data and blocks in order
+
+    :param bp: root blueprint
+    :return: hex string
+    """
+    root = bp.root_hash if hasattr(type(bp), "root_hash") else get_root_hash(bp)
+    h = hashlib.sha1(root.encode("utf-8"))
+    for block in bp["blocks"] or list():
+        h.update(get_cached_hash(block).encode("utf-8"))
+    return h.hexdigest()
+
+
+def get_block_hashes(bp):
+    """
+    :param bp: root blueprint
+    :return: OrderedDict {block name: hash}
+    """
+    return OrderedDict((scheduler.get_block_name(x), get_cached_hash(x)) for x in bp["blocks"] or list())
+
+
+def get_changed(hashes, bp):
+    """blocks changed since hashes were taken, ex) last build, saved file, scene
+
+    :param hashes: get_block_hashes result
+    :param bp: root blueprint
+    :return: ([added name, ...], [removed name, ...], [modified name, ...])
+    """
+    current = get_block_hashes(bp)
+    added = [name for name in current if name not in hashes]
+    removed = [name for name in hashes if name not in current]
+    modified = [name for name, value in current.items() if name in hashes and hashes[name] != value]
+    return added, removed, modified
@@ -0,0 +1,95 @@
+# -*- coding:utf-8 -*-
+"""file io module
+
+files are written to a temp file and renamed over the target, an interrupted
+save leaves the previous file untouched.
+caches and checkpoints live in a per user directory, MBOX_USER_DIR or
+~/.cache/mbox (%LOCALAPPDATA%/mbox on windows), never in the shared temp dir.
+files which are executed or opened as scenes are checked with check_private.
+"""
+
+# mbox
+from mbox.vendor import six
+
+#
+import os
+import shutil
+import tempfile
+
+
+def _replace(source, destination):
+    if hasattr(os, "replace"):
+        os.replace(source, destination)
+        return
+    # python 2 on windows can not rename over an existing file
+    if os.name == "nt" and os.path.exists(destination):
+        os.remove(destination)
+    os.rename(source, destination)
+
+
+def get_user_dir(*names):
+    """
+    :param names: sub directories, ex) "build"
+    :return: path under the per user mbox directory, not created
+    """
+    base = os.environ.get("MBOX_USER_DIR")
+    if not base:
+        if os.name == "nt":
+            base = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "mbox")
+        else:
+            base = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "mbox")
+    return os.path.join(base, *names)
+
+
+def make_private_dir(path):
+    """create a directory only the user can write, an existing one is checked
+
+    :param path: directory
+    :return: path
+    :raises: OSError, see check_private
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path, 0o700)
+    check_private(path)
+    return path
+
+
+def check_private(path):
+    """
+    :param path: file or directory
+    :raises: OSError, path belongs to another user or other users can write it
+    """
+    if os.name == "nt":
+        return
+    stat = os.stat(path)
+    if stat.st_uid != os.getuid():
+        raise OSError("{0} belongs to another user".format(path))
+    if stat.st_mode & 0o022:
+        raise OSError("{0} is writable by other users".format(path))
+
+
+def write_atomic(path, data):
+    """write data to a temp file of the same directory then rename it to path
+
+    :param path: file path
+    :param data: bytes or text, text is saved as utf-8
+    :return:
+    """
+    if isinstance(data, six.text_type):
+        data = data.encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp = tempfile.mkstemp(prefix=".{0}.".format(os.path.basename(path)), suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(handle, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp)
+        else:
+            os.chmod(temp, 0o644)
+        _replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
@@ -0,0 +1,429 @@
+# -*- coding:utf-8 -*-
+"""build ir module
+
+scene steps can emit a flat op list instead of editing the scene. block
+modules write ops with emit_objects / emit_attributes / emit_operate
+(bp, context, contextName, builder), nodes are referenced by name.
+the executor merges and orders the ops and applies them to a target.
+
+    context = lego.lego(bp, "all", emit=True)
+    ir.save(context["ir"], path)
+    ir.execute(ir.load(path))
+
+program
+    ir    - IR_VERSION
+    steps - {step: [op, ...]}
+
+op
+    createNode   - name, type, parent, dag, matrix (world), icon, color
+    setTransform - node, matrix (world)
+    addAttr      - node, attr, type, value, options
+    connect      - source, destination
+    lock, hide   - node, attrs
+
+execution
+    1. setTransform of a node created by the program is folded into its createNode
+    2. lock and hide of a node are merged into one op
+    3. nodes are created level by level, parents first, under their parent,
+       so no node is reparented. a level is one MDagModifier
+    4. then transforms, attributes, connections, locks, hides
+on the memory scene backend ops go through the scene api (SceneTarget).
+"""
+
+# json
+import json
+
+# mbox
+from mbox.core import scene
+from mbox.lego import fileio
+
+#
+import os
+import difflib
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+IR_VERSION = 1
+
+OPERATIONS = ("createNode", "setTransform", "addAttr", "connect", "lock", "hide")
+
+# node types created without a dag parent
+DG_TYPES = ("network",
+            "multMatrix",
+            "decomposeMatrix",
+            "composeMatrix",
+            "inverseMatrix",
+            "plusMinusAverage",
+            "multiplyDivide",
+            "condition",
+            "reverse",
+            "clamp",
+            "blendColors",
+            "remapValue",
+            "pairBlend")
+
+
+class IRError(Exception):
+    """ir can not be emitted or executed"""
+
+
+def new_program():
+    """
+    :return: empty program
+    """
+    return OrderedDict([("ir", IR_VERSION), ("steps", OrderedDict())])
+
+
+def _matrix(m):
+    """4x4 float lists of a matrix, pymel matrix or lists"""
+    if m is None:
+        return None
+    return [[float(value) for value in row] for row in m]
+
+
+def _op(kind, *items):
+    return OrderedDict((("op", kind),) + items)
+
+
+class Builder(object):
+    """op recorder of a build, one op list per step"""
+
+    def __init__(self):
+        self.program = new_program()
+        self.ops = None
+
+    def begin(self, step):
+        """ops are recorded to step until the next begin
+
+        :param step: lego step
+        """
+        self.ops = self.program["steps"].setdefault(step, list())
+
+    def create_node(self, name, node_type="transform", parent=None, matrix=None, icon=None, color=None, dag=None):
+        """
+        :param name: node name
+        :param node_type: maya node type
+        :param parent: parent node name, None is the world
+        :param matrix: world matrix
+        :param icon: control icon of mbox.core.icon, the node is a curve
+        :param color: icon color
+        :param dag: default False for DG_TYPES
+        :return: name
+        """
+        dag = node_type not in DG_TYPES if dag is None else dag
+        self.ops.append(_op("createNode",
+                            ("name", name),
+                            ("type", node_type),
+                            ("parent", parent),
+                            ("dag", dag),
+                            ("matrix", _matrix(matrix)),
+                            ("icon", icon),
+                            ("color", color)))
+        return name
+
+    def set_transform(self, node, matrix):
+        """
+        :param node: node name
+        :param matrix: world matrix
+        """
+        self.ops.append(_op("setTransform", ("node", node), ("matrix", _matrix(matrix))))
+
+    def add_attr(self, node, attr, attr_type, value=None, **options):
+        """same arguments as mbox.core.attribute.add
+
+        :param node: node name
+        :param attr: long name
+        :param attr_type: attribute type
+        :param value: value
+        :param options: keyable, multi, minValue ...
+        """
+        self.ops.append(_op("addAttr",
+                            ("node", node),
+                            ("attr", attr),
+                            ("type", attr_type),
+                            ("value", value),
+                            ("options", OrderedDict(sorted(options.items())))))
+
+    def connect(self, source, destination):
+        """
+        :param source: node.attr
+        :param destination: node.attr
+        """
+        self.ops.append(_op("connect", ("source", source), ("destination", destination)))
+
+    def lock(self, node, attrs):
+        self.ops.append(_op("lock", ("node", node), ("attrs", list(attrs))))
+
+    def hide(self, node, attrs):
+        self.ops.append(_op("hide", ("node", node), ("attrs", list(attrs))))
+
+
+def get_ops(program, steps=None):
+    """
+    :param program: program
+    :param steps: step names, None is every step
+    :return: [op, ...]
+    """
+    return [op for step, ops in program["steps"].items() if steps is None or step in steps for op in ops]
+
+
+def _merge(ops):
+    """setTransform of created nodes folded into createNode, lock and hide merged by node
+
+    :return: (OrderedDict {name: createNode op}, [op, ...] other ops in execution order)
+    """
+    creates = OrderedDict()
+    transforms = OrderedDict()
+    attrs = list()
+    connections = list()
+    merged = OrderedDict([("lock", OrderedDict()), ("hide", OrderedDict())])
+    for op in ops:
+        kind = op["op"]
+        if kind == "createNode":
+            if op["name"] in creates:
+                raise IRError("node is created twice : {0}".format(op["name"]))
+            creates[op["name"]] = OrderedDict(op)
+        elif kind == "setTransform":
+            if op["node"] in creates:
+                creates[op["node"]]["matrix"] = op["matrix"]
+            else:
+                transforms[op["node"]] = op
+        elif kind == "addAttr":
+            attrs.append(op)
+        elif kind == "connect":
+            connections.append(op)
+        elif kind in merged:
+            entry = merged[kind].setdefault(op["node"], _op(kind, ("node", op["node"]), ("attrs", list())))
+            entry["attrs"].extend(x for x in op["attrs"] if x not in entry["attrs"])
+        else:
+            raise IRError("unknown op : {0}".format(kind))
+
+    rest = list(transforms.values()) + attrs + connections
+    rest += list(merged["lock"].values()) + list(merged["hide"].values())
+    return creates, rest
+
+
+def _get_levels(creates):
+    """
+    :param creates: OrderedDict {name: createNode op}
+    :return: [[createNode op, ...], ...] parents first
+    """
+    depth = dict()
+    for name in creates:
+        chain = list()
+        while name in creates and name not in depth:
+            chain.append(name)
+            if len(chain) > len(creates):
+                raise IRError("node parent cycle : {0}".format(name))
+            name = creates[name]["parent"]
+        level = depth.get(name, -1)
+        for node in reversed(chain):
+            level += 1
+            depth[node] = level
+    levels = [list() for _ in range(max(depth.values()) + 1)] if depth else list()
+    for name, op in creates.items():
+        levels[depth[name]].append(op)
+    return levels
+
+
+def optimize(ops):
+    """merged and ordered ops
+
+    :param ops: [op, ...]
+    :return: ([[createNode op, ...], ...] levels parents first, [op, ...] other ops in execution order)
+    """
+    creates, rest = _merge(ops)
+    return _get_levels(creates), rest
+
+
+class SceneTarget(object):
+    """applies ops through the scene api, pymel on maya or the memory scene"""
+
+    def __init__(self):
+        from mbox.core import attribute, icon
+        self.pm = scene.pm
+        self.attribute = attribute
+        self.icon = icon
+
+    def _matrix(self, matrix):
+        return scene.datatypes.Matrix(matrix) if matrix else scene.datatypes.Matrix()
+
+    def _create_icon(self, op):
+        parent = self.pm.PyNode(op["parent"]) if op["parent"] else None
+        return self.icon.create(parent, op["name"], m=self._matrix(op["matrix"]), color=op["color"], icon=op["icon"])
+
+    def create_nodes(self, ops):
+        for op in ops:
+            if op["icon"]:
+                self._create_icon(op)
+                continue
+            parent = op["parent"] if op["dag"] and op["parent"] else None
+            if parent:
+                node = self.pm.createNode(op["type"], name=op["name"], parent=parent)
+            else:
+                node = self.pm.createNode(op["type"], name=op["name"])
+            if op["matrix"]:
+                self.pm.PyNode(node).setMatrix(self._matrix(op["matrix"]), worldSpace=True)
+
+    def set_transform(self, op):
+        self.pm.PyNode(op["node"]).setMatrix(self._matrix(op["matrix"]), worldSpace=True)
+
+    def add_attr(self, op):
+        self.attribute.add(self.pm.PyNode(op["node"]), op["attr"], op["type"], op["value"], **op["options"])
+
+    def connect(self, op):
+        self.pm.connectAttr(op["source"], op["destination"], force=True)
+
+    def lock(self, op):
+        self.attribute.lock(self.pm.PyNode(op["node"]), op["attrs"])
+
+    def hide(self, op):
+        self.attribute.hide(self.pm.PyNode(op["node"]), op["attrs"])
+
+
+class MayaTarget(SceneTarget):
+    """applies ops to the maya scene, node creation through MDagModifier"""
+
+    def __init__(self):
+        if scene.BACKEND != "maya":
+            raise IRError("maya target needs the maya scene backend, current : {0}".format(scene.BACKEND))
+        super(MayaTarget, self).__init__()
+        self.om = scene.om
+        self.nodes = dict()
+
+    def _get(self, name):
+        if name not in self.nodes:
+            selection = self.om.MSelectionList()
+            selection.add(name)
+            self.nodes[name] = selection.getDependNode(0)
+        return self.nodes[name]
+
+    def _set_world(self, obj, matrix):
+        om = self.om
+        path = om.MDagPath.getAPathTo(obj)
+        world = om.MMatrix([value for row in matrix for value in row])
+        om.MFnTransform(path).setTransformation(om.MTransformationMatrix(world * path.exclusiveMatrixInverse()))
+
+    def create_nodes(self, ops):
+        om = self.om
+        modifier = om.MDagModifier()
+        created = list()
+        for op in ops:
+            if op["icon"]:
+                continue
+            if op["dag"]:
+                parent = self._get(op["parent"]) if op["parent"] else om.MObject.kNullObj
+                obj = modifier.createNode(op["type"], parent)
+            else:
+                obj = om.MDGModifier.createNode(modifier, op["type"])
+            modifier.renameNode(obj, op["name"])
+            created.append((op, obj))
+        modifier.doIt()
+
+        for op, obj in created:
+            self.nodes[op["name"]] = obj
+            if op["matrix"]:
+                self._set_world(obj, op["matrix"])
+        for op in ops:
+            if op["icon"]:
+                self.nodes[op["name"]] = self._create_icon(op).__apimobject__()
+
+    def set_transform(self, op):
+        self._set_world(self._get(op["node"]), op["matrix"])
+
+
+def get_target():
+    """
+    :return: MayaTarget on the maya scene backend, SceneTarget otherwise
+    """
+    return MayaTarget() if scene.BACKEND == "maya" else SceneTarget()
+
+
+_METHODS = {"setTransform": "set_transform",
+            "addAttr": "add_attr",
+            "connect": "connect",
+            "lock": "lock",
+            "hide": "hide"}
+
+
+def execute(program, target=None, steps=None):
+    """apply a program without running block logic
+
+    :param program: program
+    :param target: default get_target()
+    :param steps: step names, None is every step
+    :return: OrderedDict op counts, emitted and executed
+    """
+    if program.get("ir") != IR_VERSION:
+        raise IRError("unknown ir version : {0}".format(program.get("ir")))
+    target = get_target() if target is None else target
+    ops = get_ops(program, steps)
+    levels, rest = optimize(ops)
+    for level in levels:
+        target.create_nodes(level)
+    for op in rest:
+        getattr(target, _METHODS[op["op"]])(op)
+
+    counts = OrderedDict()
+    counts["emitted"] = len(ops)
+    counts["executed"] = sum(len(x) for x in levels) + len(rest)
+    counts["levels"] = len(levels)
+    logger.debug("ir executed {0} of {1} ops".format(counts["executed"], counts["emitted"]))
+    return counts
+
+
+def dumps(program):
+    """json with one op per line, so programs diff line by line
+
+    :param program: program
+    :return: string
+    """
+    lines = ['{{"ir": {0}, "steps": {{'.format(json.dumps(program["ir"]))]
+    steps = list(program["steps"].items())
+    for index, (step, ops) in enumerate(steps):
+        lines.append("  {0}: [".format(json.dumps(step)))
+        for number, op in enumerate(ops):
+            lines.append("    {0}{1}".format(json.dumps(op, separators=(", ", ": ")), "," if number < len(ops) - 1 else ""))
+        lines.append("  ]{0}".format("," if index < len(steps) - 1 else ""))
+    lines.append("}}")
+    return "\n".join(lines) + "\n"
+
+
+def loads(text):
+    """
+    :param text: json string
+    :return: program
+    """
+    return json.loads(text, object_pairs_hook=OrderedDict)
+
+
+def save(program, path):
+    """
+    :param program: program
+    :param path: file path
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fileio.write_atomic(path, dumps(program))
+
+
+def load(path):
+    """
+    :param path: file path
+    :return: program
+    """
+    with open(path, "r") as f:
+        return loads(f.read())
+
+
+def get_diff(old, new):
+    """unified diff of two programs
+
+    :param old: program
+    :param new: program
+    :return: [line, ...]
+    """
+    return list(difflib.unified_diff(dumps(old).splitlines(), dumps(new).splitlines(), "old", "new", lineterm=""))
@@ -0,0 +1,247 @@
+# -*- coding:utf-8 -*-
+"""blueprint journal module
+
+block changes can be appended to a journal next to the blueprint file
+instead of saving the whole blueprint. the journal is bound to its base file
+and is replayed on load, blueprint.compact_journal writes it into the base file.
+a journal of a base file changed after it (checked out, or saved by a save
+interrupted before the journal was removed) is stale, it is moved aside to
+blueprint-file.json.journal.stale with a warning and not replayed.
+
+    blueprint-file.json
+    blueprint-file.json.journal  - json lines, header then one change per line
+
+    j = journal.Journal(path)
+    j.modify(block)
+    j.remove("arm_left_0")
+    blueprint.compact_journal(path)
+"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import scheduler, validator, binary
+from mbox.vendor import six
+
+#
+import os
+import bisect
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+EXTENSION = ".journal"
+
+STALE_EXTENSION = ".stale"
+
+OPERATIONS = ("add", "remove", "modify", "root")
+
+
+class JournalError(Exception):
+    """journal can not be read or replayed"""
+
+
+def _get_stat(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime]
+
+
+def _get_positions(blocks):
+    """
+    :param blocks: blocks or LazyBlocks
+    :return: {block name: [position, ...]}, every position of a duplicated name in order
+    """
+    names = blocks.names() if hasattr(blocks, "names") else [scheduler.get_block_name(x) for x in blocks]
+    positions = dict()
+    for position, name in enumerate(names):
+        positions.setdefault(name, list()).append(position)
+    return positions
+
+
+class _Replay(object):
+    """journal entries applied to a blueprint, one method per operation.
+    removed blocks are deleted at the end, block positions stay valid while replaying
+
+    :param bp: root blueprint
+    """
+
+    def __init__(self, bp):
+        self.bp = bp
+        self.blocks = bp["blocks"]
+        self.positions = _get_positions(self.blocks)
+        self.removed = list()
+
+    def _pop(self, op, name):
+        positions = self.positions.get(name)
+        if not positions:
+            raise JournalError("{0} block is not in the blueprint : {1}".format(op, name))
+        return positions.pop(0)
+
+    def _validate(self, block):
+        validator.validate_block(block, self.bp["schemaVersion"])
+
+    def root(self, entry):
+        for key, value in entry["root"].items():
+            self.bp[key] = value
+
+    def add(self, entry):
+        self._validate(entry["block"])
+        name = scheduler.get_block_name(entry["block"])
+        self.positions.setdefault(name, list()).append(len(self.blocks))
+        self.blocks.append(entry["block"])
+
+    def remove(self, entry):
+        self.removed.append(self._pop("remove", entry["name"]))
+
+    def modify(self, entry):
+        self._validate(entry["block"])
+        position = self._pop("modify", entry["name"])
+        self.blocks[position] = entry["block"]
+        bisect.insort(self.positions.setdefault(scheduler.get_block_name(entry["block"]), list()), position)
+
+    def finish(self):
+        for position in sorted(self.removed, reverse=True):
+            del self.blocks[position]
+        if not len(self.blocks):
+            self.bp["blocks"] = None
+
+
+class Journal(object):
+    """append only block change journal of a blueprint file
+
+    :param path: base blueprint file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + EXTENSION
+
+    def exists(self):
+        return os.path.exists(self.journal_path)
+
+    def _read(self):
+        with open(self.journal_path, "rb") as f:
+            lines = f.read().decode("utf-8").splitlines()
+        if not lines:
+            return list()
+
+        header = json.loads(lines[0])
+        if header.get("journal") != JOURNAL_VERSION:
+            raise JournalError("unknown journal version : {0}".format(header.get("journal")))
+        if header["base"] != _get_stat(self.path):
+            stale = self.journal_path + STALE_EXTENSION
+            logger.warning("base blueprint is changed after the journal, "
+                           "the journal is not replayed and moved to {0}".format(stale))
+            if os.path.exists(stale):
+                os.remove(stale)
+            os.rename(self.journal_path, stale)
+            return list()
+        return lines
+
+    def _append(self, entry):
+        if not os.path.exists(self.path):
+            raise JournalError("base blueprint is not saved : {0}".format(self.path))
+        if self.exists():
+            # a stale journal is moved aside, a new one starts on the base file
+            self._read()
+
+        lines = list()
+        if not self.exists() or not os.path.getsize(self.journal_path):
+            header = OrderedDict([("journal", JOURNAL_VERSION), ("base", _get_stat(self.path))])
+            lines.append(json.dumps(header))
+        else:
+            with open(self.journal_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # torn line of an interrupted append stays on its own line
+                    lines.append("")
+        lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=binary.default))
+
+        text = "\n".join(lines) + "\n"
+        with open(self.journal_path, "ab") as f:
+            f.write(text.encode("utf-8") if isinstance(text, six.text_type) else text)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add(self, block):
+        """record a new block
+
+        :param block: block blueprint
+        """
+        self._append(OrderedDict([("op", "add"), ("block", block)]))
+
+    def remove(self, name):
+        """record a removed block
+
+        :param name: name_direction_index ex)arm_left_0
+        """
+        self._append(OrderedDict([("op", "remove"), ("name", name)]))
+
+    def modify(self, block, name=None):
+        """record a changed block
+
+        :param block: block blueprint
+        :param name: previous block name, if the block is renamed
+        """
+        name = name or scheduler.get_block_name(block)
+        self._append(OrderedDict([("op", "modify"), ("name", name), ("block", block)]))
+
+    def root(self, bp):
+        """record changed root data, blocks are not recorded
+
+        :param bp: root blueprint
+        """
+        data = OrderedDict((k, v) for k, v in bp.items() if k != "blocks")
+        self._append(OrderedDict([("op", "root"), ("root", data)]))
+
+    def entries(self):
+        """recorded changes in order
+
+        :return: [entry, ...], empty for a stale journal
+        :raises: JournalError of an unknown journal version or operation
+        """
+        if not self.exists():
+            return list()
+        lines = self._read()
+
+        entries = list()
+        for number, line in enumerate(lines[1:]):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line, object_pairs_hook=OrderedDict)
+            except ValueError:
+                logger.warning("journal line {0} is broken and skipped : {1}".format(number + 2, self.journal_path))
+                continue
+            if entry.get("op") not in OPERATIONS:
+                raise JournalError("unknown journal operation : {0}".format(entry.get("op")))
+            entries.append(entry)
+        return entries
+
+    def replay(self, bp):
+        """apply recorded changes to the blueprint loaded from the base file
+
+        :param bp: root blueprint
+        :return: bp
+        """
+        entries = self.entries()
+        if not entries:
+            return bp
+
+        if bp["blocks"] is None:
+            bp["blocks"] = list()
+        replay = _Replay(bp)
+        for entry in entries:
+            getattr(replay, entry["op"])(entry)
+        replay.finish()
+        logger.debug("journal replayed {0} changes : {1}".format(len(entries), self.journal_path))
+        return bp
+
+    def clear(self):
+        """remove the journal, ex) after the base file is saved"""
+        if self.exists():
+            os.remove(self.journal_path)
@@ -0,0 +1,320 @@
+# -*- coding:utf-8 -*-
+"""lazy blueprint module
+
+large blueprint files (crowd variants, character and props) are indexed in
+one pass over the memory mapped file. only the root is parsed, every block
+keeps its byte span and its name, direction, index. a block is read,
+parsed and validated when it is first accessed.
+the index of an unchanged file is cached in the per user directory.
+
+    bp = lazy.load(path)
+    bp["blocks"].names()
+    block = blueprint.get_specific_block_blueprint(bp, "arm_left_0")
+"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import validator, fileio
+
+#
+import os
+import re
+import mmap
+import hashlib
+import logging
+from collections import OrderedDict
+
+try:
+    from collections.abc import MutableSequence
+except ImportError:
+    from collections import MutableSequence
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get("MBOX_INDEX_DIR", fileio.get_user_dir("index"))
+
+_STRING = br'"[^"\\]*(?:\\.[^"\\]*)*"'
+
+# array without objects, nested up to matrices
+_ARRAY = br'\[[^\[\]{}"]*(?:' + _STRING + br'[^\[\]{}"]*)*\]'
+_ARRAY = br'\[[^\[\]{}"]*(?:(?:' + _STRING + br'|' + _ARRAY + br')[^\[\]{}"]*)*\]'
+_ARRAY = br'\[[^\[\]{}"]*(?:(?:' + _STRING + br'|' + _ARRAY + br')[^\[\]{}"]*)*\]'
+
+# key (1) with a flat value, string value captured (2), string, flat array,
+# opening (3) or closing (4) character. separators are skipped inside the match.
+# a block is read in a few tokens, only objects and deeper arrays are walked
+_TOKEN = re.compile(br'[\s,]*(?:(' + _STRING + br')\s*:\s*(?:(' + _STRING + br')|' + _ARRAY + br'|[^\[\]{}",]*)|'
+                    + _STRING + br'|' + _ARRAY + br'|([{\[])|([}\]]))')
+
+_INDEXED_KEYS = (b'"name"', b'"direction"', b'"index"')
+
+
+class LazyLoadError(Exception):
+    """blueprint file can not be indexed or changed after indexing"""
+
+
+class _Span(object):
+    """indexed block not materialized yet"""
+    __slots__ = ("start", "end", "name", "direction", "index")
+
+    def __init__(self, start):
+        self.start = start
+        self.end = None
+        self.name = None
+        self.direction = None
+        self.index = None
+
+
+def _decode(token):
+    return json.loads(token.decode("utf-8"))
+
+
+class _Indexer(object):
+    """index state of get_index, brackets and the blocks key, blocks are objects at depth 3"""
+    __slots__ = ("data", "depth", "start", "end", "spans", "span")
+
+    def __init__(self, data):
+        self.data = data
+        self.depth = 0
+        self.start = None
+        self.end = None
+        self.spans = list()
+        self.span = None
+
+    def open(self, match):
+        self.depth += 1
+        if self.depth == 3 and self.span is None and self.start is not None and self.end is None:
+            self.span = _Span(match.start(3))
+
+    def close(self, match):
+        self.depth -= 1
+        if self.depth == 2 and self.span is not None:
+            self.span.end = match.end()
+            self.spans.append(self.span)
+            self.span = None
+        elif self.depth == 1 and self.start is not None and self.end is None:
+            self.end = match.end()
+
+    def blocks(self, match):
+        data = self.data
+        start = data.find(b":", match.end(1)) + 1
+        while data[start:start + 1].isspace():
+            start += 1
+        self.start = start
+        if match.end() > start:
+            # null, or an array without objects
+            end = match.end()
+            while data[end - 1:end].isspace():
+                end -= 1
+            self.end = end
+
+
+def get_index(data):
+    """one pass index of a json blueprint
+
+    :param data: bytes like, mmap
+    :return: (blocks value start, blocks value end, [_Span, ...])
+             start, end are None when blueprint has no blocks key
+    """
+    indexer = _Indexer(data)
+    brackets = (None, None, None, indexer.open, indexer.close)
+    for match in _TOKEN.finditer(data):
+        group = match.lastindex
+        if group is None:
+            # string or flat array
+            continue
+        if group > 2:
+            brackets[group](match)
+        elif indexer.depth == 3:
+            if group == 2 and indexer.span is not None and match.group(1) in _INDEXED_KEYS:
+                setattr(indexer.span, _decode(match.group(1)), _decode(match.group(2)))
+        elif indexer.depth == 1 and indexer.start is None and match.group(1) == b'"blocks"':
+            indexer.blocks(match)
+
+    if indexer.depth != 0 or (indexer.start is not None and indexer.end is None):
+        raise LazyLoadError("blueprint json is not complete")
+    return indexer.start, indexer.end, indexer.spans
+
+
+class LazyBlocks(MutableSequence):
+    """blueprint blocks, a block is read and validated on first access
+
+    :param path: blueprint file
+    :param version: schemaVersion
+    :param spans: [_Span, ...]
+    """
+
+    def __init__(self, path, version, spans):
+        self.path = path
+        self.version = version
+        self._entries = list(spans)
+        self._stat = self._get_stat()
+
+    def _get_stat(self):
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime
+
+    def _materialize(self, position):
+        entry = self._entries[position]
+        if not isinstance(entry, _Span):
+            return entry
+        if self._get_stat() != self._stat:
+            raise LazyLoadError("blueprint file is changed after indexing : {0}".format(self.path))
+        with open(self.path, "rb") as f:
+            f.seek(entry.start)
+            text = f.read(entry.end - entry.start)
+        block = json.loads(text.decode("utf-8"), object_pairs_hook=OrderedDict)
+        validator.validate_block(block, self.version)
+        self._entries[position] = block
+        return block
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(x) for x in range(*index.indices(len(self._entries)))]
+        return self._materialize(range(len(self._entries))[index])
+
+    def __setitem__(self, index, block):
+        self._entries[index] = block
+
+    def __delitem__(self, index):
+        del self._entries[index]
+
+    def insert(self, index, block):
+        self._entries.insert(index, block)
+
+    def get_info(self, position):
+        """name, direction, index of a block without materializing it
+
+        :param position: block position
+        :return: (name, direction, index)
+        """
+        entry = self._entries[position]
+        if isinstance(entry, _Span):
+            if None in (entry.name, entry.direction, entry.index):
+                entry = self._materialize(position)
+            else:
+                return entry.name, entry.direction, entry.index
+        return entry["name"], entry["direction"], entry["index"]
+
+    def names(self):
+        """block names in blueprint order
+
+        :return: [name_direction_index, ...]
+        """
+        return ["{0}_{1}_{2}".format(*self.get_info(x)) for x in range(len(self._entries))]
+
+    def get_block(self, name):
+        """materialized block by name, same as blueprint.get_specific_block_blueprint
+
+        :param name: name_direction_index ex)arm_left_0
+        :return: block blueprint or None
+        """
+        names = self.names()
+        if name not in names:
+            return None
+        # the last block of the same name wins, as get_specific_block_blueprint
+        return self._materialize(len(names) - 1 - names[::-1].index(name))
+
+    @property
+    def materialized(self):
+        """materialized block count"""
+        return len([x for x in self._entries if not isinstance(x, _Span)])
+
+    def tolist(self):
+        """every block, materialized
+
+        :return: [block, ...]
+        """
+        return self[:]
+
+
+def _get_stat(path):
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime]
+
+
+def _get_cache_path(stat):
+    key = "{0}|{1}|{2}".format(*stat)
+    return os.path.join(CACHE_DIR, "{0}.json".format(hashlib.sha1(key.encode("utf-8")).hexdigest()))
+
+
+def _read_cache(stat):
+    """cached index of an unchanged file
+
+    :param stat: _get_stat of the blueprint file
+    :return: (start, end, [_Span, ...]) or None
+    """
+    cache = _get_cache_path(stat)
+    if not os.path.exists(cache):
+        return None
+    try:
+        fileio.check_private(CACHE_DIR)
+        fileio.check_private(cache)
+        with open(cache, "r") as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        logger.warning("blueprint index cache is not used {0}".format(e))
+        return None
+    if data.get("file") != stat:
+        return None
+    spans = list()
+    for start, end, name, direction, index in data["spans"]:
+        span = _Span(start)
+        span.end, span.name, span.direction, span.index = end, name, direction, index
+        spans.append(span)
+    return data["start"], data["end"], spans
+
+
+def _write_cache(stat, index):
+    start, end, spans = index
+    data = {"file": stat,
+            "start": start,
+            "end": end,
+            "spans": [[x.start, x.end, x.name, x.direction, x.index] for x in spans]}
+    try:
+        fileio.make_private_dir(CACHE_DIR)
+        fileio.write_atomic(_get_cache_path(stat), json.dumps(data, separators=(",", ":")))
+    except (IOError, OSError) as e:
+        logger.warning("blueprint index cache is not writable {0}".format(e))
+
+
+def load(path, cache=True):
+    """lazy blueprint, root is parsed and validated, blocks are indexed only
+
+    :param path: json blueprint file
+    :param cache: reuse the index of an unchanged file from CACHE_DIR
+    :return: root blueprint, ["blocks"] is LazyBlocks
+    """
+    # taken before indexing, a file changed meanwhile is indexed again next time
+    stat = _get_stat(path)
+    index = _read_cache(stat) if cache else None
+    if index is None:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            index = get_index(data)
+        finally:
+            data.close()
+        if cache and index[2]:
+            _write_cache(stat, index)
+
+    start, end, spans = index
+    with open(path, "rb") as f:
+        if start is None or not spans:
+            root = json.loads(f.read().decode("utf-8"), object_pairs_hook=OrderedDict)
+            validator.validate(root)
+            return root
+        text = f.read(start)
+        f.seek(end)
+        text += b"null" + f.read()
+
+    root = json.loads(text.decode("utf-8"), object_pairs_hook=OrderedDict)
+    validator.validate(root)
+    root["blocks"] = LazyBlocks(path, root["schemaVersion"], spans)
+    logger.debug("lazy blueprint {0} blocks : {1}".format(len(spans), path))
+    return root
@@ -1,23 +1,14 @@
 # -*- coding:utf-8 -*-
 """lego rig module"""
 
-# maya
-import pymel.core as pm
-
-# json
-import json
-from mbox.vendor import jsonschema
-
 # mbox
-from mbox.core import transform
+from mbox.lego import scheduler, script, ir, checkpoint, naming, registry as name_registry, cache as build_cache
 
 #
-import os
-import sys
-import copy
 import logging
-import imp
+import importlib
 from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 logger = logging.getLogger(__name__)
 
@@ -31,57 +22,266 @@ def prepare(context):
     logger.info("Step. prepare")
 
     # scripts
+    if context["runPreScripts"]:
+        context["scriptTimes"].update(script.run_scripts(context["preScripts"], context, "prepare"))
+
+
+def get_block_module(block):
+    """block build module
+
+    :param block: block blueprint
+    :return: mbox.lego.box.{component}
+    """
+    return importlib.import_module("mbox.lego.box.{block}".format(block=block["component"]))
+
+
+def reserve_names(bp, context):
+    """reserve the rig structure and guide names in the registry of the context
+
+    :param bp: root blueprint
+    :param context: lego context
+    :return:
+    """
+    registry = context["registry"]
+    box = importlib.import_module("mbox.lego.box")
+    registry.reserve_names(context["name"], box.get_names(context))
+    guide = importlib.import_module("mbox.lego.box.blueprint")
+    registry.reserve_names("guide", guide.get_guide_names(bp))
+    for block in bp["blocks"] or list():
+        mod = importlib.import_module("mbox.lego.box.{block}.blueprint".format(block=block["component"]))
+        if hasattr(mod, "get_guide_names"):
+            registry.reserve_names(scheduler.get_block_name(block), mod.get_guide_names(block))
+
+
+def _call_block(context, step, name, component, func, *args):
+    """func(*args) of one block step, measured by the profiler and reported to the progress of the context
+
+    :return: func result, None if func is None
+    """
+    profiler = context.get("profiler")
+    progress = context.get("progress")
+    if progress is not None:
+        progress.start_block(step, name, component)
+    if func is None:
+        result = None
+    elif profiler is None:
+        result = func(*args)
+    else:
+        with profiler.block(step, name, component):
+            result = func(*args)
+    if progress is not None:
+        progress.finish_block(step, name, component)
+    return result
+
+
+def _compute_block(args):
+    """compute one block pure data
+
+    :param args: (block blueprint, context, block name)
+    :return: OrderedDict
+    """
+    block, context, name = args
+    return _call_block(context, "compute", name, block["component"], _compute, block, context, name)
+
+
+def _compute(block, context, name):
+    mod = get_block_module(block)
+    if hasattr(mod, "compute"):
+        return mod.compute(block, context, name)
+    data = OrderedDict()
+    data["parent"] = context["parents"][name]
+    data["transforms"] = [[list(row) for row in m] for m in block["transforms"]]
+    return data
+
+
+def _get_cached(cache, context, block, name, keys, context_key):
+    """computed data of an unchanged block, the block key is stored in keys
+
+    :return: OrderedDict, None if the block is not cached
+    """
+    keys[name] = build_cache.get_block_key(block, context_key, [keys[x] for x in context["dependencies"][name]])
+    data = cache.get("compute", keys[name])
+    progress = context.get("progress")
+    if data is not None and progress is not None:
+        progress.start_block("compute", name, block["component"])
+        progress.finish_block("compute", name, block["component"], cached=True)
+    return data
+
+
+def compute(bp, context, workers=1, cache=None):
+    """compute every block pure data(names, matrices, control specs) from the blueprint dict alone
+    no scene edits here. blocks of the same schedule group run in a thread pool,
+    results are stored in schedule order so output does not depend on workers.
+
+    :param bp: root blueprint
+    :param context:
+    :param workers: thread count, 1 is serial
+    :param cache: BuildCache, unchanged blocks reuse their computed data
+    :return:
+    """
+    logger.info("Step. compute")
+
+    blocks = OrderedDict((scheduler.get_block_name(x), x) for x in bp["blocks"] or list())
+    [get_block_module(x) for x in OrderedDict((x["component"], x) for x in blocks.values()).values()]
+
+    keys = dict()
+    context_key = build_cache.get_context_key(context) if cache is not None else None
+
+    pool = ThreadPool(workers) if workers > 1 else None
     try:
-        for script in context["preScripts"]:
-            logger.info("import. {0}".format(script))
-            mod = imp.load_source(pm.Path(script).namebase, pm.Path(script).rstrip())
-            logger.info("Run. {0}".format(script))
-            mod.main(context)
-    except ImportError as e:
-        logger.error("ImportError {0}".format(e))
-    except RuntimeError as e:
-        logger.error("RuntimeError {0}".format(e))
-    except SyntaxError as e:
-        logger.error("SyntaxError {0}".format(e))
-
-
-def objects(context):
+        for group in context["schedule"]:
+            args = list()
+            for name in group:
+                data = _get_cached(cache, context, blocks[name], name, keys, context_key) if cache is not None else None
+                if data is not None:
+                    context[name] = data
+                    continue
+                args.append((blocks[name], context, name))
+            results = pool.map(_compute_block, args) if pool and len(args) > 1 else [_compute_block(x) for x in args]
+            for (block, _, name), data in zip(args, results):
+                context[name] = data
+                if cache is not None:
+                    cache.set("compute", keys[name], data)
+            # names are reserved in schedule order, cached or computed
+            for name in group:
+                context["registry"].reserve_block(name, context[name])
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+
+def _apply_blocks(bp, context, step):
+    """apply computed block data to the scene, serial in schedule order
+
+    :param bp: root blueprint
+    :param context:
+    :param step: objects, attributes, operate
+    :return:
+    """
+    blocks = OrderedDict((scheduler.get_block_name(x), x) for x in bp["blocks"] or list())
+    if context.get("cache") is not None:
+        # scene edits are never cached
+        context["cache"].miss(step, len(blocks))
+    builder = context.get("builder")
+    if builder is not None:
+        builder.begin(step)
+    for group in context["schedule"]:
+        for name in group:
+            mod = get_block_module(blocks[name])
+            if builder is not None:
+                emit = getattr(mod, "emit_" + step, None)
+                if emit is None and hasattr(mod, step):
+                    raise ir.IRError("{0} can not emit {1}".format(blocks[name]["component"], step))
+                func, args = emit, (blocks[name], context, name, builder)
+            else:
+                func, args = getattr(mod, step, None), (blocks[name], context, name)
+            _call_block(context, step, name, blocks[name]["component"], func, *args)
+            if step == "objects":
+                context["registry"].bind(name, context[name].get("nodes"))
+
+
+def objects(bp, context):
     """generate nodes
 
     :return:
     """
     logger.info("Step. objects")
+    _apply_blocks(bp, context, "objects")
 
 
-def attributes(context):
+def attributes(bp, context):
     """generate attributes
 
     :return:
     """
     logger.info("Step. attributes")
+    _apply_blocks(bp, context, "attributes")
 
 
-def operate(context):
+def operate(bp, context):
     """apply operation
 
     :return:
     """
     logger.info("Step. operate")
+    _apply_blocks(bp, context, "operate")
 
 
 def finalize(context):
     """set, unused node delete, other cleanup
-    poseScripts run
+    postScripts run, scene free scripts concurrently if context scriptWorkers > 1
 
     :return:
     """
     logger.info("Step. finalize")
 
+    # scripts
+    if context["runPostScripts"]:
+        context["scriptTimes"].update(script.run_scripts(context["postScripts"],
+                                                         context,
+                                                         "finalize",
+                                                         workers=context["scriptWorkers"]))
+
+
+def get_plan(bp, cache=None):
+    """block schedule, parents and dependencies by block name
 
-def lego(bp, step):
+    :param bp: root blueprint
+    :param cache: BuildCache, reused while the blueprint is unchanged
+    :return: OrderedDict
     """
+    key = build_cache.get_blueprint_key(bp) if cache is not None else None
+    plan = cache.get("schedule", key) if cache is not None else None
+    if plan is not None:
+        return plan
 
-    :return:
+    graph = scheduler.get_dependency_graph(bp)
+    plan = OrderedDict()
+    plan["schedule"] = [[scheduler.get_block_name(x) for x in group] for group in scheduler.get_schedule(bp, graph)]
+    plan["parents"] = scheduler.get_parents(bp)
+    plan["dependencies"] = graph
+    if cache is not None:
+        cache.set("schedule", key, plan)
+    return plan
+
+
+def _run_step(context, step, func, *args):
+    profiler = context["profiler"]
+    checkpoints = context["checkpoints"]
+    progress = context["progress"]
+    nodes = checkpoints.begin(step) if checkpoints is not None else None
+    if progress is not None:
+        progress.start_step(step)
+    if profiler is None:
+        func(*args)
+    else:
+        with profiler.step(step):
+            func(*args)
+    if progress is not None:
+        progress.finish_step(step)
+    if checkpoints is not None:
+        checkpoints.end(context, step, nodes)
+
+
+def _check_resume(resume_from, checkpoints, emit):
+    """
+    :raises: checkpoint.CheckpointError, the build can not resume from the step
+    """
+    if resume_from is None:
+        return
+    if checkpoints is None:
+        raise checkpoint.CheckpointError("resume from {0} needs checkpoints".format(resume_from))
+    if resume_from not in checkpoint.STEPS:
+        raise checkpoint.CheckpointError("unknown step : {0}".format(resume_from))
+    if emit:
+        raise checkpoint.CheckpointError("emitted builds can not resume")
+
+
+def _new_context(bp, cache, profiler, script_workers, emit, checkpoints, progress, name_policy):
+    """lego context of the build options, names of the rig and the guides are reserved
+
+    :return: context
     """
     context = OrderedDict()
     context["process"] = bp["process"]
@@ -97,18 +297,91 @@ def lego(bp, step):
     context["runPostScripts"] = bp["runPostScripts"]
     context["preScripts"] = bp["preScripts"]
     context["postScripts"] = bp["postScripts"]
+    context["namer"] = naming.get_namer(context)
+    plan = get_plan(bp, cache)
+    context["schedule"] = plan["schedule"]
+    context["parents"] = plan["parents"]
+    context["dependencies"] = plan["dependencies"]
+    context["cache"] = cache
+    context["profiler"] = profiler
+    context["scriptWorkers"] = script_workers
+    context["scriptTimes"] = OrderedDict()
+    context["builder"] = ir.Builder() if emit else None
+    context["ir"] = context["builder"].program if emit else None
+    context["checkpoints"] = checkpoints
+    context["progress"] = progress
+    context["registry"] = name_registry.NameRegistry(name_policy)
+    reserve_names(bp, context)
+    return context
 
-    prepare(context)
-    if step == "prepare":
-        return
-    objects(context)
-    if step == "objects":
-        return
-    attributes(context)
-    if step == "attributes":
-        return
-    operate(context)
-    if step == "operate":
-        return
-    finalize(context)
 
+def _prepare_build(bp, step, context, workers, resume_from):
+    """step functions and the step names to run,
+    checkpoints start and the checkpoint before resume_from is restored
+
+    :return: OrderedDict {step: (func, args)}, [step, ...]
+    """
+    steps = OrderedDict()
+    steps["prepare"] = (prepare, (context,))
+    steps["compute"] = (compute, (bp, context, workers, context["cache"]))
+    steps["objects"] = (objects, (bp, context))
+    steps["attributes"] = (attributes, (bp, context))
+    steps["operate"] = (operate, (bp, context))
+    steps["finalize"] = (finalize, (context,))
+
+    checkpoints = context["checkpoints"]
+    if checkpoints is not None:
+        checkpoints.start(bp)
+    names = list(steps.keys())
+    if resume_from is not None:
+        checkpoints.restore(context, resume_from)
+        names = names[names.index(resume_from):]
+        for name in checkpoint.get_block_data(context):
+            context["registry"].reserve_block(name, context[name])
+            context["registry"].bind(name, context[name].get("nodes"))
+    if step in names:
+        names = names[:names.index(step) + 1]
+    return steps, names
+
+
+def lego(bp, step, workers=1, cache=None, profiler=None, script_workers=1, emit=False, checkpoints=None,
+         resume_from=None, progress=None, name_policy="warn"):
+    """
+
+    :param bp: root blueprint, dict or model.Root
+    :param step: prepare, compute, objects, attributes, operate, all
+                 compute stops before any scene edit
+    :param workers: compute step thread count
+    :param cache: cache.BuildCache, hits and misses by cache.get_report()
+    :param profiler: profiler.Profiler, times, scene calls and created nodes
+    :param script_workers: thread count of scene free post scripts
+    :param emit: scene steps emit ir to context["ir"] instead of editing the scene, ir.execute applies it
+    :param checkpoints: checkpoint.Checkpoints, a checkpoint is recorded after every step
+    :param resume_from: step, the checkpoint of the step before it is restored and the build runs from it
+    :param progress: progress.Progress, step and block events to its subscribers
+    :param name_policy: error, suffix, warn, colliding block names of context["registry"]
+    :return: context
+    """
+    _check_resume(resume_from, checkpoints, emit)
+    context = _new_context(bp, cache, profiler, script_workers, emit, checkpoints, progress, name_policy)
+    steps, names = _prepare_build(bp, step, context, workers, resume_from)
+
+    if profiler is not None:
+        profiler.start()
+    if progress is not None:
+        count = len(bp["blocks"] or list())
+        progress.start_build(bp, names, dict((x, count) for x in ("compute", "objects", "attributes", "operate")))
+    error = None
+    try:
+        for name in names:
+            func, args = steps[name]
+            _run_step(context, name, func, *args)
+        return context
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        if progress is not None:
+            progress.finish_build(error)
@@ -1,13 +1,17 @@
 # -*- coding:utf-8 -*-
 
 # maya
-import pymel.core as pm
+from mbox.core import scene
+from mbox.core.scene import pm
 
 # mbox
 import mbox
 from mbox import version
 from mbox.lego import blueprint
 from mbox.lego import lego
+from mbox.lego import profiler as build_profiler
+from mbox.lego import checkpoint
+from mbox.lego import progress as build_progress
 
 #
 import logging
@@ -56,17 +60,28 @@ def duplicate_blueprint_component(node, mirror=False, apply=True):
     blueprint.duplicate_blueprint(node.getParent(generations=-1), specific_block, mirror=mirror, apply=apply)
 
 
-def build(bp, selected=None, window=True, step="all"):
+def build(bp, selected=None, window=True, step="all", workers=1, profile=False, profile_blocks=None,
+          checkpoint_steps=False, resume_from=None, progress=None, discard_changes=False):
     """build rig from selection node
 
     :param bp:
     :param selected:
     :param window:
     :param step:
+    :param workers: compute step thread count
+    :param profile: log a time sorted summary and save a json report to profiler.REPORT_DIR
+    :param profile_blocks: block names captured with cProfile when profile is True
+    :param checkpoint_steps: record a checkpoint with a scene snapshot after every step
+    :param resume_from: step, resume from the checkpoints of the last checkpointed build of the rig
+    :param progress: progress.Progress, default a progress window with the window in maya
+    :param discard_changes: resume_from restores the snapshot even if the maya scene has unsaved changes
     :return:
     """
-    if window:
+    if window and not scene.is_headless():
         log_window()
+        if progress is None:
+            progress = build_progress.Progress()
+            progress.subscribe(progress_window())
     mbox.log_information()
 
     if selected:
@@ -74,7 +89,21 @@ def build(bp, selected=None, window=True, step="all"):
         bp = blueprint.get_blueprint_from_hierarchy(selected)
     else:
         logger.info("no selection")
-    lego.lego(bp, step)
+    profiler = build_profiler.Profiler(profile_blocks) if profile else None
+    checkpoints = None
+    if checkpoint_steps or resume_from:
+        checkpoints = checkpoint.get_checkpoints(bp, force=discard_changes)
+    lego.lego(bp,
+              step,
+              workers=workers,
+              profiler=profiler,
+              checkpoints=checkpoints,
+              resume_from=resume_from,
+              progress=progress)
+    if profiler:
+        for line in profiler.get_summary():
+            logger.info(line)
+        logger.info("profile report : {0}".format(profiler.save()))
 
 
 def log_window():
@@ -99,3 +128,31 @@ def log_window():
         pm.showWindow(log_window_name)
 
 
+def progress_window(rate=10):
+    """build progress window updated at most rate times a second
+
+    :param rate: updates a second
+    :return: progress.Throttle subscriber
+    """
+    last = dict(percent=0)
+
+    def update(event):
+        if event["event"] == "buildStarted":
+            last["percent"] = 0
+            pm.progressWindow(title="Lego Build", progress=0, maxValue=100, status="build", isInterruptable=False)
+            return
+        if event["event"] == "buildFinished":
+            pm.progressWindow(endProgress=True)
+            return
+        if event["event"] == "warning":
+            # warnings have no index, the bar keeps its last percent
+            pm.progressWindow(edit=True, progress=last["percent"], status="warning {0}".format(event["message"]))
+            return
+        if event["count"]:
+            last["percent"] = int(100.0 * event["index"] / event["count"])
+        status = "{0} {1}/{2}".format(event["step"], event["index"], event["count"] or 0)
+        if event["eta"] is not None:
+            status += " eta {0:.0f}s".format(event["eta"])
+        pm.progressWindow(edit=True, progress=last["percent"], status=status)
+
+    return build_progress.Throttle(update, rate=rate, main_thread=True)
@@ -0,0 +1,396 @@
+# -*- coding:utf-8 -*-
+"""blueprint model module
+
+Root and Block keep blueprint keys in slots instead of a dict per block.
+transforms are packed in one float64 array per block (binary.TransformView),
+names, directions, components and meta strings are interned and the key
+order tuple is shared by every block of the same keys.
+models are read like the dict blueprint, bp["blocks"][0]["transforms"][0],
+so scheduler, draw_from_blueprint and lego.lego take them as they are.
+content hashes are cached until the model changes. nested values (meta,
+nameRule) are kept in tracked dicts and lists which clear the hash of their
+model on every write, so bp["blocks"][0]["meta"]["worldOrientAxis"] = False
+is seen by the next hash like bp["blocks"][0]["meta"] = meta.
+
+    bp = model.Root.from_dict(data)
+    data = bp.to_dict()
+"""
+
+# mbox
+from mbox.lego import binary, digest
+from mbox.vendor import six
+
+#
+import sys
+import array
+import logging
+from collections import OrderedDict
+
+try:
+    from collections.abc import MutableMapping, Mapping
+except ImportError:
+    from collections import MutableMapping, Mapping
+
+logger = logging.getLogger(__name__)
+
+BLOCK_KEYS = ("component",
+              "version",
+              "name",
+              "direction",
+              "index",
+              "joint",
+              "jointAxis",
+              "transforms",
+              "priority",
+              "parent",
+              "meta")
+
+ROOT_KEYS = ("name",
+             "process",
+             "step",
+             "component",
+             "version",
+             "schemaVersion",
+             "direction",
+             "nameRule",
+             "runPreScripts",
+             "preScripts",
+             "runPostScripts",
+             "postScripts",
+             "blocks",
+             "notes",
+             "shapes")
+
+# key order tuples, shared by models of the same keys
+_orders = dict()
+
+
+def _get_order(keys):
+    keys = tuple(keys)
+    return _orders.setdefault(keys, keys)
+
+
+def _intern(value):
+    """interned str, other values as they are"""
+    return six.moves.intern(value) if type(value) is str else value
+
+
+# insertion ordered dict, nested values keep their json key order
+_Dict = dict if sys.version_info >= (3, 7) else OrderedDict
+
+
+def _changed(container):
+    owner = getattr(container, "_owner", None)
+    if owner is not None:
+        owner._hash = None
+
+
+class _TrackedDict(_Dict):
+    """nested dict of a model, writes clear the model hash"""
+    __slots__ = ("_owner",)
+
+    def __init__(self, *args, **kwargs):
+        self._owner = None
+        _Dict.__init__(self)
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value, *args, **kwargs):
+        _changed(self)
+        _Dict.__setitem__(self, _intern(key), _track(value, getattr(self, "_owner", None)), *args, **kwargs)
+
+    def __delitem__(self, key, *args, **kwargs):
+        _changed(self)
+        _Dict.__delitem__(self, key, *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        for key, value in OrderedDict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        _changed(self)
+        return _Dict.pop(self, key, *args)
+
+    def popitem(self):
+        _changed(self)
+        return _Dict.popitem(self)
+
+    def clear(self):
+        _changed(self)
+        _Dict.clear(self)
+
+    def __reduce__(self):
+        # pickled and copied as a plain dict
+        return _Dict, (list(self.items()),)
+
+
+class _TrackedList(list):
+    """nested list of a model, writes clear the model hash"""
+    __slots__ = ("_owner",)
+
+    def __init__(self, values=(), owner=None):
+        self._owner = owner
+        list.__init__(self, [_track(x, owner) for x in values])
+
+    def _track_values(self, values):
+        return [_track(x, self._owner) for x in values]
+
+    def __setitem__(self, index, value):
+        _changed(self)
+        if isinstance(index, slice):
+            value = self._track_values(value)
+        else:
+            value = _track(value, self._owner)
+        list.__setitem__(self, index, value)
+
+    def __delitem__(self, index):
+        _changed(self)
+        list.__delitem__(self, index)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, count):
+        _changed(self)
+        return list.__imul__(self, count)
+
+    def append(self, value):
+        _changed(self)
+        list.append(self, _track(value, self._owner))
+
+    def extend(self, values):
+        _changed(self)
+        list.extend(self, self._track_values(values))
+
+    def insert(self, index, value):
+        _changed(self)
+        list.insert(self, index, _track(value, self._owner))
+
+    def pop(self, *args):
+        _changed(self)
+        return list.pop(self, *args)
+
+    def remove(self, value):
+        _changed(self)
+        list.remove(self, value)
+
+    def clear(self):
+        _changed(self)
+        del self[:]
+
+    def sort(self, *args, **kwargs):
+        _changed(self)
+        list.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        _changed(self)
+        list.reverse(self)
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _track(data, owner):
+    """copy of json data in tracked containers of owner, every str interned
+
+    :param data: dict, list or value
+    :param owner: model whose hash is cleared on writes
+    :return: _TrackedDict, _TrackedList or value
+    """
+    if isinstance(data, Mapping):
+        tracked = _TrackedDict()
+        for key, value in data.items():
+            _Dict.__setitem__(tracked, _intern(key), _track(value, owner))
+        tracked._owner = owner
+        return tracked
+    if isinstance(data, list):
+        return _TrackedList(data, owner)
+    return _intern(data)
+
+
+class _Packed(object):
+    """float64 data of one block, TransformView buffer"""
+    __slots__ = ("data", "writes")
+
+    def __init__(self, values):
+        self.data = array.array("d", values)
+        self.writes = 0
+
+
+def pack(transforms):
+    """transforms in one float64 array, None if they are not 4x4 float matrices
+
+    :param transforms: block transforms
+    :return: binary.TransformView or None
+    """
+    values = binary.get_values(transforms)
+    if values is None:
+        return None
+    return binary.TransformView(_Packed(values), 0, len(values) // binary.MATRIX_SIZE)
+
+
+class _Model(MutableMapping):
+    """dict like blueprint, known keys in slots, others in _extra"""
+    __slots__ = ("_order", "_extra", "_hash")
+
+    KEYS = ()
+
+    def __init__(self):
+        self._order = _get_order(())
+        self._extra = None
+        self._hash = None
+
+    def _convert(self, key, value):
+        return value
+
+    def _export(self, key, value):
+        return value
+
+    def __getitem__(self, key):
+        if key in self.KEYS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        value = self._convert(key, value)
+        self._hash = None
+        if key in self.KEYS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = OrderedDict()
+            self._extra[key] = value
+        if key not in self._order:
+            self._order = _get_order(self._order + (key,))
+
+    def __delitem__(self, key):
+        if key not in self._order:
+            raise KeyError(key)
+        self._hash = None
+        if key in self.KEYS:
+            delattr(self, key)
+        else:
+            del self._extra[key]
+        self._order = _get_order(x for x in self._order if x != key)
+
+    def __contains__(self, key):
+        return key in self._order
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __repr__(self):
+        return "{0}({1!r})".format(type(self).__name__, self.to_dict())
+
+    def __reduce__(self):
+        return _load, (type(self), self.to_dict())
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        :param data: blueprint dict
+        :return: model
+        """
+        model = cls()
+        for key, value in data.items():
+            model[key] = value
+        return model
+
+    def to_dict(self):
+        """schema valid dict blueprint, equal to the source dict
+
+        :return: OrderedDict
+        """
+        return OrderedDict((key, self._export(key, self[key])) for key in self._order)
+
+
+class Block(_Model):
+    """block blueprint"""
+    __slots__ = BLOCK_KEYS
+
+    KEYS = frozenset(BLOCK_KEYS)
+
+    def _convert(self, key, value):
+        if key == "transforms":
+            packed = pack(value)
+            return _track(value, self) if packed is None else packed
+        return _track(value, self)
+
+    def _export(self, key, value):
+        if isinstance(value, binary.TransformView):
+            return value.tolist()
+        return value
+
+    @property
+    def content_hash(self):
+        """digest.get_block_hash, cached
+
+        :return: hex string
+        """
+        transforms = getattr(self, "transforms", None)
+        writes = transforms.writes if isinstance(transforms, binary.TransformView) else None
+        if self._hash is None or self._hash[0] != writes:
+            self._hash = (writes, digest.get_block_hash(self))
+        return self._hash[1]
+
+
+class Root(_Model):
+    """root blueprint, blocks are Block"""
+    __slots__ = ROOT_KEYS
+
+    KEYS = frozenset(ROOT_KEYS)
+
+    def _convert(self, key, value):
+        if key == "blocks":
+            if value is None:
+                return None
+            return [x if isinstance(x, Block) else Block.from_dict(x) for x in value]
+        return _track(value, self)
+
+    def _export(self, key, value):
+        if key == "blocks" and value is not None:
+            return [x.to_dict() if isinstance(x, Block) else x for x in value]
+        return value
+
+    @property
+    def root_hash(self):
+        """digest.get_root_hash, cached
+
+        :return: hex string
+        """
+        if self._hash is None:
+            self._hash = digest.get_root_hash(self)
+        return self._hash
+
+    @property
+    def content_hash(self):
+        """digest.get_hash, root hash and cached block hashes
+
+        :return: hex string
+        """
+        return digest.get_hash(self)
+
+
+def _load(cls, data):
+    return cls.from_dict(data)
+
+
+def is_model(bp):
+    """
+    :param bp: root or block blueprint
+    :return: bool
+    """
+    return isinstance(bp, _Model)
@@ -0,0 +1,221 @@
+# -*- coding:utf-8 -*-
+"""naming module
+
+node names follow the blueprint nameRule. a convention template is
+compiled once into a positional format string, a Namer of a name rule
+applies the letter case rules and keeps every name by its inputs.
+
+    naming.name(context, block, "fk0")  # arm_L0_fk0_ctl
+    namer = naming.get_namer(context)
+    namer.name("arm", "left", 0, "fk0", joint=True)
+
+    naming.guide(block, "root")  # arm_left0_root
+"""
+
+#
+import string
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ["center", "left", "right"]
+
+FIELDS = ("name", "direction", "index", "description", "extension")
+
+CASES = ("default", "lower", "upper", "capitalize")
+
+# guide nodes use the full direction, scheduler.get_block_prefix
+GUIDE_CONVENTION = "{name}_{direction}{index}_{description}"
+
+# names kept by a Namer before it starts over
+MAX_NAMES = 200000
+
+# template: Convention
+_conventions = dict()
+
+# name rule: Namer
+_namers = dict()
+
+_lock = threading.Lock()
+
+
+def letter_case(description, case):
+    """apply description letter case rule
+
+    :param description: string
+    :param case: default, lower, upper, capitalize
+    :return: string
+    """
+    if case == "lower":
+        return description.lower()
+    if case == "upper":
+        return description.upper()
+    if case == "capitalize":
+        return description.capitalize()
+    return description
+
+
+def join(*parts):
+    """parts joined with _, empty parts and separators are dropped
+
+    :return: ex) join("world", "", "ctl") -> world_ctl
+    """
+    return clean("_".join(str(x) for x in parts))
+
+
+def clean(text):
+    """
+    :param text: formatted name
+    :return: name without empty parts between, before or after _
+    """
+    if "__" not in text and not text.startswith("_") and not text.endswith("_"):
+        return text
+    return "_".join([x for x in text.split("_") if x])
+
+
+class Convention(object):
+    """convention template compiled once, FIELDS are formatted by position
+
+    :param template: ex) {name}_{direction}{index}_{description}_{extension}
+    """
+
+    def __init__(self, template):
+        self.template = template
+        parts = list()
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is None:
+                continue
+            if field not in FIELDS:
+                raise ValueError("unknown naming field {0} in {1}, {2}".format(field, template, FIELDS))
+            parts.append("{" + str(FIELDS.index(field)))
+            if conversion:
+                parts.append("!" + conversion)
+            if spec:
+                parts.append(":" + spec)
+            parts.append("}")
+        self.positional = "".join(parts)
+
+    def format(self, name, direction, index, description, extension):
+        """
+        :return: clean name
+        """
+        return clean(self.positional.format(name, direction, index, description, extension))
+
+
+def compile_convention(template):
+    """
+    :param template: convention template
+    :return: Convention, compiled once per template
+    """
+    convention = _conventions.get(template)
+    if convention is None:
+        convention = _conventions[template] = Convention(template)
+    return convention
+
+
+class Namer(object):
+    """node names of one name rule, every name is kept by its inputs
+
+    :param common: controller convention template
+    :param joint: joint convention template
+    :param controller_case: controllerDescriptionLetterCase
+    :param joint_case: jointDescriptionLetterCase
+    :param controller_exp: controller extension
+    :param joint_exp: joint extension
+    :param directions: direction letters of center, left, right
+    """
+
+    def __init__(self, common, joint, controller_case, joint_case, controller_exp, joint_exp, directions):
+        self.conventions = (compile_convention(common), compile_convention(joint))
+        self.cases = (controller_case, joint_case)
+        self.extensions = (controller_exp, joint_exp)
+        self.directions = dict(zip(DIRECTIONS, directions))
+        self.names = dict()
+
+    def name(self, name, direction, index, description, extension=None, joint=False):
+        """
+        :param name: block name
+        :param direction: center, left, right
+        :param index: block index
+        :param description: ex)fk0, ik, root
+        :param extension: default controller or joint extension
+        :param joint: use joint convention
+        :return: ex)arm_L0_fk0_con
+        """
+        key = (name, direction, index, description, extension, joint)
+        result = self.names.get(key)
+        if result is not None:
+            return result
+        kind = 1 if joint else 0
+        result = self.conventions[kind].format(name,
+                                               self.directions[direction],
+                                               index,
+                                               letter_case(description, self.cases[kind]),
+                                               self.extensions[kind] if extension is None else extension)
+        # namers are shared by compute threads
+        with _lock:
+            if len(self.names) >= MAX_NAMES:
+                self.names = dict()
+            self.names[key] = result
+        return result
+
+
+def get_rule(context):
+    """
+    :param context: lego context
+    :return: name rule tuple, Namer arguments
+    """
+    return (context["commonConvention"],
+            context["jointConvention"],
+            context["controllerDescriptionLetterCase"],
+            context["jointDescriptionLetterCase"],
+            context["controllerExp"],
+            context["jointExp"],
+            tuple(context["direction"]))
+
+
+def get_namer(context):
+    """
+    :param context: lego context
+    :return: context namer or the Namer of the context name rule, one per rule
+    """
+    namer = context.get("namer")
+    if namer is not None:
+        return namer
+    rule = get_rule(context)
+    namer = _namers.get(rule)
+    if namer is None:
+        with _lock:
+            namer = _namers.get(rule)
+            if namer is None:
+                namer = _namers[rule] = Namer(*rule)
+    return namer
+
+
+def name(context, block, description, extension=None, joint=False):
+    """node name from context name rule
+
+    :param context: lego context
+    :param block: block blueprint
+    :param description: ex)fk0, ik, root
+    :param extension: default controllerExp, jointExp if joint
+    :param joint: use joint convention
+    :return: ex)arm_L0_fk0_con
+    """
+    return get_namer(context).name(block["name"], block["direction"], block["index"], description, extension, joint)
+
+
+def guide(block, description):
+    """guide node name, the full direction like scheduler.get_block_prefix
+
+    :param block: block blueprint
+    :param description: ex)root
+    :return: ex)arm_left0_root
+    """
+    return compile_convention(GUIDE_CONVENTION).format(block["name"],
+                                                       block["direction"],
+                                                       block["index"],
+                                                       description,
+                                                       "")
@@ -0,0 +1,273 @@
+# -*- coding:utf-8 -*-
+"""build profiler module
+
+wall time, scene call count and created node count of every lego step and
+every block step. scene calls are the outermost calls of SCENE_MODULES
+functions and PYMEL_CALLS, created nodes are counted by a node added
+callback of the scene backend. chosen blocks are captured with cProfile.
+nothing is patched and no callback is added until a profiled build starts.
+
+    lib.build(bp, profile=True, profile_blocks=["arm_left_0"])
+
+    p = profiler.Profiler()
+    lego.lego(bp, "all", profiler=p)
+    p.get_summary()
+    p.save(path)
+"""
+
+# json
+import json
+
+# mbox
+from mbox.core import scene
+from mbox.lego import fileio
+
+#
+import os
+import time
+import pstats
+import cProfile
+import logging
+import importlib
+import functools
+import threading
+from collections import OrderedDict
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+logger = logging.getLogger(__name__)
+
+REPORT_DIR = os.environ.get("MBOX_PROFILE_DIR", fileio.get_user_dir("profile"))
+
+SCENE_MODULES = ("mbox.core.attribute",
+                 "mbox.core.curve",
+                 "mbox.core.icon",
+                 "mbox.core.primitive")
+
+PYMEL_CALLS = ("createNode",
+               "delete",
+               "parent",
+               "group",
+               "duplicate",
+               "rename",
+               "connectAttr",
+               "disconnectAttr",
+               "setAttr",
+               "addAttr",
+               "xform",
+               "makeIdentity")
+
+CPROFILE_LINES = 30
+
+
+def _get_clock():
+    return time.perf_counter if hasattr(time, "perf_counter") else time.time
+
+
+class _Counter(object):
+    """scene calls and created nodes while a build is profiled"""
+
+    def __init__(self):
+        self.calls = 0
+        self.nodes = 0
+        self.local = threading.local()
+        self.patched = list()
+        self.callback = None
+
+    def _wrap(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            depth = getattr(self.local, "depth", 0)
+            if not depth:
+                self.calls += 1
+            self.local.depth = depth + 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.local.depth = depth
+        return wrapper
+
+    def _patch(self, module, name):
+        func = getattr(module, name)
+        self.patched.append((module, name, func))
+        setattr(module, name, self._wrap(func))
+
+    def _on_node_added(self, *args):
+        self.nodes += 1
+
+    def start(self):
+        for module_name in SCENE_MODULES:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            for name, value in list(vars(module).items()):
+                if not name.startswith("_") and callable(value) and getattr(value, "__module__", None) == module_name:
+                    self._patch(module, name)
+        for name in PYMEL_CALLS:
+            if hasattr(scene.pm, name):
+                self._patch(scene.pm, name)
+        try:
+            self.callback = scene.om.MDGMessage.addNodeAddedCallback(self._on_node_added, "dependNode")
+        except (AttributeError, RuntimeError):
+            # created nodes are not counted
+            self.nodes = None
+
+    def stop(self):
+        for module, name, func in reversed(self.patched):
+            setattr(module, name, func)
+        self.patched = list()
+        if self.callback is not None:
+            scene.om.MMessage.removeCallback(self.callback)
+            self.callback = None
+
+
+class _Measure(object):
+    """context manager recording one step or block step"""
+
+    def __init__(self, profiler, record, capture=None):
+        self.profiler = profiler
+        self.record = record
+        self.capture = capture
+
+    def __enter__(self):
+        counter = self.profiler.counter
+        self.calls = counter.calls
+        self.nodes = counter.nodes
+        if self.capture is not None:
+            self.capture.enable()
+        self.start = self.profiler.clock()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = self.profiler.clock() - self.start
+        if self.capture is not None:
+            self.capture.disable()
+        counter = self.profiler.counter
+        with self.profiler.lock:
+            self.record["time"] += elapsed
+            self.record["calls"] += counter.calls - self.calls
+            if counter.nodes is not None:
+                self.record["nodes"] += counter.nodes - self.nodes
+        return False
+
+
+def _new_record():
+    return OrderedDict([("time", 0.0), ("calls", 0), ("nodes", 0)])
+
+
+class Profiler(object):
+    """per step and per block build profile
+
+    :param cprofile: block names captured with cProfile
+    """
+
+    def __init__(self, cprofile=None):
+        self.cprofile = set(cprofile or list())
+        self.clock = _get_clock()
+        self.lock = threading.Lock()
+        self.counter = _Counter()
+        self.steps = OrderedDict()
+        self.blocks = OrderedDict()
+        self.captures = OrderedDict()
+
+    def start(self):
+        self.counter.start()
+
+    def stop(self):
+        self.counter.stop()
+
+    def step(self, step):
+        """
+        :param step: lego step name
+        :return: context manager
+        """
+        return _Measure(self, self.steps.setdefault(step, _new_record()))
+
+    def block(self, step, name, component):
+        """
+        :param step: lego step name
+        :param name: block name
+        :param component: block component
+        :return: context manager
+        """
+        with self.lock:
+            data = self.blocks.setdefault(name, OrderedDict([("component", component), ("steps", OrderedDict())]))
+            record = data["steps"].setdefault(step, _new_record())
+        capture = None
+        if name in self.cprofile:
+            capture = self.captures.setdefault(name, cProfile.Profile())
+        return _Measure(self, record, capture)
+
+    def get_report(self):
+        """
+        :return: OrderedDict, json data
+        """
+        blocks = OrderedDict()
+        components = OrderedDict()
+        for name, data in self.blocks.items():
+            total = _new_record()
+            for record in data["steps"].values():
+                for key in total:
+                    total[key] += record[key]
+            blocks[name] = OrderedDict([("component", data["component"]), ("total", total), ("steps", data["steps"])])
+
+            component = components.setdefault(data["component"], _new_record())
+            component.setdefault("blocks", 0)
+            component["blocks"] += 1
+            for key in ("time", "calls", "nodes"):
+                component[key] += total[key]
+
+        report = OrderedDict()
+        report["steps"] = self.steps
+        report["components"] = components
+        report["blocks"] = blocks
+        report["nodesCounted"] = self.counter.nodes is not None
+        report["cprofile"] = OrderedDict()
+        for name, capture in self.captures.items():
+            stream = StringIO()
+            pstats.Stats(capture, stream=stream).sort_stats("cumulative").print_stats(CPROFILE_LINES)
+            report["cprofile"][name] = stream.getvalue()
+        return report
+
+    def get_summary(self, count=10):
+        """readable lines sorted by time
+
+        :param count: block count
+        :return: [line, ...]
+        """
+        report = self.get_report()
+        line = "{0:<32} {1:>10.4f}s {2:>8} calls {3:>8} nodes"
+        lines = ["steps"]
+        for step, record in report["steps"].items():
+            lines.append(line.format(step, record["time"], record["calls"], record["nodes"]))
+        lines.append("components")
+        for name, record in sorted(report["components"].items(), key=lambda x: -x[1]["time"]):
+            lines.append(line.format("{0} x{1}".format(name, record["blocks"]),
+                                     record["time"],
+                                     record["calls"],
+                                     record["nodes"]))
+        lines.append("blocks")
+        for name, data in sorted(report["blocks"].items(), key=lambda x: -x[1]["total"]["time"])[:count]:
+            record = data["total"]
+            lines.append(line.format(name, record["time"], record["calls"], record["nodes"]))
+        return lines
+
+    def save(self, path=None):
+        """json report
+
+        :param path: default REPORT_DIR/profile_{time}.json, REPORT_DIR is only written by the user
+        :return: path
+        :raises: OSError, REPORT_DIR is writable by other users
+        """
+        if path is None:
+            fileio.make_private_dir(REPORT_DIR)
+            path = os.path.join(REPORT_DIR, "profile_{0}.json".format(time.strftime("%Y%m%d_%H%M%S")))
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fileio.write_atomic(path, json.dumps(self.get_report(), indent=2))
+        return path
@@ -0,0 +1,380 @@
+# -*- coding:utf-8 -*-
+"""build progress module
+
+lego builds publish progress events to subscribers, callbacks or queues.
+compute blocks run in threads with workers > 1, so callbacks can be called
+from a compute thread, Throttle(main_thread=True) delivers on the main
+thread only. the step and block times of a finished build are kept by the
+blueprint hash in the private per user HISTORY_DIR and the next build of
+the same blueprint gets an eta.
+
+    p = progress.Progress()
+    p.subscribe(progress.Throttle(update_ui, rate=10))
+    events = p.get_queue()
+    lego.lego(bp, "all", progress=p)
+
+    lib.build(bp)  # progress window in maya
+
+event, OrderedDict
+    event     - buildStarted, stepStarted, blockStarted, blockFinished,
+                stepFinished, warning, buildFinished
+    step      - lego step or None
+    block     - block name or None
+    component - block component or None
+    index     - finished blocks of the step, finished steps of the build
+    count     - blocks of the step, steps of the build
+    time      - seconds of the finished block, step or build
+    elapsed   - seconds since the build started
+    eta       - estimated remaining seconds, None without a previous build
+    message   - warning message, error of a failed build
+    cached    - block output from the build cache
+"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import fileio, cache as build_cache
+
+#
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+logger = logging.getLogger(__name__)
+
+HISTORY_VERSION = 1
+
+HISTORY_DIR = os.environ.get("MBOX_PROGRESS_DIR", fileio.get_user_dir("progress"))
+
+EVENTS = ("buildStarted",
+          "stepStarted",
+          "blockStarted",
+          "blockFinished",
+          "stepFinished",
+          "warning",
+          "buildFinished")
+
+# delivered by Throttle at once
+FORCED_EVENTS = ("buildStarted", "stepStarted", "stepFinished", "warning", "buildFinished")
+
+
+def _get_clock():
+    return time.perf_counter if hasattr(time, "perf_counter") else time.time
+
+
+def _is_main_thread():
+    return threading.current_thread().name == "MainThread"
+
+
+def get_history_path(key):
+    """
+    :param key: cache.get_blueprint_key result
+    :return: HISTORY_DIR/key.json
+    """
+    return os.path.join(HISTORY_DIR, "{0}.json".format(key))
+
+
+class _WarningHandler(logging.Handler):
+    """mbox warnings of a build as warning events"""
+
+    def __init__(self, progress):
+        logging.Handler.__init__(self, logging.WARNING)
+        self.progress = progress
+
+    def emit(self, record):
+        try:
+            self.progress.warning(record.getMessage())
+        except Exception:
+            self.handleError(record)
+
+
+class Progress(object):
+    """progress events of lego builds
+
+    :param history: keep step and block times by blueprint hash for eta, False is no eta
+    """
+
+    def __init__(self, history=True):
+        self.history = history
+        self.clock = _get_clock()
+        self.lock = threading.Lock()
+        self.subscribers = OrderedDict()
+        self.handler = _WarningHandler(self)
+        self._ids = 0
+        self.key = None
+        self.steps = list()
+        self.counts = dict()
+        self.previous = None
+        self.times = None
+        self.start = None
+        self.step_start = None
+        self.step = None
+        self.done = dict()
+        self.done_previous = dict()
+        self.block_starts = dict()
+
+    def subscribe(self, callback):
+        """
+        :param callback: callback(event)
+        :return: id of unsubscribe
+        """
+        with self.lock:
+            self._ids += 1
+            self.subscribers[self._ids] = callback
+            return self._ids
+
+    def unsubscribe(self, subscriber_id):
+        with self.lock:
+            self.subscribers.pop(subscriber_id, None)
+
+    def get_queue(self):
+        """
+        :return: queue.Queue subscribed to every event
+        """
+        events = queue.Queue()
+        self.subscribe(events.put)
+        return events
+
+    def _load_history(self):
+        path = get_history_path(self.key)
+        if not os.path.exists(path):
+            return None
+        try:
+            fileio.check_private(HISTORY_DIR)
+            fileio.check_private(path)
+            with open(path, "r") as f:
+                data = json.load(f, object_pairs_hook=OrderedDict)
+        except (IOError, OSError, ValueError) as e:
+            logger.warning("build progress history is not readable {0}".format(e))
+            return None
+        return data if data.get("history") == HISTORY_VERSION else None
+
+    def _save_history(self):
+        data = OrderedDict([("history", HISTORY_VERSION), ("steps", self.times["steps"]),
+                            ("blocks", self.times["blocks"])])
+        if self.previous:
+            # steps not run in this build keep their previous times
+            for step, seconds in self.previous["steps"].items():
+                data["steps"].setdefault(step, seconds)
+                data["blocks"].setdefault(step, self.previous["blocks"].get(step, OrderedDict()))
+        try:
+            fileio.make_private_dir(HISTORY_DIR)
+            fileio.write_atomic(get_history_path(self.key), json.dumps(data, separators=(",", ":")))
+        except (IOError, OSError) as e:
+            logger.warning("build progress history is not writable {0}".format(e))
+
+    def get_eta(self):
+        """remaining seconds from the times of the previous build
+
+        :return: float or None
+        """
+        if not self.previous:
+            return None
+        steps = self.previous["steps"]
+        if any(x not in steps for x in self.steps):
+            return None
+        remaining = 0.0
+        for step in self.steps:
+            if step in self.times["steps"]:
+                continue
+            if step != self.step:
+                remaining += steps[step]
+                continue
+            total = self.previous["totals"].get(step, 0.0)
+            if total > 0:
+                left = 1.0 - self.done_previous[step] / total
+            else:
+                left = 1.0 - float(self.done[step]) / max(1, self.counts.get(step, 1))
+            remaining += steps[step] * max(left, 0.0)
+        return remaining
+
+    def _publish(self, event, step=None, block=None, component=None, index=None, count=None, seconds=None,
+                 message=None, cached=False):
+        data = OrderedDict()
+        data["event"] = event
+        data["step"] = step
+        data["block"] = block
+        data["component"] = component
+        data["index"] = index
+        data["count"] = count
+        data["time"] = seconds
+        data["elapsed"] = self.clock() - self.start if self.start is not None else 0.0
+        with self.lock:
+            data["eta"] = self.get_eta() if self.times is not None else None
+        data["message"] = message
+        data["cached"] = cached
+        for callback in list(self.subscribers.values()):
+            try:
+                callback(data)
+            except Exception as e:
+                # a broken subscriber never stops the build
+                logger.debug("progress subscriber error {0}".format(e))
+        return data
+
+    def start_build(self, bp, steps, counts):
+        """
+        :param bp: root blueprint
+        :param steps: lego steps which will run
+        :param counts: {step: block count}
+        """
+        self.key = build_cache.get_blueprint_key(bp)
+        self.steps = list(steps)
+        self.counts = dict(counts)
+        self.previous = self._load_history() if self.history else None
+        if self.previous:
+            self.previous["totals"] = dict((k, sum(v.values())) for k, v in self.previous["blocks"].items())
+        self.times = OrderedDict([("steps", OrderedDict()), ("blocks", OrderedDict())])
+        self.done = dict()
+        self.done_previous = dict()
+        self.start = self.clock()
+        logging.getLogger("mbox").addHandler(self.handler)
+        self._publish("buildStarted", index=0, count=len(self.steps))
+
+    def finish_build(self, error=None):
+        """
+        :param error: exception of a failed build, times are kept only for a finished build
+        """
+        logging.getLogger("mbox").removeHandler(self.handler)
+        elapsed = self.clock() - self.start
+        if error is None and self.history:
+            self._save_history()
+        self._publish("buildFinished",
+                      index=len(self.times["steps"]),
+                      count=len(self.steps),
+                      seconds=elapsed,
+                      message=None if error is None else "{0}: {1}".format(type(error).__name__, error))
+
+    def start_step(self, step):
+        self.step = step
+        self.step_start = self.clock()
+        self.done[step] = 0
+        self.done_previous[step] = 0.0
+        self.times["blocks"][step] = OrderedDict()
+        self._publish("stepStarted", step=step, index=0, count=self.counts.get(step))
+
+    def finish_step(self, step):
+        self.times["steps"][step] = self.clock() - self.step_start
+        self.step = None
+        self._publish("stepFinished",
+                      step=step,
+                      index=self.done[step],
+                      count=self.counts.get(step),
+                      seconds=self.times["steps"][step])
+
+    def start_block(self, step, name, component):
+        with self.lock:
+            self.block_starts[(step, name)] = self.clock()
+            index = self.done[step]
+        self._publish("blockStarted", step, name, component, index, self.counts.get(step))
+
+    def finish_block(self, step, name, component, cached=False):
+        with self.lock:
+            start = self.block_starts.pop((step, name), None)
+            seconds = 0.0 if start is None else self.clock() - start
+            self.times["blocks"][step][name] = seconds
+            self.done[step] += 1
+            if self.previous:
+                self.done_previous[step] += self.previous["blocks"].get(step, dict()).get(name, 0.0)
+            index = self.done[step]
+        self._publish("blockFinished", step, name, component, index, self.counts.get(step), seconds, cached=cached)
+
+    def warning(self, message):
+        self._publish("warning", step=self.step, message=message)
+
+    def block(self, step, name, component):
+        """
+        :return: context manager of start_block and finish_block
+        """
+        return _Block(self, step, name, component)
+
+
+class _Block(object):
+
+    def __init__(self, progress, step, name, component):
+        self.progress = progress
+        self.args = (step, name, component)
+
+    def __enter__(self):
+        self.progress.start_block(*self.args)
+        return self
+
+    def __exit__(self, *args):
+        if args[0] is None:
+            self.progress.finish_block(*self.args)
+        return False
+
+
+class Throttle(object):
+    """callback wrapper delivering at most rate block events a second,
+    the last skipped event is delivered with the next one, forced events
+    (FORCED_EVENTS) are never skipped
+
+    :param callback: callback(event)
+    :param rate: events a second
+    :param main_thread: events of other threads wait for the next main thread event
+    """
+
+    def __init__(self, callback, rate=10, main_thread=False):
+        self.callback = callback
+        self.interval = 1.0 / rate
+        self.main_thread = main_thread
+        self.clock = _get_clock()
+        self.last = None
+        # skipped events in order, forced ones and the last block event
+        self.pending = list()
+        self.lock = threading.Lock()
+
+    def _keep(self, event):
+        if event["event"] not in FORCED_EVENTS:
+            # a newer block event replaces the skipped one
+            self.pending = [x for x in self.pending if x["event"] in FORCED_EVENTS]
+        self.pending.append(event)
+
+    def __call__(self, event):
+        with self.lock:
+            self._keep(event)
+            if self.main_thread and not _is_main_thread():
+                return
+            now = self.clock()
+            forced = any(x["event"] in FORCED_EVENTS for x in self.pending)
+            if not forced and self.last is not None and now - self.last < self.interval:
+                return
+            events, self.pending = self.pending, list()
+            self.last = now
+        for item in events:
+            self.callback(item)
+
+    def flush(self):
+        """deliver the skipped events"""
+        with self.lock:
+            events, self.pending = self.pending, list()
+        for item in events:
+            self.callback(item)
+
+
+def format_event(event):
+    """
+    :param event: progress event
+    :return: readable line
+    """
+    line = event["event"]
+    if event["step"]:
+        line += " {0}".format(event["step"])
+    if event["block"]:
+        line += " {0}".format(event["block"])
+    if event["count"] is not None:
+        line += " {0}/{1}".format(event["index"], event["count"])
+    line += " {0:.2f}s".format(event["elapsed"])
+    if event["eta"] is not None:
+        line += " eta {0:.1f}s".format(event["eta"])
+    if event["message"]:
+        line += " {0}".format(event["message"])
+    return line
@@ -0,0 +1,163 @@
+# -*- coding:utf-8 -*-
+"""build name registry module
+
+the registry of a build covers
+    rig structure - box.get_names, the rig root, world_root, world_con ...,
+                    owned by the rig name
+    guide nodes   - the top guide and the get_guide_names of each block
+                    blueprint module, owned by "guide" and the block name
+    block names   - every node name a block computes (block data "names")
+the rig structure and guide names are reserved before the build, the block
+names in schedule order after the compute step, so cached blocks and compute
+workers give the same names. other scene nodes are not covered, the scene
+renames them. a name reserved twice is a collision, by the policy
+    error  - NameCollisionError
+    suffix - the later name gets the next free number, ex) arm_L0_ctl1
+    warn   - logged, the scene renames the later node
+after the objects step the block nodes (block data "nodes") are bound to
+their names, later steps and post scripts resolve them without scene queries.
+
+    context = lego.lego(bp, "all", name_policy="suffix")
+    registry = context["registry"]
+    registry.get("arm_L0_fk0_ctl")  # node
+    registry.owner("arm_L0_fk0_ctl")  # arm_left_0
+"""
+
+# mbox
+from mbox.vendor import six
+
+#
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("error", "suffix", "warn")
+
+
+class NameCollisionError(Exception):
+    pass
+
+
+class NameRegistry(object):
+    """names of one build
+
+    :param policy: error, suffix, warn
+    """
+
+    def __init__(self, policy="warn"):
+        if policy not in POLICIES:
+            raise ValueError("unknown name policy : {0}, {1}".format(policy, POLICIES))
+        self.policy = policy
+        self.lock = threading.Lock()
+        # name: owner
+        self.owners = OrderedDict()
+        # name: node
+        self.nodes = OrderedDict()
+        # base name: next suffix
+        self.counters = dict()
+        self.collisions = list()
+
+    def __contains__(self, name):
+        return name in self.owners
+
+    def __len__(self):
+        return len(self.owners)
+
+    def reserve(self, name, owner):
+        """
+        :param name: node name
+        :param owner: block name
+        :return: name, a suffixed name with the suffix policy
+        """
+        with self.lock:
+            if name not in self.owners:
+                self.owners[name] = owner
+                return name
+            other = self.owners[name]
+            self.collisions.append((name, other, owner))
+            if self.policy == "error":
+                raise NameCollisionError("{0} of {1} is already a name of {2}".format(name, owner, other))
+            if self.policy == "warn":
+                logger.warning("name collision {0} of {1} and {2}".format(name, other, owner))
+                return name
+            number = self.counters.get(name, 1)
+            while "{0}{1}".format(name, number) in self.owners:
+                number += 1
+            self.counters[name] = number + 1
+            unique = "{0}{1}".format(name, number)
+            self.owners[unique] = owner
+            logger.info("name collision {0} of {1} and {2}, renamed to {3}".format(name, other, owner, unique))
+            return unique
+
+    def reserve_names(self, owner, names):
+        """reserve every name of a names dict
+
+        :param owner: block name
+        :param names: {key: name or [name, ...]}
+        :return: OrderedDict {key: reserved name}
+        """
+        reserved = OrderedDict()
+        for key, value in names.items():
+            if isinstance(value, six.string_types) and value:
+                reserved[key] = self.reserve(value, owner)
+            elif isinstance(value, (list, tuple)):
+                reserved[key] = [self.reserve(x, owner) if x else x for x in value]
+            else:
+                reserved[key] = value
+        return reserved
+
+    def reserve_block(self, owner, data):
+        """reserve the block data names, suffixed names are set to a new names dict
+
+        :param owner: block name
+        :param data: block data
+        """
+        names = data.get("names")
+        if not names:
+            return
+        reserved = self.reserve_names(owner, names)
+        if reserved != names:
+            data["names"] = reserved
+
+    def bind(self, owner, nodes):
+        """nodes by their scene names, a name not reserved is reserved for owner
+
+        :param owner: block name
+        :param nodes: block nodes, or node names of emitted builds
+        """
+        for node in nodes or list():
+            name = node if isinstance(node, six.string_types) else node.nodeName()
+            with self.lock:
+                other = self.owners.setdefault(name, owner)
+                if other != owner:
+                    logger.warning("node {0} of {1} has a name of {2}".format(name, owner, other))
+                    continue
+                self.nodes[name] = node
+
+    def get(self, name, default=None):
+        """
+        :param name: node name
+        :return: bound node
+        """
+        return self.nodes.get(name, default)
+
+    def owner(self, name):
+        """
+        :param name: node name
+        :return: block name or None
+        """
+        return self.owners.get(name)
+
+    def get_report(self):
+        """
+        :return: OrderedDict, json data
+        """
+        report = OrderedDict()
+        report["policy"] = self.policy
+        report["names"] = len(self.owners)
+        report["nodes"] = len(self.nodes)
+        report["collisions"] = [OrderedDict([("name", name), ("owner", owner), ("other", other)])
+                                for name, other, owner in self.collisions]
+        return report
@@ -0,0 +1,206 @@
+# -*- coding:utf-8 -*-
+"""block scheduler module
+
+blocks are ordered by a dependency graph built from their "parent" link and
+any other block referenced inside their "meta" data.
+"""
+
+# mbox
+from mbox.vendor import six
+
+#
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduleError(Exception):
+    """blueprint blocks can not be ordered (missing parent, cycle, duplicate)"""
+
+
+def get_block_name(block):
+    """unique block name used by the blueprint
+
+    :param block: block blueprint
+    :return: name_direction_index ex)arm_left_0
+    """
+    return "{name}_{direction}_{index}".format(name=block["name"],
+                                               direction=block["direction"],
+                                               index=block["index"])
+
+
+def get_block_prefix(block):
+    """dag node name prefix of every guide node drawn by the block
+
+    :param block: block blueprint
+    :return: ex)arm_left0_
+    """
+    return "{name}_{direction}{index}_".format(name=block["name"],
+                                               direction=block["direction"],
+                                               index=block["index"])
+
+
+def _get_owner(value, names, prefixes):
+    """block name owning value (block name or guide node name)
+
+    :param value: string
+    :param names: block name set
+    :param prefixes: {prefix: block name}
+    :return: block name or None
+    """
+    if value in names:
+        return value
+    index = value.rfind("_")
+    while index > 0:
+        owner = prefixes.get(value[:index + 1])
+        if owner:
+            return owner
+        index = value.rfind("_", 0, index)
+    return None
+
+
+def _get_meta_strings(data):
+    """every string stored in meta data
+
+    :param data: meta data
+    :return: generator
+    """
+    if isinstance(data, dict):
+        for value in data.values():
+            for string in _get_meta_strings(value):
+                yield string
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            for string in _get_meta_strings(value):
+                yield string
+    elif isinstance(data, six.string_types):
+        yield data
+
+
+def get_parents(bp):
+    """parent block of every block
+
+    :param bp: root blueprint
+    :return: OrderedDict {block name: parent block name, None if parent is guide}
+    """
+    blocks = bp["blocks"] or list()
+    parents = OrderedDict()
+    for block in blocks:
+        name = get_block_name(block)
+        if name in parents:
+            raise ScheduleError("duplicated block : {0}".format(name))
+        parents[name] = None
+
+    names = set(parents.keys())
+    prefixes = dict((get_block_prefix(x), get_block_name(x)) for x in blocks)
+
+    for block in blocks:
+        if block["parent"] == "guide":
+            continue
+        name = get_block_name(block)
+        owner = _get_owner(block["parent"], names, prefixes)
+        if owner is None:
+            raise ScheduleError("{0} parent is missing : {1}".format(name, block["parent"]))
+        if owner == name:
+            raise ScheduleError("{0} is parented to itself".format(name))
+        parents[name] = owner
+
+    return parents
+
+
+def get_dependency_graph(bp):
+    """block dependency graph
+
+    explanation
+    1. "parent" link - guide node name, "guide" is the blueprint root
+    2. cross block reference - meta string is a block name or a guide node name of other block
+
+    :param bp: root blueprint
+    :return: OrderedDict {block name: [dependency block name, ...]}
+    """
+    blocks = bp["blocks"] or list()
+    parents = get_parents(bp)
+    names = set(parents.keys())
+    prefixes = dict((get_block_prefix(x), get_block_name(x)) for x in blocks)
+
+    graph = OrderedDict()
+    for block in blocks:
+        name = get_block_name(block)
+        dependencies = graph[name] = [parents[name]] if parents[name] else list()
+
+        for string in _get_meta_strings(block.get("meta")):
+            owner = _get_owner(string, names, prefixes)
+            if owner and owner != name and owner not in dependencies:
+                dependencies.append(owner)
+
+    return graph
+
+
+def _find_cycle(graph, remains):
+    """one dependency cycle among remains
+
+    :param graph: dependency graph
+    :param remains: block names not scheduled
+    :return: [name, ..., name]
+    """
+    path = list()
+    visited = set()
+    name = remains[0]
+    remains = set(remains)
+    while name not in visited:
+        visited.add(name)
+        path.append(name)
+        name = [x for x in graph[name] if x in remains][0]
+    return path[path.index(name):] + [name]
+
+
+def get_schedule(bp, graph=None):
+    """topological block groups
+
+    every block of a group depends only on blocks of previous groups,
+    so blocks of the same group are independent of each other.
+    group and block order follow the blueprint order.
+
+    :param bp: root blueprint
+    :param graph: dependency graph of bp, computed if None
+    :return: [[block, ...], [block, ...], ...]
+    """
+    blocks = OrderedDict((get_block_name(x), x) for x in bp["blocks"] or list())
+    graph = get_dependency_graph(bp) if graph is None else graph
+
+    dependents = OrderedDict((name, list()) for name in graph)
+    count = OrderedDict()
+    for name, dependencies in graph.items():
+        count[name] = len(dependencies)
+        for dependency in dependencies:
+            dependents[dependency].append(name)
+
+    position = dict((name, index) for index, name in enumerate(graph))
+    groups = list()
+    ready = [name for name, number in count.items() if not number]
+    while ready:
+        groups.append([blocks[name] for name in ready])
+        next_ready = list()
+        for name in ready:
+            for dependent in dependents[name]:
+                count[dependent] -= 1
+                if not count[dependent]:
+                    next_ready.append(dependent)
+        ready = sorted(next_ready, key=position.get)
+
+    remains = [name for name, number in count.items() if number]
+    if remains:
+        raise ScheduleError("dependency cycle : {0}".format(" -> ".join(_find_cycle(graph, remains))))
+
+    logger.debug("schedule {0} blocks, {1} groups".format(len(blocks), len(groups)))
+    return groups
+
+
+def get_order(bp):
+    """topological block order
+
+    :param bp: root blueprint
+    :return: [block, ...]
+    """
+    return [block for group in get_schedule(bp) for block in group]
@@ -0,0 +1,146 @@
+# -*- coding:utf-8 -*-
+"""build script module
+
+pre and post scripts are python files with main(context). a script is read
+and compiled once and kept by path, mtime and size, every build executes
+the compiled code in a new module and calls main.
+a script with SCENE_FREE = True does not touch the scene, with workers > 1
+scene free scripts run in a thread pool while the others run in order.
+
+    # post script
+    SCENE_FREE = True
+
+    def main(context):
+        ...
+"""
+
+# mbox
+from mbox.vendor import six
+
+#
+import io
+import os
+import time
+import types
+import logging
+import threading
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+logger = logging.getLogger(__name__)
+
+# path: (mtime, size, code)
+_cache = dict()
+
+_lock = threading.Lock()
+
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def get_code(path):
+    """compiled script, compiled again when the file is changed
+
+    :param path: script file
+    :return: code object
+    """
+    key = _key(path)
+    stat = os.stat(path)
+    with _lock:
+        cached = _cache.get(key)
+    if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+        return cached[2]
+
+    with io.open(path, "rb") as f:
+        source = f.read()
+    code = compile(source, path, "exec", dont_inherit=True)
+    with _lock:
+        _cache[key] = (stat.st_mtime, stat.st_size, code)
+    logger.debug("compiled script : {0}".format(path))
+    return code
+
+
+def load(path):
+    """new module of the script
+
+    :param path: script file
+    :return: module
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    module = types.ModuleType(str(name))
+    module.__file__ = path
+    six.exec_(get_code(path), module.__dict__)
+    return module
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+_clock = time.perf_counter if hasattr(time, "perf_counter") else time.time
+
+
+def _run(module, context, step, path, times):
+    profiler = context.get("profiler")
+    start = _clock()
+    if profiler is not None:
+        with profiler.block(step, path, "script"):
+            module.main(context)
+    else:
+        module.main(context)
+    times[path] = _clock() - start
+    logger.info("Run. {0} {1:.3f}s".format(path, times[path]))
+
+
+def _wait(results):
+    """wait for scene free scripts, their errors are logged
+
+    :param results: [(path, AsyncResult), ...]
+    """
+    for path, result in results:
+        try:
+            result.get()
+        except Exception as e:
+            logger.error("{0} {1} : {2}".format(type(e).__name__, path, e))
+
+
+def run_scripts(paths, context, step, workers=1):
+    """run scripts in order, scene free scripts in a thread pool if workers > 1
+    the first failing script stops the scripts after it
+
+    :param paths: script files
+    :param context: lego context
+    :param step: lego step, profiler record name
+    :param workers: thread count of scene free scripts
+    :return: OrderedDict {path: seconds}
+    """
+    times = dict()
+    pool = ThreadPool(workers) if workers > 1 else None
+    results = list()
+    try:
+        for path in paths:
+            path = path.strip()
+            logger.info("import. {0}".format(path))
+            try:
+                module = load(path)
+                if pool and getattr(module, "SCENE_FREE", False):
+                    results.append((path, pool.apply_async(_run, (module, context, step, path, times))))
+                    continue
+                _run(module, context, step, path, times)
+            except (IOError, OSError, ImportError) as e:
+                logger.error("ImportError {0}".format(e))
+                break
+            except RuntimeError as e:
+                logger.error("RuntimeError {0}".format(e))
+                break
+            except SyntaxError as e:
+                logger.error("SyntaxError {0}".format(e))
+                break
+        _wait(results)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return OrderedDict((x.strip(), times[x.strip()]) for x in paths if x.strip() in times)
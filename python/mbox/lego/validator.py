@@ -0,0 +1,216 @@
+# -*- coding:utf-8 -*-
+"""blueprint schema validator module
+
+every schemaVersion is loaded and checked against its meta schema once,
+then a ready validator is kept for the session.
+a compiled check answers valid blueprints, the jsonschema interpreter only
+runs to report errors, so error messages stay the same.
+errors are reported within an error budget, a broken blueprint is rejected
+at its first error instead of collecting every failure.
+"""
+
+# json
+from mbox.vendor import jsonschema
+from mbox.vendor.jsonschema import cli
+import json
+
+# mbox
+from mbox.lego import compiler, binary
+
+#
+import os
+import sys
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_DIR = os.path.join(os.path.dirname(__file__), "schema")
+
+# binary blueprint transforms are arrays too
+TYPES = {"array": (binary.TransformView,)}
+
+_lock = threading.Lock()
+_schemas = dict()
+_validators = dict()
+_checks = dict()
+
+
+def get_schema(version):
+    """schema of version, loaded once
+
+    :param version: schemaVersion ex)blueprint-1
+    :return: schema
+    :raises: ValueError, version is not a schema file name
+    """
+    schema = _schemas.get(version)
+    if schema is None:
+        with _lock:
+            schema = _schemas.get(version)
+            if schema is None:
+                path = cli.schema_file(SCHEMA_DIR, version)
+                with open(path, "r") as f:
+                    schema = json.load(f, object_pairs_hook=OrderedDict)
+                _schemas[version] = schema
+    return schema
+
+
+def get_definition_schema(version, definition):
+    """schema of one definition of version, ex) a single block
+
+    :param version: schemaVersion ex)blueprint-1
+    :param definition: definitions key ex)block
+    :return: schema
+    """
+    schema = get_schema(version)
+    data = OrderedDict()
+    if "$schema" in schema:
+        data["$schema"] = schema["$schema"]
+    data["definitions"] = schema["definitions"]
+    data["$ref"] = "#/definitions/{0}".format(definition)
+    return data
+
+
+def get_validator(version, definition=None):
+    """ready validator of version, schema is checked once
+
+    :param version: schemaVersion ex)blueprint-1
+    :param definition: validate one definition only ex)block
+    :return: jsonschema validator
+    """
+    key = (version, definition)
+    validator = _validators.get(key)
+    if validator is None:
+        schema = get_definition_schema(version, definition) if definition else get_schema(version)
+        with _lock:
+            validator = _validators.get(key)
+            if validator is None:
+                cls = jsonschema.validators.validator_for(schema)
+                cls.check_schema(schema)
+                types = dict((k, tuple(v) + TYPES.get(k, ())) for k, v in compiler.DEFAULT_TYPES.items())
+                validator = cls(schema, types=types)
+                _validators[key] = validator
+                logger.debug("schema ready : {0} {1}".format(version, definition or ""))
+    return validator
+
+
+def get_check(version, definition=None):
+    """compiled boolean check of version,
+    falls back to the interpreter when the schema can not be compiled
+
+    :param version: schemaVersion ex)blueprint-1
+    :param definition: check one definition only ex)block
+    :return: check(data) -> bool
+    """
+    key = (version, definition)
+    check = _checks.get(key)
+    if check is None:
+        validator = get_validator(version, definition)
+        with _lock:
+            check = _checks.get(key)
+            if check is None:
+                try:
+                    check = compiler.compile_schema(validator.schema, types=TYPES)
+                except compiler.CompileError as e:
+                    logger.warning("{0} is not compiled, {1}".format(version, e))
+                    check = validator.is_valid
+                _checks[key] = check
+    return check
+
+
+def _raise(validator, instance, budget):
+    if budget is not None:
+        validator.validate(instance, budget=budget)
+        return
+    error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def validate(data, budget=None):
+    """validate blueprint with the schema of its schemaVersion
+
+    :param data: root blueprint
+    :param budget: jsonschema.ErrorBudget, default the best match like jsonschema.validate
+    :return:
+    :raises: jsonschema.ValidationError
+    """
+    if get_check(data["schemaVersion"])(data):
+        return
+    _raise(get_validator(data["schemaVersion"]), data, budget)
+
+
+def validate_block(block, version, budget=None):
+    """validate one block with the block definition of version
+
+    :param block: block blueprint
+    :param version: schemaVersion ex)blueprint-1
+    :param budget: jsonschema.ErrorBudget, default the best match like jsonschema.validate
+    :return:
+    :raises: jsonschema.ValidationError
+    """
+    if get_check(version, "block")(block):
+        return
+    _raise(get_validator(version, "block"), block, budget)
+
+
+def get_errors(data, limit=None, per_block=None):
+    """blueprint errors within a budget
+
+    ex) get_errors(data, limit=1) first error only
+        get_errors(data, per_block=3) up to 3 errors of each block
+
+    :param data: root blueprint
+    :param limit: total error count, None is no limit
+    :param per_block: error count of each block, None is no limit
+    :return: [jsonschema.ValidationError, ...]
+    """
+    if get_check(data["schemaVersion"])(data):
+        return list()
+    budget = jsonschema.ErrorBudget(limit=limit, per_path=per_block, path_depth=2)
+    return list(get_validator(data["schemaVersion"]).iter_budget_errors(data, budget))
+
+
+def is_valid(data):
+    """fast boolean check, no error object is built
+
+    :param data: root blueprint
+    :return: bool
+    """
+    return get_check(data["schemaVersion"])(data)
+
+
+def validate_files(paths, workers=1, fail_fast=False, stdout=sys.stdout, stderr=sys.stderr):
+    """validate blueprint files in worker processes, schema from each file's schemaVersion
+    one JSON line per file on stdout, summary on stderr.
+    every worker compiles each schema once, the interpreter only reports errors
+
+        mayapy -m mbox.vendor.jsonschema --batch <dir> --schema-dir <mbox/lego/schema> \
+            --compiler mbox.lego.compiler.compile_schema --workers 8
+
+    :param paths: files, directories or globs
+    :param workers: process count
+    :param fail_fast: stop at the first invalid file
+    :return: 0 all valid, 1 otherwise
+    """
+    arguments = dict(batch=paths,
+                     schema=None,
+                     schema_dir=SCHEMA_DIR,
+                     schema_key="schemaVersion",
+                     validator=None,
+                     compiler=compiler.compile_schema,
+                     workers=workers,
+                     fail_fast=fail_fast)
+    return cli.run_batch(arguments, stdout=stdout, stderr=stderr)
+
+
+def clear():
+    """forget loaded schemas, ex) after editing a schema file
+
+    :return:
+    """
+    with _lock:
+        _schemas.clear()
+        _validators.clear()
+        _checks.clear()
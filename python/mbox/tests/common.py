@@ -0,0 +1,51 @@
+# -*- coding:utf-8 -*-
+"""shared helpers of mbox tests"""
+
+# json
+import json
+
+# mbox
+from mbox.lego import binary
+from mbox.benchmark import generator
+
+#
+import os
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+
+
+def get_blueprint(count=4, **kwargs):
+    """generated blueprint as loaded from a json file
+
+    :param count: block count
+    :param kwargs: generator.get_blueprint arguments
+    :return: root blueprint
+    """
+    return json.loads(json.dumps(generator.get_blueprint(count, **kwargs)), object_pairs_hook=OrderedDict)
+
+
+def get_colliding_blueprint():
+    """symmetric blocks of one name rule without index, left blocks get the same names"""
+    bp = generator.get_blueprint(6, depth=1, chain=3, symmetry=True)
+    bp["nameRule"]["convention"]["common"] = "{name}_{direction}_{description}_{extension}"
+    return bp
+
+
+def dumps(bp):
+    """canonical json of any blueprint container, to compare blueprints"""
+    return json.dumps(bp, sort_keys=True, default=binary.default)
+
+
+class TempDirTestCase(unittest.TestCase):
+    """self.dir is a new directory of every test, self.path a blueprint file in it"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "blueprint.json")
+
+    def tearDown(self):
+        for name in os.listdir(self.dir):
+            binary.detach(os.path.join(self.dir, name))
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+
+# json
+import json
+
+# mbox
+from mbox.core import scene
+from mbox.lego import batch, blueprint
+from mbox.tests import common
+
+#
+import os
+import sys
+import unittest
+
+
+class TestBatch(common.TempDirTestCase):
+
+    def test_rig_names(self):
+        self.assertEqual(batch.get_rig_names(["a/rig.json", "b/rig.json", "c/other.json", "d/rig.json"]),
+                         ["rig", "rig_1", "other", "rig_2"])
+
+    @unittest.skipIf(scene.BACKEND == "maya", "workers are mayapy")
+    def test_executable(self):
+        self.assertEqual(batch.get_executable(), sys.executable)
+
+    @unittest.skipIf(scene.BACKEND == "maya", "workers open maya scenes")
+    def test_build(self):
+        good = os.path.join(self.dir, "good.json")
+        broken = os.path.join(self.dir, "broken.json")
+        blueprint.save(common.get_blueprint(3), good)
+        with open(broken, "w") as f:
+            f.write("{")
+        output = os.path.join(self.dir, "rigs")
+
+        report = batch.build([good, broken], output, workers=2, timeout=120)
+        self.assertEqual(report["count"], 2)
+        self.assertEqual(report["succeeded"], 1)
+        self.assertEqual(report["failed"], [os.path.abspath(broken)])
+        self.assertTrue(report["rigs"]["good"]["success"])
+        self.assertTrue(report["rigs"]["broken"]["error"])
+        self.assertTrue(os.path.isfile(os.path.join(output, "good", batch.PROFILE_FILE)))
+        with open(os.path.join(output, batch.REPORT_FILE)) as f:
+            self.assertEqual(json.load(f)["succeeded"], 1)
+        self.assertEqual(len(batch.get_summary(report)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# -*- coding:utf-8 -*-
+
+# json
+import json
+
+# mbox
+from mbox.lego import binary, blueprint
+from mbox.tests import common
+
+#
+import unittest
+
+
+class TestBinary(common.TempDirTestCase):
+
+    def test_round_trip(self):
+        bp = common.get_blueprint()
+        binary.dump(bp, self.path)
+        self.assertTrue(binary.is_binary(self.path))
+        loaded = binary.load(self.path)
+        self.assertIsInstance(loaded["blocks"][0]["transforms"], binary.TransformView)
+        self.assertEqual(common.dumps(loaded), common.dumps(bp))
+
+    def test_view_write_is_not_written_through(self):
+        bp = common.get_blueprint()
+        binary.dump(bp, self.path)
+        loaded = binary.load(self.path)
+        transforms = loaded["blocks"][1]["transforms"]
+        matrix = transforms[0]
+        matrix[3][1] = 9.0
+        writes = transforms.writes
+        transforms[0] = matrix
+        self.assertEqual(transforms.writes, writes + 1)
+        self.assertEqual(transforms.tolist()[0][3][1], 9.0)
+        self.assertEqual(common.dumps(binary.load(self.path)), common.dumps(bp))
+
+    def test_other_transforms_stay_in_the_header(self):
+        bp = common.get_blueprint(2)
+        bp["blocks"][0]["transforms"] = [[[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]]
+        binary.dump(bp, self.path)
+        loaded = binary.load(self.path)
+        self.assertEqual(loaded["blocks"][0]["transforms"], bp["blocks"][0]["transforms"])
+        self.assertEqual(common.dumps(loaded), common.dumps(bp))
+
+    def test_save_over_a_loaded_file(self):
+        bp = common.get_blueprint(3)
+        blueprint.save(bp, self.path, compact=True)
+        loaded = blueprint.get_blueprint_from_file(self.path)
+        loaded["blocks"][0]["priority"] = 3
+        blueprint.save(loaded, self.path, compact=True)
+        again = blueprint.get_blueprint_from_file(self.path)
+        self.assertEqual(again["blocks"][0]["priority"], 3)
+        self.assertEqual(common.dumps(again["blocks"][1:]), common.dumps(bp["blocks"][1:]))
+
+    def test_default(self):
+        bp = common.get_blueprint(2)
+        binary.dump(bp, self.path)
+        data = json.loads(json.dumps(binary.load(self.path), default=binary.default))
+        self.assertEqual(common.dumps(data), common.dumps(bp))
+
+
+if __name__ == "__main__":
+    unittest.main()
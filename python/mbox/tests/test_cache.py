@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.core import scene
+from mbox.lego import lego, cache
+from mbox.benchmark import generator
+from mbox.tests import common
+
+#
+import copy
+import unittest
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        scene.new_scene()
+
+    def test_hits_and_misses(self):
+        bp = generator.get_blueprint(6)
+        build_cache = cache.BuildCache()
+        lego.lego(bp, "all", cache=build_cache)
+        self.assertEqual(build_cache.get_report()["compute"]["misses"], 6)
+
+        build_cache.reset_stats()
+        scene.new_scene()
+        lego.lego(bp, "all", cache=build_cache)
+        self.assertEqual(build_cache.get_report()["compute"]["hits"], 6)
+
+        build_cache.reset_stats()
+        scene.new_scene()
+        bp["blocks"][2]["meta"]["asWorld"] = True
+        lego.lego(bp, "all", cache=build_cache)
+        self.assertEqual(build_cache.get_report()["compute"]["misses"], 1)
+
+    def test_cached_build_is_the_same(self):
+        bp = common.get_colliding_blueprint()
+        build_cache = cache.BuildCache()
+        lego.lego(bp, "all", cache=build_cache, name_policy="suffix")
+        built = sorted(x.nodeName() for x in scene.pm.ls())
+        scene.new_scene()
+        lego.lego(bp, "all", cache=build_cache, name_policy="suffix")
+        self.assertEqual(sorted(x.nodeName() for x in scene.pm.ls()), built)
+
+    def test_component_key(self):
+        key = cache.get_component_key("control_0")
+        self.assertEqual(len(key), 40)
+        self.assertEqual(cache.get_component_key("control_0"), key)
+        block = generator.get_blueprint(1)["blocks"][0]
+        key = cache.get_block_key(block, "context")
+        self.assertEqual(cache.get_block_key(copy.deepcopy(block), "context"), key)
+        self.assertNotEqual(cache.get_block_key(block, "other context"), key)
+        self.assertNotEqual(cache.get_block_key(block, "context", [key]), key)
+        block["priority"] = 2
+        self.assertNotEqual(cache.get_block_key(block, "context"), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
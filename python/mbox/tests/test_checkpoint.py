@@ -0,0 +1,95 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.core import scene
+from mbox.lego import lego, checkpoint
+from mbox.benchmark import generator
+from mbox.tests import common
+
+#
+import copy
+import unittest
+
+
+class TestCheckpoint(common.TempDirTestCase):
+
+    def setUp(self):
+        super(TestCheckpoint, self).setUp()
+        scene.new_scene()
+        self.bp = generator.get_blueprint(6, depth=1, chain=3)
+
+    def _resume(self, snapshot, step):
+        checkpoints = checkpoint.Checkpoints(self.dir, snapshot=snapshot)
+        lego.lego(self.bp, "all", checkpoints=checkpoints)
+        built = sorted(x.nodeName() for x in scene.pm.ls())
+        scene.pm.createNode("transform", name="edited")
+        context = lego.lego(self.bp, "all", checkpoints=checkpoints, resume_from=step)
+        nodes = sorted(x.nodeName() for x in scene.pm.ls() if x.nodeName() != "edited")
+        self.assertEqual(nodes, built)
+        return context
+
+    def test_resume_snapshot(self):
+        context = self._resume(True, "operate")
+        self.assertFalse(scene.pm.objExists("edited"))
+        self.assertTrue(context["registry"].nodes)
+
+    def test_resume_rollback(self):
+        self._resume(False, "attributes")
+        self.assertTrue(scene.pm.objExists("edited"))
+
+    def test_resume_prepare(self):
+        self._resume(False, "prepare")
+
+    def test_changed_blueprint(self):
+        checkpoints = checkpoint.Checkpoints(self.dir)
+        lego.lego(self.bp, "all", checkpoints=checkpoints)
+        bp = copy.deepcopy(self.bp)
+        bp["blocks"][0]["priority"] = 2
+        with self.assertRaises(checkpoint.CheckpointError):
+            lego.lego(bp, "all", checkpoints=checkpoints, resume_from="operate")
+
+
+class TestModifiedScene(common.TempDirTestCase):
+    """restoring a maya snapshot opens a file, unsaved changes are kept unless forced"""
+
+    def setUp(self):
+        super(TestModifiedScene, self).setUp()
+        scene.new_scene()
+        self.is_modified = scene.is_modified
+        scene.is_modified = lambda: True
+
+    def tearDown(self):
+        scene.is_modified = self.is_modified
+        super(TestModifiedScene, self).tearDown()
+
+    def test_modified_scene_is_not_restored(self):
+        bp = generator.get_blueprint(3)
+        checkpoints = checkpoint.Checkpoints(self.dir, snapshot=True)
+        lego.lego(bp, "all", checkpoints=checkpoints)
+        scene.pm.createNode("transform", name="edited")
+        with self.assertRaises(checkpoint.CheckpointError):
+            lego.lego(bp, "all", checkpoints=checkpoints, resume_from="operate")
+        self.assertTrue(scene.pm.objExists("edited"))
+
+        checkpoints.force = True
+        lego.lego(bp, "all", checkpoints=checkpoints, resume_from="operate")
+        self.assertFalse(scene.pm.objExists("edited"))
+
+    def test_maya_restore_needs_force(self):
+        backend = scene.BACKEND
+        scene.BACKEND = "maya"
+        try:
+            with self.assertRaises(RuntimeError):
+                scene.restore("snapshot.ma")
+        finally:
+            scene.BACKEND = backend
+
+    def test_force_of_session_checkpoints(self):
+        bp = generator.get_blueprint(2)
+        self.assertFalse(checkpoint.get_checkpoints(bp).force)
+        self.assertTrue(checkpoint.get_checkpoints(bp, force=True).force)
+        self.assertFalse(checkpoint.get_checkpoints(bp).force)
+
+
+if __name__ == "__main__":
+    unittest.main()
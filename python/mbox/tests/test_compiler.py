@@ -0,0 +1,71 @@
+# -*- coding:utf-8 -*-
+
+# json
+from mbox.vendor import jsonschema
+
+# mbox
+from mbox.lego import compiler, validator
+from mbox.tests import common
+
+#
+import unittest
+
+# schema, [instance, ...], the compiled check answers like the interpreter
+CASES = [
+    ({"type": "integer"}, [1, 1.5, True, "1", None]),
+    ({"type": ["string", "null"]}, ["a", None, 1]),
+    ({"enum": [1, "a", [1]]}, [1, "a", [1], 2, [2]]),
+    ({"type": "object", "required": ["a"], "properties": {"a": {"type": "string"}}},
+     [{"a": "x"}, {"a": 1}, {}, [], "a"]),
+    ({"properties": {"a": {}}, "patternProperties": {"^x_": {"type": "integer"}}, "additionalProperties": False},
+     [{"a": 1, "x_b": 2}, {"x_b": "2"}, {"b": 1}]),
+    ({"additionalProperties": {"type": "boolean"}}, [{"a": True}, {"a": 1}]),
+    # nothing to check, no empty blocks are generated
+    ({"properties": {"a": {}}, "patternProperties": {}, "required": []}, [{"a": 1}, 1]),
+    ({"items": [], "additionalItems": {"type": "integer"}}, [[1], ["a"], 1]),
+    ({"items": {"type": "number"}, "minItems": 1, "maxItems": 2, "uniqueItems": True},
+     [[1], [1, 2.5], [], [1, 2, 3], [1, 1], ["1"]]),
+    ({"items": [{"type": "string"}, {"type": "integer"}], "additionalItems": False},
+     [["a", 1], ["a"], ["a", 1, 2], [1, 1]]),
+    ({"minimum": 0, "exclusiveMinimum": True, "maximum": 10}, [0, 1, 10, 11, "a"]),
+    ({"minLength": 2, "maxLength": 3, "pattern": "^a"}, ["ab", "a", "abcd", "ba", 1]),
+    ({"minProperties": 1, "maxProperties": 1}, [{}, {"a": 1}, {"a": 1, "b": 2}]),
+    ({"anyOf": [{"type": "string"}, {"minimum": 2}]}, ["a", 3, 1]),
+    ({"oneOf": [{"type": "integer"}, {"minimum": 2}]}, [1, 2.5, 3]),
+    ({"allOf": [{"type": "integer"}, {"minimum": 2}], "not": {"enum": [5]}}, [2, 1, 5, 2.5]),
+    ({"definitions": {"a": {"type": "array", "items": {"$ref": "#"}}}, "$ref": "#/definitions/a"},
+     [[], [[]], [[1]], 1]),
+]
+
+
+class TestCompiler(unittest.TestCase):
+
+    def test_cases(self):
+        for schema, instances in CASES:
+            check = compiler.compile_schema(schema)
+            interpreter = jsonschema.Draft4Validator(schema)
+            for instance in instances:
+                self.assertEqual(check(instance), interpreter.is_valid(instance), (schema, instance))
+
+    def test_blueprint(self):
+        check = compiler.compile_schema(validator.get_schema("blueprint-1"), types=validator.TYPES)
+        bp = common.get_blueprint(4)
+        self.assertTrue(check(bp))
+        bp["blocks"][2]["jointAxis"] = ["x"]
+        self.assertFalse(check(bp))
+
+    def test_source_is_kept(self):
+        schema = {"type": "object", "minProperties": 3}
+        compiler.compile_schema(schema)
+        source = compiler._sources[compiler.get_schema_hash(schema)]
+        compiler.compile_schema(schema)
+        self.assertIs(compiler._sources[compiler.get_schema_hash(schema)], source)
+
+    def test_not_supported(self):
+        for schema in ({"$ref": "http://example.com/schema#"}, {"dependencies": {"a": ["b"]}}, {"type": "any"}):
+            with self.assertRaises(compiler.CompileError):
+                compiler.compile_schema(schema)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding:utf-8 -*-
+
+# json
+import json
+
+# mbox
+from mbox.lego import binary, cow, model
+from mbox.tests import common
+
+#
+import copy
+import unittest
+
+
+class TestCow(unittest.TestCase):
+
+    def test_source_is_never_written(self):
+        data = common.get_blueprint(3)
+        text = common.dumps(data)
+        bp = cow.wrap(data)
+        bp["blocks"][1]["transforms"][0][3][1] = 5.0
+        bp["blocks"][2]["meta"]["asWorld"] = True
+        del bp["blocks"][0]
+        self.assertEqual(common.dumps(data), text)
+        self.assertEqual(len(bp["blocks"]), 2)
+        self.assertEqual(bp["blocks"][0]["transforms"][0][3][1], 5.0)
+
+    def test_only_the_path_is_copied(self):
+        data = common.get_blueprint(3)
+        bp = cow.wrap(data)
+        bp["blocks"][1]["meta"]["asWorld"] = True
+        self.assertEqual(bp.owned, 4)
+        result = bp.to_dict()
+        self.assertIsNot(result["blocks"][1], data["blocks"][1])
+        self.assertIs(result["blocks"][0], data["blocks"][0])
+        self.assertIs(result["blocks"][1]["transforms"], data["blocks"][1]["transforms"])
+
+    def test_snapshot(self):
+        bp = cow.wrap(common.get_blueprint(2))
+        undo = bp.snapshot()
+        bp["blocks"][0]["meta"]["asWorld"] = True
+        self.assertFalse(undo["blocks"][0]["meta"]["asWorld"])
+        result = bp.to_dict()
+        bp["blocks"][0]["meta"]["asWorld"] = False
+        self.assertTrue(result["blocks"][0]["meta"]["asWorld"])
+
+    def test_model_source_is_never_written(self):
+        data = common.get_blueprint(3)
+        source = model.Root.from_dict(copy.deepcopy(data))
+        bp = cow.wrap(source)
+        self.assertIsInstance(bp["blocks"][1], cow.CowDict)
+        self.assertIsInstance(bp["blocks"][1]["meta"], cow.CowDict)
+        bp["blocks"][1]["meta"]["asWorld"] = True
+        bp["blocks"][2]["direction"] = "left"
+        self.assertEqual(common.dumps(source.to_dict()), common.dumps(data))
+        self.assertTrue(bp["blocks"][1]["meta"]["asWorld"])
+        self.assertEqual(bp["blocks"][2]["direction"], "left")
+
+    def test_deepcopy_of_the_result_shares_nothing(self):
+        data = common.get_blueprint(2)
+        text = common.dumps(data)
+        bp = cow.wrap(data["blocks"][0])
+        bp["index"] = "9"
+        result = copy.deepcopy(bp.to_dict())
+        result["meta"]["asWorld"] = True
+        result["transforms"][0][3][1] = 5.0
+        self.assertEqual(common.dumps(data), text)
+
+    def test_default(self):
+        data = common.get_blueprint(2)
+        bp = cow.wrap(data)
+        self.assertEqual(common.dumps(json.loads(json.dumps(bp, default=binary.default))), common.dumps(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.lego import diff
+from mbox.tests import common
+
+#
+import copy
+import unittest
+
+
+class TestDiff(unittest.TestCase):
+
+    def test_round_trip(self):
+        old = common.get_blueprint(4)
+        new = copy.deepcopy(old)
+        new["notes"] = "changed"
+        del new["shapes"]
+        new["blocks"][1]["transforms"][0][3][0] = 2.0
+        new["blocks"][2]["meta"]["keyAbleAttrs"].remove("ro")
+        del new["blocks"][3]
+        added = copy.deepcopy(old["blocks"][0])
+        added["index"] = "9"
+        new["blocks"].append(added)
+
+        patch = diff.loads(diff.dumps(diff.diff(old, new)))
+        self.assertEqual(patch["removed"], ["control_center_3"])
+        self.assertEqual(sorted(patch["modified"].keys()), ["control_center_1", "control_center_2"])
+        self.assertEqual(common.dumps(diff.apply(copy.deepcopy(old), patch)), common.dumps(new))
+
+    def test_reorder(self):
+        old = common.get_blueprint(3)
+        new = copy.deepcopy(old)
+        new["blocks"].reverse()
+        patch = diff.diff(old, new)
+        self.assertEqual(common.dumps(diff.apply(copy.deepcopy(old), patch)), common.dumps(new))
+
+    def test_tolerance(self):
+        old = common.get_blueprint(2)
+        new = copy.deepcopy(old)
+        new["blocks"][0]["transforms"][0][3][0] += diff.TOLERANCE / 10.0
+        self.assertTrue(diff.is_empty(diff.diff(old, new)))
+
+    def test_missing_block(self):
+        old = common.get_blueprint(2)
+        new = copy.deepcopy(old)
+        del new["blocks"][1]
+        patch = diff.diff(old, new)
+        with self.assertRaises(diff.PatchError):
+            diff.apply(new, patch)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# -*- coding:utf-8 -*-
+
+# json
+import json
+
+# mbox
+from mbox.lego import digest, model
+from mbox.tests import common
+
+#
+import copy
+import unittest
+
+
+class TestDigest(unittest.TestCase):
+
+    def test_stable(self):
+        bp = common.get_blueprint(3)
+        again = json.loads(json.dumps(bp))
+        self.assertEqual(digest.get_hash(bp), digest.get_hash(again))
+        self.assertEqual(digest.get_hash(bp), digest.get_hash(model.Root.from_dict(bp)))
+
+    def test_quantized(self):
+        bp = common.get_blueprint(2)
+        before = digest.get_hash(bp)
+        bp["blocks"][0]["transforms"][0][3][0] += 10.0 ** -(digest.DECIMALS + 3)
+        self.assertEqual(digest.get_hash(bp), before)
+        bp["blocks"][0]["transforms"][0][3][0] += 1.0
+        self.assertNotEqual(digest.get_hash(bp), before)
+
+    def test_changed(self):
+        bp = common.get_blueprint(3)
+        hashes = digest.get_block_hashes(bp)
+        bp["blocks"][1]["priority"] = 2
+        del bp["blocks"][2]
+        added = copy.deepcopy(bp["blocks"][0])
+        added["index"] = "7"
+        bp["blocks"].append(added)
+        self.assertEqual(digest.get_changed(hashes, bp), (["control_center_7"], ["control_center_2"], ["control_center_1"]))
+
+
+class TestModelHash(unittest.TestCase):
+
+    def test_hash_after_nested_edit(self):
+        data = common.get_blueprint(2)
+        bp = model.Root.from_dict(data)
+        block = bp["blocks"][0]
+        edits = (lambda: block["meta"].__setitem__("worldOrientAxis", False),
+                 lambda: block["meta"]["keyAbleAttrs"].remove("ro"),
+                 lambda: block["meta"]["keyAbleAttrs"].append("v"),
+                 lambda: block["meta"].pop("asWorld"),
+                 lambda: block["jointAxis"].reverse(),
+                 lambda: block["transforms"].__setitem__(0, [[2.0, 0.0, 0.0, 0.0]] + block["transforms"][0][1:]),
+                 lambda: bp["nameRule"]["convention"].__setitem__("joint", "{name}_{description}"))
+        for edit in edits:
+            before = bp.content_hash
+            edit()
+            self.assertNotEqual(bp.content_hash, before)
+            self.assertEqual(bp.content_hash, digest.get_hash(bp.to_dict()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.core import scene
+from mbox.lego import lego, ir
+from mbox.tests import common
+
+#
+import unittest
+
+
+class TestIR(unittest.TestCase):
+
+    def test_optimize(self):
+        builder = ir.Builder()
+        builder.begin("objects")
+        builder.create_node("child", parent="root")
+        builder.create_node("root")
+        builder.set_transform("child", [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0],
+                                        [0.0, 0.0, 1.0, 0.0], [1.0, 2.0, 3.0, 1.0]])
+        builder.begin("attributes")
+        builder.lock("child", ["tx"])
+        builder.lock("child", ["tx", "ty"])
+        builder.hide("child", ["tx"])
+        levels, rest = ir.optimize(ir.get_ops(builder.program))
+        self.assertEqual([[x["name"] for x in level] for level in levels], [["root"], ["child"]])
+        self.assertEqual(levels[1][0]["matrix"][3], [1.0, 2.0, 3.0, 1.0])
+        self.assertEqual([(x["op"], x["attrs"]) for x in rest], [("lock", ["tx", "ty"]), ("hide", ["tx"])])
+
+    def test_node_created_twice(self):
+        builder = ir.Builder()
+        builder.begin("objects")
+        builder.create_node("root")
+        builder.create_node("root")
+        with self.assertRaises(ir.IRError):
+            ir.optimize(ir.get_ops(builder.program))
+
+    def test_parent_cycle(self):
+        builder = ir.Builder()
+        builder.begin("objects")
+        builder.create_node("a", parent="b")
+        builder.create_node("b", parent="a")
+        with self.assertRaises(ir.IRError):
+            ir.optimize(ir.get_ops(builder.program))
+
+
+class TestExecute(unittest.TestCase):
+
+    def setUp(self):
+        scene.new_scene()
+
+    def test_same_scene_as_the_build(self):
+        bp = common.get_blueprint(6, depth=2, chain=3, symmetry=True)
+        lego.lego(bp, "all")
+        built = sorted(x.nodeName() for x in scene.pm.ls())
+        scene.new_scene()
+        context = lego.lego(bp, "all", emit=True)
+        self.assertEqual(scene.pm.ls(), list())
+        program = ir.loads(ir.dumps(context["ir"]))
+        self.assertEqual(ir.get_diff(context["ir"], program), list())
+        counts = ir.execute(program)
+        self.assertLessEqual(counts["executed"], counts["emitted"])
+        self.assertEqual(sorted(x.nodeName() for x in scene.pm.ls()), built)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# -*- coding:utf-8 -*-
+
+# json
+import json
+
+# mbox
+from mbox.lego import journal, blueprint
+from mbox.tests import common
+
+#
+import os
+import copy
+import unittest
+
+
+class TestJournal(common.TempDirTestCase):
+
+    def test_replay(self):
+        bp = common.get_blueprint(3)
+        blueprint.save(bp, self.path)
+        j = journal.Journal(self.path)
+        block = copy.deepcopy(bp["blocks"][1])
+        block["meta"]["asWorld"] = True
+        j.modify(block)
+        j.remove("control_center_2")
+        added = copy.deepcopy(bp["blocks"][0])
+        added["index"] = "5"
+        j.add(added)
+        self.assertEqual([x["op"] for x in j.entries()], ["modify", "remove", "add"])
+
+        loaded = blueprint.get_blueprint_from_file(self.path)
+        self.assertEqual([x["index"] for x in loaded["blocks"]], ["0", "1", "5"])
+        self.assertTrue(loaded["blocks"][1]["meta"]["asWorld"])
+
+        blueprint.compact_journal(self.path)
+        self.assertFalse(j.exists())
+        self.assertEqual(common.dumps(blueprint.get_blueprint_from_file(self.path)), common.dumps(loaded))
+
+    def test_rename_and_lazy_replay(self):
+        bp = common.get_blueprint(3)
+        blueprint.save(bp, self.path)
+        j = journal.Journal(self.path)
+        renamed = copy.deepcopy(bp["blocks"][0])
+        renamed["index"] = "7"
+        j.modify(renamed, name="control_center_0")
+        j.remove("control_center_1")
+        j.modify(renamed)
+        expected = [renamed, bp["blocks"][2]]
+        self.assertEqual(common.dumps(blueprint.get_blueprint_from_file(self.path)["blocks"]), common.dumps(expected))
+        lazy = blueprint.get_lazy_blueprint_from_file(self.path)
+        self.assertEqual(lazy["blocks"].names(), ["control_center_7", "control_center_2"])
+        self.assertEqual(common.dumps(lazy["blocks"]), common.dumps(expected))
+
+    def test_missing_block(self):
+        blueprint.save(common.get_blueprint(2), self.path)
+        journal.Journal(self.path).remove("control_center_5")
+        with self.assertRaises(journal.JournalError):
+            blueprint.get_blueprint_from_file(self.path)
+
+    def test_torn_line_is_skipped(self):
+        bp = common.get_blueprint(2)
+        blueprint.save(bp, self.path)
+        j = journal.Journal(self.path)
+        j.remove("control_center_1")
+        with open(j.journal_path, "ab") as f:
+            f.write(b'{"op":"remo')
+        j.remove("control_center_0")
+        self.assertEqual([x["name"] for x in j.entries()], ["control_center_1", "control_center_0"])
+
+    def test_stale_journal_is_moved_aside(self):
+        bp = common.get_blueprint(2)
+        blueprint.save(bp, self.path)
+        j = journal.Journal(self.path)
+        j.remove("control_center_1")
+        bp["notes"] = "saved without the journal"
+        with open(self.path, "w") as f:
+            json.dump(bp, f)
+        self.assertEqual(j.entries(), list())
+        self.assertFalse(j.exists())
+        self.assertTrue(os.path.exists(j.journal_path + journal.STALE_EXTENSION))
+        self.assertEqual(len(blueprint.get_blueprint_from_file(self.path)["blocks"]), 2)
+
+        # a new journal starts on the changed base file
+        j.remove("control_center_1")
+        self.assertEqual(len(blueprint.get_blueprint_from_file(self.path)["blocks"]), 1)
+
+    def test_base_is_not_saved(self):
+        with self.assertRaises(journal.JournalError):
+            journal.Journal(self.path).remove("control_center_0")
+
+
+if __name__ == "__main__":
+    unittest.main()
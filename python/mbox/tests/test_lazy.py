@@ -0,0 +1,111 @@
+# -*- coding:utf-8 -*-
+
+# json
+import json
+
+# mbox
+from mbox.lego import lazy, blueprint
+from mbox.tests import common
+
+#
+import os
+import unittest
+
+
+class TestLazy(common.TempDirTestCase):
+
+    def test_blocks_are_loaded_on_access(self):
+        bp = common.get_blueprint(4)
+        blueprint.save(bp, self.path)
+        loaded = lazy.load(self.path, cache=False)
+        blocks = loaded["blocks"]
+        self.assertEqual(blocks.names(), ["control_center_{0}".format(x) for x in range(4)])
+        self.assertEqual(blocks.materialized, 0)
+        self.assertEqual(common.dumps(blocks.get_block("control_center_2")), common.dumps(bp["blocks"][2]))
+        self.assertEqual(blocks.materialized, 1)
+        self.assertEqual(common.dumps(loaded), common.dumps(bp))
+
+    def test_index_of_compact_json(self):
+        bp = common.get_blueprint(3)
+        bp["blocks"][1]["meta"]["note"] = "a \"quoted\" { [ string"
+        for text in (json.dumps(bp), json.dumps(bp, indent=4), json.dumps(bp, separators=(",", ":"))):
+            data = text.encode("utf-8")
+            start, end, spans = lazy.get_index(data)
+            self.assertEqual(json.loads(data[start:end].decode("utf-8")), bp["blocks"])
+            for span, block in zip(spans, bp["blocks"]):
+                self.assertEqual(json.loads(data[span.start:span.end].decode("utf-8")), block)
+                self.assertEqual((span.name, span.direction, span.index),
+                                 (block["name"], block["direction"], block["index"]))
+
+    def test_no_blocks(self):
+        bp = common.get_blueprint(1)
+        bp["blocks"] = None
+        start, end, spans = lazy.get_index(json.dumps(bp).encode("utf-8"))
+        self.assertEqual(spans, list())
+        del bp["blocks"]
+        self.assertEqual(lazy.get_index(json.dumps(bp).encode("utf-8")), (None, None, list()))
+
+    def test_broken_json(self):
+        text = json.dumps(common.get_blueprint(2)).encode("utf-8")
+        with self.assertRaises(lazy.LazyLoadError):
+            lazy.get_index(text[:-10])
+
+    def test_file_changed_after_indexing(self):
+        blueprint.save(common.get_blueprint(2), self.path)
+        loaded = lazy.load(self.path, cache=False)
+        blueprint.save(common.get_blueprint(3), self.path)
+        stat = os.stat(self.path)
+        os.utime(self.path, (stat.st_atime, stat.st_mtime + 10))
+        with self.assertRaises(lazy.LazyLoadError):
+            loaded["blocks"][0]
+
+
+class TestIndexCache(common.TempDirTestCase):
+
+    def setUp(self):
+        super(TestIndexCache, self).setUp()
+        self.cache_dir = lazy.CACHE_DIR
+        lazy.CACHE_DIR = os.path.join(self.dir, "index")
+        self.bp = common.get_blueprint(3)
+        blueprint.save(self.bp, self.path)
+
+    def tearDown(self):
+        lazy.CACHE_DIR = self.cache_dir
+        super(TestIndexCache, self).tearDown()
+
+    def _get_index(self):
+        calls = list()
+        get_index = lazy.get_index
+
+        def counted(data):
+            calls.append(data)
+            return get_index(data)
+        lazy.get_index = counted
+        try:
+            loaded = lazy.load(self.path)
+        finally:
+            lazy.get_index = get_index
+        self.assertEqual(common.dumps(loaded), common.dumps(self.bp))
+        return len(calls)
+
+    def test_unchanged_file_is_not_indexed_again(self):
+        self.assertEqual(self._get_index(), 1)
+        self.assertEqual(self._get_index(), 0)
+        if os.name != "nt":
+            self.assertEqual(os.stat(lazy.CACHE_DIR).st_mode & 0o777, 0o700)
+
+    def test_changed_file_is_indexed_again(self):
+        self._get_index()
+        self.bp["blocks"][0]["meta"]["note"] = "longer"
+        blueprint.save(self.bp, self.path)
+        self.assertEqual(self._get_index(), 1)
+
+    @unittest.skipIf(os.name == "nt", "no posix permissions")
+    def test_shared_cache_dir_is_not_used(self):
+        self._get_index()
+        os.chmod(lazy.CACHE_DIR, 0o777)
+        self.assertEqual(self._get_index(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.core import scene
+from mbox.lego import lego, scheduler
+from mbox.tests import common
+
+#
+import unittest
+
+
+class TestCompute(unittest.TestCase):
+
+    def setUp(self):
+        scene.new_scene()
+
+    def test_compute_step_has_no_scene_edits(self):
+        bp = common.get_blueprint(6, depth=2, chain=3, symmetry=True)
+        context = lego.lego(bp, "compute")
+        self.assertEqual(scene.pm.ls(), list())
+        for block in bp["blocks"]:
+            self.assertTrue(context[scheduler.get_block_name(block)]["names"])
+
+    def test_workers_compute_the_same_data(self):
+        bp = common.get_blueprint(12, depth=2, chain=3, symmetry=True)
+        serial = lego.lego(bp, "compute", workers=1)
+        parallel = lego.lego(bp, "compute", workers=4)
+        for block in bp["blocks"]:
+            name = scheduler.get_block_name(block)
+            self.assertEqual(common.dumps(parallel[name]), common.dumps(serial[name]))
+
+    def test_workers_build_the_same_scene(self):
+        bp = common.get_blueprint(12, depth=2, chain=3, symmetry=True)
+        lego.lego(bp, "all", workers=1)
+        built = sorted(x.nodeName() for x in scene.pm.ls())
+        scene.new_scene()
+        lego.lego(bp, "all", workers=4)
+        self.assertEqual(sorted(x.nodeName() for x in scene.pm.ls()), built)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.core import memory
+
+#
+import math
+import unittest
+
+
+def _assert_matrix(test, a, b, places=6):
+    for row_a, row_b in zip(memory.Matrix(a), memory.Matrix(b)):
+        for x, y in zip(row_a, row_b):
+            test.assertAlmostEqual(x, y, places=places)
+
+
+class TestDatatypes(unittest.TestCase):
+
+    def test_matrix_inverse(self):
+        m = memory.EulerRotation(0.3, -1.1, 2.0).asMatrix()
+        m[3] = [1.0, 2.0, 3.0, 1.0]
+        _assert_matrix(self, m * m.inverse(), memory.Matrix())
+
+    def test_euler_round_trip_every_order(self):
+        for order in range(len(memory.ROTATE_ORDERS)):
+            rotation = memory.EulerRotation(0.4, -0.7, 1.2, order=order)
+            m = rotation.asMatrix()
+            again = memory.TransformationMatrix(m, order=order).getRotation()
+            _assert_matrix(self, again.asMatrix(), m)
+
+    def test_quaternion_round_trip(self):
+        rotation = memory.EulerRotation(0.4, -0.7, 1.2)
+        quaternion = rotation.asQuaternion()
+        _assert_matrix(self, quaternion.asMatrix(), rotation.asMatrix())
+        _assert_matrix(self, quaternion.asEulerRotation().asMatrix(), rotation.asMatrix())
+        self.assertAlmostEqual(sum(x * x for x in quaternion), 1.0)
+
+    def test_quaternion_product_is_a_then_b(self):
+        a = memory.EulerRotation(0.5, 0.0, 0.0).asQuaternion()
+        b = memory.EulerRotation(0.0, 0.0, 0.8).asQuaternion()
+        _assert_matrix(self, (a * b).asMatrix(), a.asMatrix() * b.asMatrix())
+
+    def test_transformation_matrix_round_trip(self):
+        m = memory.EulerRotation(0.1, 0.2, 0.3).asMatrix()
+        m = memory.Matrix([[x * 2.0 for x in row[:3]] + [0.0] for row in m.data[:3]] + [[4.0, 5.0, 6.0, 1.0]])
+        t = memory.TransformationMatrix(m)
+        self.assertEqual(list(t.getTranslation()), [4.0, 5.0, 6.0])
+        for value in t.getScale():
+            self.assertAlmostEqual(value, 2.0)
+        _assert_matrix(self, t.asMatrix(), m)
+
+
+class TestScene(unittest.TestCase):
+
+    def setUp(self):
+        memory.newFile(force=True)
+
+    def test_unique_names(self):
+        a = memory.createNode("transform", name="node")
+        b = memory.createNode("transform", name="node")
+        self.assertNotEqual(a.nodeName(), b.nodeName())
+        self.assertIs(memory.PyNode(b.nodeName()), b)
+
+    def test_world_matrix_of_children(self):
+        parent = memory.createNode("transform", name="parent")
+        child = memory.createNode("transform", name="child", parent=parent)
+        parent.setTranslation([1.0, 0.0, 0.0])
+        parent.setRotation([0.0, 0.0, 90.0])
+        child.setTranslation([1.0, 0.0, 0.0])
+        world = child.getMatrix(worldSpace=True)
+        self.assertAlmostEqual(world[3][0], 1.0)
+        self.assertAlmostEqual(world[3][1], 1.0)
+        _assert_matrix(self, child.attr("worldMatrix").get(), world)
+
+    def test_parent_keeps_world_matrix(self):
+        parent = memory.createNode("transform", name="parent")
+        parent.setTranslation([0.0, 5.0, 0.0])
+        parent.setRotation([30.0, 0.0, 0.0])
+        child = memory.createNode("transform", name="child")
+        child.setTranslation([1.0, 2.0, 3.0])
+        world = child.getMatrix(worldSpace=True)
+        memory.parent(child, parent)
+        self.assertIs(child.getParent(), parent)
+        _assert_matrix(self, child.getMatrix(worldSpace=True), world)
+        memory.parent(child, world=True)
+        self.assertIsNone(child.getParent())
+        _assert_matrix(self, child.getMatrix(), world)
+
+    def test_set_world_matrix(self):
+        parent = memory.createNode("transform", name="parent")
+        parent.setTranslation([3.0, 0.0, 0.0])
+        child = memory.createNode("transform", name="child", parent=parent)
+        m = memory.EulerRotation(0.0, math.radians(45.0), 0.0).asMatrix()
+        m[3] = [1.0, 1.0, 1.0, 1.0]
+        child.setMatrix(m, worldSpace=True)
+        _assert_matrix(self, child.getMatrix(worldSpace=True), m)
+        self.assertAlmostEqual(child.getTranslation()[0], -2.0)
+
+    def test_connections_drive_values(self):
+        a = memory.createNode("transform", name="a")
+        b = memory.createNode("transform", name="b")
+        memory.connectAttr(a.attr("tx"), b.attr("ty"))
+        a.attr("tx").set(4.0)
+        self.assertEqual(b.attr("ty").get(), 4.0)
+        self.assertEqual(b.attr("ty").inputs(plugs=True), [a.attr("tx")])
+        with self.assertRaises(RuntimeError):
+            memory.connectAttr(a.attr("tz"), b.attr("ty"))
+        memory.connectAttr(a.attr("tz"), b.attr("ty"), force=True)
+        self.assertEqual(a.attr("tx").outputs(), list())
+        memory.disconnectAttr(a.attr("tz"), b.attr("ty"))
+        self.assertFalse(b.attr("ty").isConnected())
+
+    def test_locked_destination(self):
+        a = memory.createNode("transform", name="a")
+        b = memory.createNode("transform", name="b")
+        b.attr("tx").lock()
+        with self.assertRaises(RuntimeError):
+            memory.connectAttr(a.attr("tx"), b.attr("tx"))
+
+    def test_multi_attribute(self):
+        node = memory.createNode("transform", name="node")
+        node.addAttr("weights", attributeType="double", multi=True)
+        node.attr("weights")[0].set(1.0)
+        node.attr("weights")[3].set(2.0)
+        self.assertTrue(node.attr("weights").isMulti())
+        self.assertEqual(node.attr("weights").getArrayIndices(), [0, 3])
+        self.assertEqual(node.attr("weights")[3].get(), 2.0)
+
+    def test_compound_attribute(self):
+        node = memory.createNode("transform", name="node")
+        node.attr("translate").set([1.0, 2.0, 3.0])
+        self.assertEqual(node.attr("ty").get(), 2.0)
+        node.attr("tz").set(5.0)
+        self.assertEqual(list(node.attr("t").get()), [1.0, 2.0, 5.0])
+
+    def test_enum_attribute(self):
+        node = memory.createNode("transform", name="node")
+        node.addAttr("side", attributeType="enum", enumName="center:left:right")
+        node.attr("side").set(2)
+        self.assertEqual(node.attr("side").get(), 2)
+        self.assertEqual(node.attr("side").getEnums().key(1), "left")
+
+    def test_matrix_nodes_evaluate(self):
+        a = memory.createNode("transform", name="a")
+        a.setTranslation([1.0, 2.0, 3.0])
+        mult = memory.createNode("multMatrix", name="mult")
+        decompose = memory.createNode("decomposeMatrix", name="decompose")
+        b = memory.createNode("transform", name="b")
+        memory.connectAttr(a.attr("worldMatrix"), mult.attr("matrixIn")[0])
+        memory.connectAttr(mult.attr("matrixSum"), decompose.attr("inputMatrix"))
+        memory.connectAttr(decompose.attr("outputTranslate"), b.attr("translate"))
+        a.setTranslation([4.0, 5.0, 6.0])
+        self.assertEqual([round(x, 6) for x in b.getTranslation()], [4.0, 5.0, 6.0])
+
+    def test_delete_hierarchy(self):
+        parent = memory.createNode("transform", name="parent")
+        child = memory.createNode("transform", name="child", parent=parent)
+        memory.delete(parent)
+        self.assertFalse(memory.objExists("parent"))
+        self.assertFalse(child.exists())
+        self.assertEqual(memory.ls(), list())
+
+    def test_snapshot_restore(self):
+        a = memory.createNode("transform", name="a")
+        b = memory.createNode("transform", name="b", parent=a)
+        memory.connectAttr(a.attr("tx"), b.attr("ty"))
+        data = memory.snapshot()
+        a.attr("tx").set(3.0)
+        memory.delete(b)
+        memory.createNode("transform", name="c")
+        memory.restore(data)
+        self.assertEqual(sorted(x.nodeName() for x in memory.ls()), ["a", "b"])
+        self.assertEqual(memory.PyNode("a").attr("tx").get(), 0.0)
+        memory.PyNode("a").attr("tx").set(2.0)
+        self.assertEqual(memory.PyNode("b").attr("ty").get(), 2.0)
+        # the snapshot is a copy, the restored scene does not change it
+        memory.restore(data)
+        self.assertEqual(memory.PyNode("a").attr("tx").get(), 0.0)
+
+    def test_snapshot_keeps_callbacks(self):
+        added = list()
+        callback = memory.om.MDGMessage.addNodeAddedCallback(lambda node, data: added.append(node.nodeName()))
+        try:
+            data = memory.snapshot()
+            memory.restore(data)
+            memory.createNode("transform", name="after")
+        finally:
+            memory.om.MMessage.removeCallback(callback)
+        self.assertEqual(added, ["after"])
+
+
+class TestBuild(unittest.TestCase):
+    """small generated blueprint drawn and built end to end"""
+
+    def setUp(self):
+        from mbox.core import scene
+        self.scene = scene
+        scene.new_scene()
+
+    def test_draw_and_read_back(self):
+        from mbox.lego import blueprint
+        from mbox.benchmark import generator
+        bp = generator.get_blueprint(6)
+        blueprint.draw_from_blueprint(bp)
+        got = blueprint.get_blueprint_from_hierarchy(self.scene.pm.PyNode("guide"))
+        self.assertEqual(len(got["blocks"]), len(bp["blocks"]))
+        self.assertEqual(sorted(x["name"] for x in got["blocks"]), sorted(x["name"] for x in bp["blocks"]))
+
+    def test_build(self):
+        from mbox.lego import lego
+        from mbox.benchmark import generator
+        bp = generator.get_blueprint(6)
+        context = lego.lego(bp, "all")
+        controls = [x for x in self.scene.pm.ls(type="transform") if x.nodeName().endswith(context["controllerExp"])]
+        self.assertEqual(len(controls), len(bp["blocks"]))
+        for control in controls:
+            self.assertTrue(control.getParent().nodeName().endswith("npo"))
+            self.assertTrue(control.getShapes())
+
+    def test_build_twice_in_new_scenes_is_the_same(self):
+        from mbox.lego import lego
+        from mbox.benchmark import generator
+        bp = generator.get_blueprint(4)
+        lego.lego(bp, "all")
+        first = sorted(x.nodeName() for x in self.scene.pm.ls())
+        self.scene.new_scene()
+        lego.lego(bp, "all")
+        self.assertEqual(sorted(x.nodeName() for x in self.scene.pm.ls()), first)
+
+    def test_emitted_program_executes_like_a_build(self):
+        from mbox.lego import lego, ir
+        from mbox.benchmark import generator
+        bp = generator.get_blueprint(4)
+        lego.lego(bp, "all")
+        built = sorted(x.nodeName() for x in self.scene.pm.ls())
+        self.scene.new_scene()
+        context = lego.lego(bp, "all", emit=True)
+        self.assertEqual(self.scene.pm.ls(), list())
+        ir.execute(ir.loads(ir.dumps(context["ir"])))
+        self.assertEqual(sorted(x.nodeName() for x in self.scene.pm.ls()), built)
+
+
+if __name__ == "__main__":
+    unittest.main()
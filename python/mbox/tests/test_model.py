@@ -0,0 +1,48 @@
+# -*- coding:utf-8 -*-
+
+# json
+import json
+
+# mbox
+from mbox.lego import binary, model, validator
+from mbox.tests import common
+
+#
+import pickle
+import unittest
+
+
+class TestModel(unittest.TestCase):
+
+    def test_round_trip(self):
+        data = common.get_blueprint(3)
+        bp = model.Root.from_dict(data)
+        self.assertTrue(model.is_model(bp))
+        self.assertEqual(common.dumps(bp.to_dict()), common.dumps(data))
+        self.assertEqual(list(bp.to_dict().keys()), list(data.keys()))
+        self.assertEqual(common.dumps(pickle.loads(pickle.dumps(bp)).to_dict()), common.dumps(data))
+
+    def test_pickled_nested_values_are_plain(self):
+        bp = model.Root.from_dict(common.get_blueprint(1))
+        meta = pickle.loads(pickle.dumps(bp["blocks"][0]["meta"]))
+        self.assertIs(type(meta["keyAbleAttrs"]), list)
+        self.assertEqual(meta, bp["blocks"][0]["meta"])
+
+    def test_default(self):
+        data = common.get_blueprint(2)
+        bp = model.Root.from_dict(data)
+        self.assertEqual(common.dumps(json.loads(json.dumps(bp, default=binary.default))), common.dumps(data))
+
+    def test_validate(self):
+        bp = model.Root.from_dict(common.get_blueprint(3))
+        validator.validate(bp)
+        self.assertTrue(validator.get_validator("blueprint-1").is_valid(bp))
+        self.assertTrue(validator.get_check("blueprint-1")(bp))
+        self.assertTrue(validator.get_check("blueprint-1", "block")(bp["blocks"][0]))
+        bp["blocks"][1]["priority"] = "1"
+        self.assertFalse(validator.get_validator("blueprint-1").is_valid(bp))
+        self.assertFalse(validator.get_check("blueprint-1")(bp))
+
+
+if __name__ == "__main__":
+    unittest.main()
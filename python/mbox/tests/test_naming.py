@@ -0,0 +1,51 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.lego import naming
+
+#
+import threading
+import unittest
+
+
+class TestNaming(unittest.TestCase):
+
+    def test_convention(self):
+        namer = naming.Namer("{name}_{direction}{index}_{description}_{extension}",
+                             "{name}_{direction}{index}_{description}_{extension}",
+                             "default", "default", "ctl", "jnt", ("C", "L", "R"))
+        self.assertEqual(namer.name("arm", "left", 0, "fk0"), "arm_L0_fk0_ctl")
+        self.assertEqual(namer.name("arm", "right", 1, "fk0", joint=True), "arm_R1_fk0_jnt")
+        self.assertEqual(namer.name("arm", "center", 0, "root", extension="npo"), "arm_C0_root_npo")
+
+    def test_guide(self):
+        block = {"name": "arm", "direction": "left", "index": 0}
+        self.assertEqual(naming.guide(block, "root"), "arm_left0_root")
+
+    def test_threads(self):
+        namer = naming.Namer("{name}_{direction}{index}_{description}_{extension}",
+                             "{name}_{direction}{index}_{description}_{extension}",
+                             "default", "default", "ctl", "jnt", ("C", "L", "R"))
+        max_names = naming.MAX_NAMES
+        naming.MAX_NAMES = 50
+        errors = list()
+
+        def run(index):
+            for number in range(500):
+                description = "fk{0}".format(number)
+                if namer.name("arm", "left", index, description) != "arm_L{0}_{1}_ctl".format(index, description):
+                    errors.append((index, number))
+        threads = [threading.Thread(target=run, args=(x,)) for x in range(8)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            naming.MAX_NAMES = max_names
+        self.assertEqual(errors, list())
+        self.assertLessEqual(len(namer.names), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
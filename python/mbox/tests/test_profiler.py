@@ -0,0 +1,64 @@
+# -*- coding:utf-8 -*-
+
+# json
+import json
+
+# mbox
+from mbox.core import scene
+from mbox.lego import lego, profiler, scheduler
+from mbox.tests import common
+
+#
+import os
+import unittest
+
+
+class TestProfiler(common.TempDirTestCase):
+
+    def setUp(self):
+        super(TestProfiler, self).setUp()
+        scene.new_scene()
+        self.report_dir = profiler.REPORT_DIR
+        profiler.REPORT_DIR = os.path.join(self.dir, "profile")
+
+    def tearDown(self):
+        profiler.REPORT_DIR = self.report_dir
+        super(TestProfiler, self).tearDown()
+
+    def test_report(self):
+        bp = common.get_blueprint(4)
+        name = scheduler.get_block_name(bp["blocks"][1])
+        p = profiler.Profiler(cprofile=[name])
+        lego.lego(bp, "all", profiler=p)
+        report = p.get_report()
+        self.assertEqual(list(report["steps"].keys()), ["prepare", "compute", "objects", "attributes", "operate", "finalize"])
+        self.assertEqual(sorted(report["blocks"].keys()), sorted(scheduler.get_block_name(x) for x in bp["blocks"]))
+        self.assertGreater(report["steps"]["objects"]["calls"], 0)
+        self.assertEqual(list(report["cprofile"].keys()), [name])
+        self.assertTrue(p.get_summary())
+
+    def test_nothing_is_patched_after_the_build(self):
+        create_node = scene.pm.createNode
+        lego.lego(common.get_blueprint(2), "all", profiler=profiler.Profiler())
+        self.assertIs(scene.pm.createNode, create_node)
+
+    def test_save(self):
+        p = profiler.Profiler()
+        lego.lego(common.get_blueprint(2), "all", profiler=p)
+        path = p.save()
+        self.assertEqual(os.path.dirname(path), profiler.REPORT_DIR)
+        with open(path) as f:
+            self.assertEqual(sorted(json.load(f)["blocks"].keys()), sorted(p.blocks.keys()))
+        if os.name != "nt":
+            self.assertEqual(os.stat(profiler.REPORT_DIR).st_mode & 0o777, 0o700)
+
+    @unittest.skipIf(os.name == "nt", "no posix permissions")
+    def test_shared_report_dir_is_not_used(self):
+        os.makedirs(profiler.REPORT_DIR)
+        os.chmod(profiler.REPORT_DIR, 0o777)
+        with self.assertRaises(OSError):
+            profiler.Profiler().save()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.core import scene
+from mbox.lego import lego, progress
+from mbox.benchmark import generator
+from mbox.tests import common
+
+#
+import os
+import unittest
+
+
+class TestProgress(unittest.TestCase):
+
+    def test_events(self):
+        scene.new_scene()
+        bp = generator.get_blueprint(4)
+        p = progress.Progress(history=False)
+        events = p.get_queue()
+        lego.lego(bp, "all", progress=p)
+        kinds = list()
+        while not events.empty():
+            kinds.append(events.get()["event"])
+        self.assertEqual(kinds[0], "buildStarted")
+        self.assertEqual(kinds[-1], "buildFinished")
+        self.assertEqual(kinds.count("blockFinished"), kinds.count("blockStarted"))
+
+    def test_throttle(self):
+        delivered = list()
+        now = [0.0]
+        throttle = progress.Throttle(delivered.append, rate=10)
+        throttle.clock = lambda: now[0]
+        throttle({"event": "stepStarted", "index": 0})
+        throttle({"event": "blockFinished", "index": 1})
+        throttle({"event": "blockFinished", "index": 2})
+        self.assertEqual([x["index"] for x in delivered], [0])
+        # a forced event delivers the last skipped block event before it
+        throttle({"event": "warning", "index": 3})
+        self.assertEqual([x["index"] for x in delivered], [0, 2, 3])
+        throttle({"event": "blockFinished", "index": 4})
+        now[0] = 1.0
+        throttle({"event": "blockFinished", "index": 5})
+        self.assertEqual([x["index"] for x in delivered], [0, 2, 3, 5])
+        throttle({"event": "blockFinished", "index": 6})
+        throttle.flush()
+        self.assertEqual([x["index"] for x in delivered], [0, 2, 3, 5, 6])
+
+
+class TestHistory(common.TempDirTestCase):
+
+    def setUp(self):
+        super(TestHistory, self).setUp()
+        scene.new_scene()
+        self.history_dir = progress.HISTORY_DIR
+        progress.HISTORY_DIR = os.path.join(self.dir, "progress")
+        self.bp = generator.get_blueprint(4)
+
+    def tearDown(self):
+        progress.HISTORY_DIR = self.history_dir
+        super(TestHistory, self).tearDown()
+
+    def _get_etas(self):
+        scene.new_scene()
+        p = progress.Progress()
+        events = p.get_queue()
+        lego.lego(self.bp, "all", progress=p)
+        etas = list()
+        while not events.empty():
+            etas.append(events.get()["eta"])
+        return etas
+
+    def test_eta_of_the_next_build(self):
+        self.assertEqual(set(self._get_etas()), set([None]))
+        self.assertTrue(os.listdir(progress.HISTORY_DIR))
+        if os.name != "nt":
+            self.assertEqual(os.stat(progress.HISTORY_DIR).st_mode & 0o777, 0o700)
+        self.assertTrue([x for x in self._get_etas() if x is not None])
+
+    @unittest.skipIf(os.name == "nt", "no posix permissions")
+    def test_shared_history_dir_is_not_used(self):
+        self._get_etas()
+        os.chmod(progress.HISTORY_DIR, 0o777)
+        self.assertEqual(set(self._get_etas()), set([None]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.core import scene
+from mbox.lego import lego, registry
+from mbox.benchmark import generator
+from mbox.tests import common
+
+#
+import copy
+import unittest
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_error_policy(self):
+        names = registry.NameRegistry("error")
+        self.assertEqual(names.reserve("arm_L0_ctl", "arm_left_0"), "arm_L0_ctl")
+        with self.assertRaises(registry.NameCollisionError):
+            names.reserve("arm_L0_ctl", "arm_left_1")
+        self.assertEqual(names.owner("arm_L0_ctl"), "arm_left_0")
+
+    def test_suffix_policy(self):
+        names = registry.NameRegistry("suffix")
+        names.reserve("arm_L0_ctl1", "leg_left_0")
+        names.reserve("arm_L0_ctl", "arm_left_0")
+        self.assertEqual(names.reserve("arm_L0_ctl", "arm_left_1"), "arm_L0_ctl2")
+        self.assertEqual(names.reserve("arm_L0_ctl", "arm_left_2"), "arm_L0_ctl3")
+        self.assertEqual(names.owner("arm_L0_ctl2"), "arm_left_1")
+        self.assertEqual(len(names.get_report()["collisions"]), 2)
+
+    def test_warn_policy(self):
+        names = registry.NameRegistry("warn")
+        names.reserve("arm_L0_ctl", "arm_left_0")
+        self.assertEqual(names.reserve("arm_L0_ctl", "arm_left_1"), "arm_L0_ctl")
+        self.assertEqual(names.owner("arm_L0_ctl"), "arm_left_0")
+        self.assertEqual(len(names.collisions), 1)
+
+    def test_reserve_block(self):
+        names = registry.NameRegistry("suffix")
+        data = {"names": {"ctl": "arm_L0_ctl", "fk": ["arm_L0_fk0_ctl", "arm_L0_fk1_ctl"]}}
+        names.reserve_block("arm_left_0", data)
+        names.reserve_block("arm_left_1", copy.deepcopy(data))
+        other = copy.deepcopy(data)
+        names.reserve_block("arm_left_2", other)
+        self.assertEqual(other["names"]["ctl"], "arm_L0_ctl2")
+        self.assertEqual(other["names"]["fk"], ["arm_L0_fk0_ctl2", "arm_L0_fk1_ctl2"])
+        self.assertIsNot(other["names"], data["names"])
+
+    def test_build(self):
+        scene.new_scene()
+        bp = generator.get_blueprint(6, depth=1, chain=3, symmetry=True)
+        context = lego.lego(bp, "all", name_policy="error")
+        names = context["registry"]
+        self.assertEqual(names.collisions, list())
+        self.assertEqual(names.owner("world_root"), bp["name"])
+        self.assertEqual(names.owner("guide"), "guide")
+        for name, node in names.nodes.items():
+            self.assertEqual(node.nodeName(), name)
+
+    def test_build_collisions(self):
+        bp = common.get_colliding_blueprint()
+        scene.new_scene()
+        with self.assertRaises(registry.NameCollisionError):
+            lego.lego(bp, "all", name_policy="error")
+        scene.new_scene()
+        context = lego.lego(bp, "all", name_policy="suffix", workers=3)
+        names = context["registry"]
+        self.assertTrue(names.collisions)
+        for name, node in names.nodes.items():
+            self.assertEqual(node.nodeName(), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
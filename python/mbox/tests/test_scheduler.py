@@ -0,0 +1,65 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.lego import scheduler
+from mbox.tests import common
+
+#
+import unittest
+
+
+def _names(groups):
+    return [[scheduler.get_block_name(x) for x in group] for group in groups]
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_chain_groups(self):
+        bp = common.get_blueprint(6, chain=3)
+        self.assertEqual(_names(scheduler.get_schedule(bp)),
+                         [["control_center_0", "control_center_3"],
+                          ["control_center_1", "control_center_4"],
+                          ["control_center_2", "control_center_5"]])
+        self.assertEqual([scheduler.get_block_name(x) for x in scheduler.get_order(bp)],
+                         ["control_center_0", "control_center_3", "control_center_1",
+                          "control_center_4", "control_center_2", "control_center_5"])
+
+    def test_parents_follow_guide_names(self):
+        bp = common.get_blueprint(3, chain=3)
+        self.assertEqual(list(scheduler.get_parents(bp).items()),
+                         [("control_center_0", None),
+                          ("control_center_1", "control_center_0"),
+                          ("control_center_2", "control_center_1")])
+
+    def test_meta_reference(self):
+        bp = common.get_blueprint(2)
+        bp["blocks"][0]["meta"]["space"] = ["control_center1_root"]
+        self.assertEqual(scheduler.get_dependency_graph(bp)["control_center_0"], ["control_center_1"])
+        self.assertEqual(_names(scheduler.get_schedule(bp)), [["control_center_1"], ["control_center_0"]])
+
+    def test_cycle(self):
+        bp = common.get_blueprint(2, chain=2)
+        bp["blocks"][0]["meta"]["space"] = "control_center_1"
+        with self.assertRaises(scheduler.ScheduleError):
+            scheduler.get_schedule(bp)
+
+    def test_missing_parent(self):
+        bp = common.get_blueprint(2)
+        bp["blocks"][1]["parent"] = "missing_center0_root"
+        with self.assertRaises(scheduler.ScheduleError):
+            scheduler.get_parents(bp)
+
+    def test_duplicated_block(self):
+        bp = common.get_blueprint(2)
+        bp["blocks"][1]["index"] = bp["blocks"][0]["index"]
+        with self.assertRaises(scheduler.ScheduleError):
+            scheduler.get_parents(bp)
+
+    def test_no_blocks(self):
+        bp = common.get_blueprint(1)
+        bp["blocks"] = None
+        self.assertEqual(scheduler.get_schedule(bp), list())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding:utf-8 -*-
+
+# mbox
+from mbox.lego import script
+from mbox.tests import common
+
+#
+import os
+import unittest
+
+RECORD = """
+def main(context):
+    context["calls"].append({0!r})
+"""
+
+SCENE_FREE = """
+SCENE_FREE = True
+
+def main(context):
+    context["calls"].append({0!r})
+"""
+
+RAISE = """
+def main(context):
+    raise RuntimeError("broken")
+"""
+
+
+class TestScript(common.TempDirTestCase):
+
+    def setUp(self):
+        super(TestScript, self).setUp()
+        script.clear_cache()
+
+    def _write(self, name, source):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as f:
+            f.write(source)
+        return path
+
+    def test_code_is_kept_until_the_file_changes(self):
+        path = self._write("a.py", RECORD.format("a"))
+        code = script.get_code(path)
+        self.assertIs(script.get_code(path), code)
+        self._write("a.py", RECORD.format("changed"))
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        self.assertIsNot(script.get_code(path), code)
+
+    def test_every_load_is_a_new_module(self):
+        path = self._write("a.py", "VALUE = list()\n")
+        self.assertIsNot(script.load(path).VALUE, script.load(path).VALUE)
+
+    def test_run_in_order(self):
+        paths = [self._write("{0}.py".format(x), RECORD.format(x)) for x in "abc"]
+        context = {"calls": list()}
+        times = script.run_scripts([" {0} ".format(x) for x in paths], context, "finalize")
+        self.assertEqual(context["calls"], ["a", "b", "c"])
+        self.assertEqual(list(times.keys()), paths)
+
+    def test_failing_script_stops_the_others(self):
+        paths = [self._write("a.py", RECORD.format("a")),
+                 self._write("b.py", RAISE),
+                 self._write("c.py", RECORD.format("c"))]
+        context = {"calls": list()}
+        times = script.run_scripts(paths, context, "finalize")
+        self.assertEqual(context["calls"], ["a"])
+        self.assertEqual(list(times.keys()), paths[:1])
+        context = {"calls": list()}
+        script.run_scripts([os.path.join(self.dir, "missing.py")] + paths[:1], context, "finalize")
+        self.assertEqual(context["calls"], list())
+
+    def test_scene_free_scripts(self):
+        paths = [self._write("{0}.py".format(x), SCENE_FREE.format(x)) for x in "abcd"]
+        paths.append(self._write("e.py", RECORD.format("e")))
+        context = {"calls": list()}
+        times = script.run_scripts(paths, context, "finalize", workers=4)
+        self.assertEqual(sorted(context["calls"]), ["a", "b", "c", "d", "e"])
+        self.assertEqual(list(times.keys()), paths)
+
+
+if __name__ == "__main__":
+    unittest.main()
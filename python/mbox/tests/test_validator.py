@@ -0,0 +1,53 @@
+# -*- coding:utf-8 -*-
+
+# json
+from mbox.vendor import jsonschema
+
+# mbox
+from mbox.lego import validator
+from mbox.tests import common
+
+#
+import unittest
+
+
+class TestValidator(unittest.TestCase):
+
+    def test_valid(self):
+        bp = common.get_blueprint(4)
+        validator.validate(bp)
+        self.assertTrue(validator.is_valid(bp))
+        self.assertEqual(validator.get_errors(bp), list())
+        validator.validate_block(bp["blocks"][0], bp["schemaVersion"])
+
+    def test_invalid(self):
+        bp = common.get_blueprint(4)
+        bp["blocks"][1]["priority"] = "1"
+        self.assertFalse(validator.is_valid(bp))
+        with self.assertRaises(jsonschema.ValidationError) as error:
+            validator.validate(bp)
+        self.assertEqual(list(error.exception.path)[-1], "priority")
+        with self.assertRaises(jsonschema.ValidationError):
+            validator.validate_block(bp["blocks"][1], bp["schemaVersion"])
+
+    def test_error_budget(self):
+        bp = common.get_blueprint(4)
+        for block in bp["blocks"]:
+            block["priority"] = "1"
+            block["joint"] = "yes"
+        self.assertEqual(len(validator.get_errors(bp)), 8)
+        self.assertEqual(len(validator.get_errors(bp, limit=1)), 1)
+        self.assertEqual(len(validator.get_errors(bp, per_block=1)), 4)
+
+    def test_validator_is_kept(self):
+        self.assertIs(validator.get_validator("blueprint-1"), validator.get_validator("blueprint-1"))
+        self.assertIs(validator.get_check("blueprint-1", "block"), validator.get_check("blueprint-1", "block"))
+
+    def test_schema_name(self):
+        for version in ("../blueprint-1", "blueprint-1/..", "", "..", None):
+            with self.assertRaises(ValueError):
+                validator.get_schema(version)
+
+
+if __name__ == "__main__":
+    unittest.main()